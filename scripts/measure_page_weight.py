@@ -0,0 +1,115 @@
+"""
+Mede o peso das pesquisas no e-SAJ com e sem o perfil leve do navegador
+
+Uso (na raiz do projeto, com o Edge e o msedgedriver instalados):
+
+    PYTHONPATH=src:. python scripts/measure_page_weight.py --cpf 123.456.789-09 --repeticoes 5
+
+Para cada modo (padrão e leve) abre um navegador novo, executa as pesquisas
+e lê os eventos de rede do log de performance do DevTools. A primeira
+pesquisa (cache frio) é mostrada separada da mediana das seguintes, que é o
+caso do driver mantido aberto entre pesquisas.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import List
+
+from selenium.webdriver.edge.options import Options
+from services.browser_profile_service import BrowserProfile
+from services.web_scraper_service import TJSPWebScraper
+
+@dataclass
+class Medicao:
+    """Tráfego e tempo de uma pesquisa"""
+    bytes_transferidos: int
+    requisicoes: int
+    bloqueadas: int
+    segundos: float
+
+class TJSPWebScraperMedicao(TJSPWebScraper):
+    """TJSPWebScraper com o log de performance do DevTools ligado"""
+
+    def _criar_options(self) -> Options:
+        options = super()._criar_options()
+        options.set_capability("ms:loggingPrefs", {"performance": "ALL"})
+        return options
+
+    def eventos_de_rede(self) -> List[dict]:
+        """Eventos Network.* desde a última leitura (a leitura esvazia o log)"""
+        eventos = []
+        for entrada in self.driver.get_log("performance"):
+            mensagem = json.loads(entrada["message"])["message"]
+            if mensagem["method"].startswith("Network."):
+                eventos.append(mensagem)
+        return eventos
+
+def resumir(eventos: List[dict], segundos: float) -> Medicao:
+    """Soma os bytes recebidos e conta requisições e bloqueios"""
+    bytes_transferidos = sum(
+        int(evento["params"].get("encodedDataLength", 0))
+        for evento in eventos if evento["method"] == "Network.loadingFinished"
+    )
+    requisicoes = sum(1 for evento in eventos if evento["method"] == "Network.requestWillBeSent")
+    bloqueadas = sum(
+        1 for evento in eventos
+        if evento["method"] == "Network.loadingFailed" and evento["params"].get("blockedReason")
+    )
+    return Medicao(bytes_transferidos, requisicoes, bloqueadas, segundos)
+
+def medir(perfil: BrowserProfile, cpf: str, repeticoes: int, driver_path: str, headless: bool) -> List[Medicao]:
+    """Executa `repeticoes` pesquisas por CPF em um navegador com o perfil informado"""
+    scraper = TJSPWebScraperMedicao(headless=headless, perfil=perfil)
+    scraper.setup_driver(driver_path)
+    try:
+        medicoes = []
+        for _ in range(repeticoes):
+            scraper.eventos_de_rede()  # descarta eventos anteriores
+            inicio = time.perf_counter()
+            page_source = scraper.pesquisar_por_cpf(cpf)
+            segundos = time.perf_counter() - inicio
+            if not page_source:
+                raise RuntimeError("Pesquisa sem resultado; verifique o acesso ao e-SAJ")
+            medicoes.append(resumir(scraper.eventos_de_rede(), segundos))
+        return medicoes
+    finally:
+        scraper.close_driver()
+
+def linha(modo: str, medicoes: List[Medicao]) -> str:
+    fria = medicoes[0]
+    quentes = medicoes[1:] or medicoes
+    return (
+        f"| {modo} "
+        f"| {fria.bytes_transferidos / 1024:.1f} "
+        f"| {statistics.median(m.bytes_transferidos for m in quentes) / 1024:.1f} "
+        f"| {statistics.median(m.requisicoes for m in quentes):.0f} "
+        f"| {statistics.median(m.bloqueadas for m in quentes):.0f} "
+        f"| {fria.segundos:.2f} "
+        f"| {statistics.median(m.segundos for m in quentes):.2f} |"
+    )
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cpf", required=True, help="CPF pesquisado em todas as repetições")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--driver-path", default=None, help="Caminho do msedgedriver")
+    parser.add_argument("--com-janela", action="store_true", help="Abre o navegador com janela")
+    args = parser.parse_args()
+
+    modos = [
+        ("padrão", BrowserProfile(bloquear_recursos=False)),
+        ("leve", BrowserProfile(bloquear_recursos=True)),
+    ]
+
+    print("| modo | KB 1ª pesquisa | KB mediana | requisições | bloqueadas | s 1ª pesquisa | s mediana |")
+    print("|---|---|---|---|---|---|---|")
+    for modo, perfil in modos:
+        medicoes = medir(perfil, args.cpf, args.repeticoes, args.driver_path, not args.com_janela)
+        print(linha(modo, medicoes))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
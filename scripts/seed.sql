@@ -28,7 +28,7 @@ INSERT INTO pesquisas (
 
 -- Popula websites (se necessário para scraping)
 INSERT INTO websites (nome, url, tipo, configuracao) VALUES 
-('TJSP', 'https://esaj.tjsp.jus.br/cpopg/open.do', 'TJSP', '{"selectors": {"tipo_pesquisa": "//*[@id=\"cbPesquisa\"]", "campo_cpf": "//*[@id=\"campo_DOCPARTE\"]", "campo_nome": "//*[@id=\"campo_NMPARTE\"]", "botao_consultar": "//*[@id=\"botaoConsultarProcessos\"]"}}');
+('TJSP', 'https://esaj.tjsp.jus.br/cpopg/open.do', 'TJSP', '{"selectors": {"tipo_pesquisa": "//*[@id=\"cbPesquisa\"]", "campo_cpf": "//*[@id=\"campo_DOCPARTE\"]", "campo_nome": "//*[@id=\"campo_NMPARTE\"]", "botao_consultar": "//*[@id=\"botaoConsultarProcessos\"]"}, "perfil_navegador": {"bloquear_recursos": true}, "analise_resultado": {"resultado_padrao": 5, "regras": [{"nome": "nada_consta", "padrao": "Não existem informações disponíveis para os parâmetros informados.", "resultado": 1}, {"nome": "processos_encontrados", "padrao": "Processos encontrados", "resultado": 5}, {"nome": "audiencias", "padrao": "Audiências", "resultado": 5}]}}');
 -- ON CONFLICT (nome) DO NOTHING;
 
 INSERT INTO funcionarios (nome, cpf, email) VALUES ('Funcionario Teste', '472.841.100-15', 'teste@exemplo.com');
\ No newline at end of file
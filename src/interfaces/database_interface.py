@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple, Dict, Any
+from typing import Iterator, List, Optional, Tuple, Dict, Any
 from datetime import datetime
+from interfaces.pesquisa_pendente import PesquisaPendente
+from interfaces.processo_encontrado import ProcessoEncontrado
+from interfaces.resultado_spv import ResultadoSPV
 
 class IDatabaseService(ABC):
     """Interface para serviços de banco de dados"""
@@ -15,6 +18,21 @@ class IDatabaseService(ABC):
         """Obtém pesquisas pendentes com paginação"""
         pass
     
+    @abstractmethod
+    def stream_pesquisas_pendentes(self, filtro: int = 0, tamanho_pagina: int = 100) -> Iterator[PesquisaPendente]:
+        """Todas as pesquisas pendentes do filtro, uma a uma, lidas em páginas por keyset"""
+        pass
+    
+    @abstractmethod
+    def claim_pesquisas(self, filtro: int, n: int, worker_id: str, prazo_segundos: int = 600) -> List[Tuple]:
+        """Reserva pesquisas pendentes para um worker (as reservadas não vão para outros workers)"""
+        pass
+    
+    @abstractmethod
+    def release_pesquisas(self, cod_pesquisas: List[int], filtro: int, worker_id: str) -> int:
+        """Desfaz reservas de pesquisas do worker"""
+        pass
+    
     @abstractmethod
     def salvar_resultado_spv(
         self, 
@@ -22,9 +40,32 @@ class IDatabaseService(ABC):
         filtro: int, 
         resultado: int, 
         tempo_execucao: float = None,
-        erro: str = None
+        erro: str = None,
+        cache_hit: bool = False,
+        pagina_hash: str = None,
+        processos: Optional[List[ProcessoEncontrado]] = None
     ) -> bool:
-        """Salva o resultado de uma pesquisa SPV"""
+        """Salva o resultado de uma pesquisa SPV (e os processos encontrados, se informados)"""
+        pass
+    
+    @abstractmethod
+    def salvar_resultados_spv(
+        self, 
+        cod_pesquisas: List[int], 
+        filtro: int, 
+        resultado: int, 
+        tempo_execucao: float = None,
+        erro: str = None,
+        cache_hit: bool = False,
+        pagina_hash: str = None,
+        processos: Optional[List[ProcessoEncontrado]] = None
+    ) -> bool:
+        """Salva o mesmo resultado SPV para várias pesquisas em uma única escrita"""
+        pass
+    
+    @abstractmethod
+    def gravar_resultados_spv(self, resultados: List[ResultadoSPV]) -> bool:
+        """Grava resultados SPV de pesquisas diferentes em uma única escrita"""
         pass
     
     @abstractmethod
@@ -37,7 +78,69 @@ class IDatabaseService(ABC):
         """Retorna estatísticas das pesquisas"""
         pass
     
+    @abstractmethod
+    def reconciliar_estatisticas(self) -> Dict[str, Any]:
+        """Refaz os contadores das estatísticas a partir das tabelas"""
+        pass
+    
+    @abstractmethod
+    def reconstruir_fila_pendentes(self) -> Dict[int, int]:
+        """Refaz a fila das pendentes (spv_fila) a partir das tabelas"""
+        pass
+    
+    @abstractmethod
+    def manter_particoes_pesquisa_spv(self, meses_a_frente: int = 3, meses_retencao: int = 0) -> Dict[str, List[str]]:
+        """Cria as partições mensais futuras de pesquisa_spv e arquiva as antigas"""
+        pass
+    
     @abstractmethod
     def get_pesquisas_por_filtro(self, filtro: int) -> int:
         """Retorna o número de pesquisas pendentes por filtro"""
-        pass 
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def contar_pesquisas_pendentes(self, aproximado: bool = False) -> Dict[int, int]:
+        """Retorna o número (exato ou estimado) de pesquisas pendentes de cada filtro"""
+        pass
+    
+    @abstractmethod
+    def existem_pesquisas_pendentes(self, filtro: int) -> bool:
+        """Verifica se o filtro tem alguma pesquisa pendente"""
+        pass
+    
+    @abstractmethod
+    def get_configuracao_website(self, website_type: str) -> Dict[str, Any]:
+        """Retorna a configuração JSON do website ativo do tipo informado"""
+        pass
+    
+    @abstractmethod
+    def get_paginas_arquivadas(self, limit: int, apos: int = 0) -> List[Tuple[int, int, int, str]]:
+        """Retorna (cod_pesquisa_spv, filtro, resultado, pagina_hash) com página arquivada, em ordem de código"""
+        pass
+    
+    @abstractmethod
+    def atualizar_resultados_spv(self, resultados: Dict[int, int]) -> int:
+        """Atualiza o resultado de registros de pesquisa_spv ({cod_pesquisa_spv: resultado})"""
+        pass
+    
+    @abstractmethod
+    def get_versao_website(self, website_type: str) -> Optional[Tuple[int, datetime]]:
+        """Retorna (website_id, updated_at) do website ativo do tipo informado"""
+        pass
+    
+    @abstractmethod
+    def get_resultado_cache(
+        self,
+        website: str,
+        filtro: int,
+        documento: str,
+        validade: datetime
+    ) -> Optional[Tuple[int, datetime, Optional[List[ProcessoEncontrado]]]]:
+        """Retorna o resultado e os processos do cache persistente posteriores a `validade`"""
+        pass
+    
+    @abstractmethod
+    def salvar_resultado_cache(self, website: str, filtro: int, documento: str, resultado: int,
+                               processos: List[ProcessoEncontrado]) -> bool:
+        """Grava o resultado e os processos de um documento no cache persistente"""
+        pass
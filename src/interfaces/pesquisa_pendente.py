@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+@dataclass(slots=True)
+class PesquisaPendente:
+    """Só as colunas de uma pesquisa pendente que a consulta ao tribunal usa"""
+
+    cod_pesquisa: int
+    nome: Optional[str]
+    cpf: Optional[str]
+    rg: Optional[str]
+
+    @classmethod
+    def da_linha(cls, linha: Sequence) -> "PesquisaPendente":
+        """A partir de uma linha de get_pesquisas_pendentes (13 colunas)"""
+        return cls(cod_pesquisa=linha[0], nome=linha[5], cpf=linha[6], rg=linha[7])
@@ -0,0 +1,29 @@
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, Dict, Optional
+
+@dataclass
+class ProcessoEncontrado:
+    """Processo listado na página de resultado de uma pesquisa"""
+    numero: str
+    classe: Optional[str] = None
+    assunto: Optional[str] = None
+    foro: Optional[str] = None
+    data_distribuicao: Optional[date] = None
+    participacao: Optional[str] = None
+    criminal: bool = False
+
+    def para_json(self) -> Dict[str, Any]:
+        """Dicionário serializável em JSON (data em ISO 8601), ex: resultado_cache.processos"""
+        dados = asdict(self)
+        if self.data_distribuicao is not None:
+            dados["data_distribuicao"] = self.data_distribuicao.isoformat()
+        return dados
+
+    @classmethod
+    def de_json(cls, dados: Dict[str, Any]) -> "ProcessoEncontrado":
+        data_distribuicao = dados.get("data_distribuicao")
+        return cls(**{
+            **dados,
+            "data_distribuicao": date.fromisoformat(data_distribuicao) if data_distribuicao else None
+        })
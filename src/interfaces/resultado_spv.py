@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from interfaces.processo_encontrado import ProcessoEncontrado
+
+@dataclass
+class ResultadoSPV:
+    """Resultado de uma pesquisa a gravar em pesquisa_spv"""
+    cod_pesquisa: int
+    filtro: int
+    resultado: int
+    tempo_execucao: Optional[float] = None
+    erro: Optional[str] = None
+    cache_hit: bool = False
+    pagina_hash: Optional[str] = None
+    processos: Optional[List[ProcessoEncontrado]] = None  # None mantém os processos já gravados
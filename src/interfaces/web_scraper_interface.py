@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Optional, ContextManager
+from typing import Optional, ContextManager, Dict, Any, List, Tuple
+from interfaces.processo_encontrado import ProcessoEncontrado
 
 class IWebScraperService(ABC):
     """Interface para serviços de web scraping"""
@@ -19,6 +20,10 @@ class IWebScraperService(ABC):
         """Fecha o driver do navegador"""
         pass
     
+    def get_estatisticas(self) -> Dict[str, Any]:
+        """Retorna contadores de funcionamento do serviço (drivers, reinícios, etc.)"""
+        return {}
+    
     def __enter__(self):
         """Context manager entry"""
         self.setup_driver()
@@ -34,4 +39,16 @@ class IResultAnalyzer(ABC):
     @abstractmethod
     def analisar_resultado(self, page_source: str) -> int:
         """Analisa o resultado da pesquisa e retorna o código do resultado"""
-        pass 
\ No newline at end of file
+        pass
+    
+    def analisar_processos(self, page_source: str) -> Tuple[int, List[ProcessoEncontrado]]:
+        """Código do resultado e os processos listados na página"""
+        return self.analisar_resultado(page_source), []
+    
+    def atualizar(self) -> None:
+        """Recarrega a configuração do analisador (chamado antes de cada lote)"""
+        pass
+    
+    def copia_para_processo(self) -> "IResultAnalyzer":
+        """Analisador que pode ser enviado a outro processo (pickle), com a configuração atual"""
+        return self 
\ No newline at end of file
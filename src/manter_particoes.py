@@ -0,0 +1,48 @@
+"""
+Cria as partições mensais de pesquisa_spv e arquiva as antigas
+
+Uso (na raiz do projeto):
+
+    PYTHONPATH=. python src/manter_particoes.py [--meses-a-frente N] [--retencao N]
+
+O ciclo do SPV já faz isso no início de cada execução; rode por aqui (ou pelo
+cron) quando o SPV ficar parado por mais tempo que DB_PARTITION_MONTHS_AHEAD.
+As partições mais antigas que a retenção saem de pesquisa_spv e vão para o
+schema arquivo, junto com os processos dos seus resultados.
+"""
+import argparse
+import sys
+from typing import List, Optional
+from config.database import get_db
+from services.config_service import ConfigService
+from services.database_service import DatabaseService
+from services.logging_service import LoggingService
+
+def main(argv: Optional[List[str]] = None) -> int:
+    config_service = ConfigService()
+    config = config_service.database
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meses-a-frente", type=int, default=max(config.partition_months_ahead, 1),
+                        help="Meses futuros que devem ter partição")
+    parser.add_argument("--retencao", type=int, default=config.partition_retention_months,
+                        help="Meses mantidos em pesquisa_spv (0 não arquiva nada)")
+    args = parser.parse_args(argv)
+
+    logging_service = LoggingService(config_service.logging)
+    database_service = DatabaseService(next(get_db()), logging_service)
+
+    particoes = database_service.manter_particoes_pesquisa_spv(args.meses_a_frente, args.retencao)
+    if not particoes:
+        print("Não foi possível manter as partições (ver log)")
+        return 1
+
+    for nome in particoes["criadas"]:
+        print(f"Criada: {nome}")
+    for nome in particoes["arquivadas"]:
+        print(f"Arquivada: {nome}")
+    print(f"{len(particoes['criadas'])} partições criadas, {len(particoes['arquivadas'])} arquivadas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
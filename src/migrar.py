@@ -0,0 +1,47 @@
+"""
+Aplica as migrações pendentes de storage/migrations
+
+Uso (na raiz do projeto):
+
+    PYTHONPATH=. python src/migrar.py [--listar]
+
+Cada arquivo NNNN_descricao.sql é aplicado uma vez, em ordem, e registrado
+na tabela schema_migrations. Bancos novos: `make load-schema` já registra as
+migrações incluídas no schema.sql; `make migrate` aplica as posteriores.
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+from config.database import get_db
+from services.migration_service import MigrationError, MigrationRunner
+
+DIRETORIO_MIGRACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "storage", "migrations")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listar", action="store_true", help="Só lista as migrações pendentes")
+    args = parser.parse_args(argv)
+
+    runner = MigrationRunner(next(get_db()), os.path.normpath(DIRETORIO_MIGRACOES))
+
+    if args.listar:
+        pendentes = runner.pendentes()
+        for _, nome in pendentes:
+            print(nome)
+        print(f"{len(pendentes)} migrações pendentes")
+        return 0
+
+    try:
+        aplicados = runner.aplicar()
+    except MigrationError as e:
+        print(e)
+        return 1
+
+    for nome in aplicados:
+        print(f"Aplicada: {nome}")
+    print(f"{len(aplicados)} migrações aplicadas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Text, ForeignKey, DECIMAL, JSON
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Boolean, DateTime, Date, Text, ForeignKey, DECIMAL, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.config.database import Base
@@ -113,9 +113,17 @@ class LotePesquisa(Base):
 
 class PesquisaSPV(Base):
     __tablename__ = "pesquisa_spv"
+    __table_args__ = (
+        # Um registro por pesquisa, SPV e filtro (garantido por quem grava: a
+        # tabela é particionada e o banco não aplica unicidade entre partições)
+        Index("idx_pesquisa_spv_pesquisa_filtro", "cod_pesquisa", "cod_spv", "filtro", postgresql_include=["resultado"]),
+        {"postgresql_partition_by": "RANGE (data_execucao)"},
+    )
     
+    # No banco a chave primária é (cod_pesquisa_spv, data_execucao); o código
+    # vem de uma sequência e continua identificando o registro
     cod_pesquisa_spv = Column(Integer, primary_key=True, index=True)
-    cod_pesquisa = Column(Integer, ForeignKey("pesquisas.cod_pesquisa"), index=True)
+    cod_pesquisa = Column(Integer, ForeignKey("pesquisas.cod_pesquisa"))
     cod_spv = Column(Integer, default=1)
     cod_spv_computador = Column(Integer)
     cod_spv_tipo = Column(Integer)
@@ -123,14 +131,77 @@ class PesquisaSPV(Base):
     filtro = Column(Integer, nullable=False, index=True)  # 0: CPF, 1: RG, 2: Nome, 3: RG alternativo
     website_id = Column(Integer, default=1)
     resultado = Column(Integer, index=True)  # 1: Nada consta, 2: Criminal, 5: Cível, 7: Erro
-    data_execucao = Column(DateTime(timezone=True), server_default=func.now())
+    data_execucao = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # Chave das partições mensais
     tempo_execucao = Column(DECIMAL(10, 2))
     erro = Column(Text)
+    cache_hit = Column(Boolean, default=False)  # Resultado veio do cache de resultados
+    pagina_hash = Column(String(64))  # sha256 da página no arquivo de páginas (PAGE_ARCHIVE_DIR)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relacionamentos
     pesquisa = relationship("Pesquisa", back_populates="pesquisa_spv")
+    processos = relationship(
+        "PesquisaSPVProcesso",
+        primaryjoin="PesquisaSPV.cod_pesquisa_spv == foreign(PesquisaSPVProcesso.cod_pesquisa_spv)",
+        back_populates="pesquisa_spv"
+    )
+
+class PesquisaSPVProcesso(Base):
+    __tablename__ = "pesquisa_spv_processos"
+    
+    cod_pesquisa_spv_processo = Column(Integer, primary_key=True, index=True)
+    cod_pesquisa_spv = Column(Integer, nullable=False, index=True)  # Sem chave estrangeira (pesquisa_spv é particionada)
+    numero = Column(String(30), nullable=False)  # Número CNJ do processo
+    classe = Column(String(200))
+    assunto = Column(String(200))
+    foro = Column(String(200))
+    data_distribuicao = Column(Date)
+    participacao = Column(String(100))  # Ex: Réu, Vítima, Testemunha
+    criminal = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relacionamentos
+    pesquisa_spv = relationship(
+        "PesquisaSPV",
+        primaryjoin="PesquisaSPV.cod_pesquisa_spv == foreign(PesquisaSPVProcesso.cod_pesquisa_spv)",
+        back_populates="processos"
+    )
+
+class PesquisaSPVReserva(Base):
+    __tablename__ = "pesquisa_spv_reservas"
+    
+    cod_pesquisa = Column(Integer, ForeignKey("pesquisas.cod_pesquisa", ondelete="CASCADE"), primary_key=True)
+    filtro = Column(Integer, primary_key=True)
+    worker_id = Column(String(100), nullable=False)
+    expira_em = Column(DateTime, nullable=False)  # Depois disso outro worker pode reservar
+
+class PesquisaFila(Base):
+    __tablename__ = "spv_fila"  # Mantida por triggers (ver spv_fila_calculada no schema.sql)
+    __table_args__ = (
+        Index("idx_spv_fila_ordem", "filtro", "nome", "cod_pesquisa"),
+    )
+    
+    cod_pesquisa = Column(Integer, ForeignKey("pesquisas.cod_pesquisa", ondelete="CASCADE"), primary_key=True)
+    filtro = Column(Integer, primary_key=True)
+    nome = Column(String(200), nullable=False)  # COALESCE(nome_corrigido, nome, '')
+
+class EstatisticaContador(Base):
+    __tablename__ = "estatisticas_contadores"
+    
+    chave = Column(String(30), primary_key=True)  # pendentes, concluidas, nada_consta, criminal, civel
+    fatia = Column(SmallInteger, primary_key=True, default=0)  # pg_backend_pid() % 16 de quem gravou
+    valor = Column(BigInteger, nullable=False, default=0)
+
+class ResultadoCache(Base):
+    __tablename__ = "resultado_cache"
+    
+    website = Column(String(50), primary_key=True)
+    filtro = Column(Integer, primary_key=True)
+    documento = Column(String(200), primary_key=True)  # Documento normalizado
+    resultado = Column(Integer, nullable=False)
+    processos = Column(JSON)  # ProcessoEncontrado.para_json() de cada processo; NULL antes da 0004
+    data_resultado = Column(DateTime, nullable=False, server_default=func.now())
 
 class Website(Base):
     __tablename__ = "websites"
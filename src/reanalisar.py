@@ -0,0 +1,115 @@
+"""
+Reanalisa os resultados a partir do arquivo de páginas (PAGE_ARCHIVE_DIR)
+
+Uso (na raiz do projeto):
+
+    PYTHONPATH=. python src/reanalisar.py [--simular] [--processos 4] [--lote 5000]
+
+Percorre os registros de pesquisa_spv com página arquivada, analisa cada
+página distinta uma única vez com as regras atuais do website (em vários
+processos) e grava os resultados que mudaram. Nenhuma pesquisa volta ao
+tribunal.
+"""
+import argparse
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from config.database import get_db
+from services.config_service import ConfigService
+from services.database_service import DatabaseService
+from services.logging_service import LoggingService
+from services.page_archive_service import PageArchive
+from services.result_analyzer_service import StructuredResultAnalyzer
+from services.result_rules_service import RuleMatcher
+
+# Estado de cada processo de análise
+_archive: Optional[PageArchive] = None
+_analyzer: Optional[StructuredResultAnalyzer] = None
+
+def _iniciar_processo(diretorio: str, configuracao: Dict[str, Any]) -> None:
+    global _archive, _analyzer
+    _archive = PageArchive(diretorio)
+    _analyzer = StructuredResultAnalyzer(matcher=RuleMatcher.from_configuracao(configuracao))
+
+def _analisar_pagina(pagina_hash: str) -> Tuple[str, Optional[int]]:
+    """Resultado da página arquivada (None se a página não está no arquivo)"""
+    page_source = _archive.ler(pagina_hash)
+    if page_source is None:
+        return pagina_hash, None
+    return pagina_hash, _analyzer.analisar_resultado(page_source)
+
+def reanalisar(database_service: DatabaseService, executor: ProcessPoolExecutor, lote: int,
+               simular: bool) -> Counter:
+    """
+    Reanalisa todos os registros com página arquivada
+
+    Returns:
+        Contadores: registros, paginas, ausentes, alterados e as mudanças
+        por transição ("1->5")
+    """
+    contadores = Counter()
+    resultados_por_hash: Dict[str, Optional[int]] = {}
+    apos = 0
+
+    while True:
+        registros = database_service.get_paginas_arquivadas(limit=lote, apos=apos)
+        if not registros:
+            break
+        apos = registros[-1][0]
+        contadores["registros"] += len(registros)
+
+        # Páginas repetidas (ex: "nada consta") são analisadas uma vez só
+        novos = sorted({pagina_hash for _, _, _, pagina_hash in registros} - resultados_por_hash.keys())
+        for pagina_hash, resultado in executor.map(_analisar_pagina, novos, chunksize=64):
+            resultados_por_hash[pagina_hash] = resultado
+        contadores["paginas"] += len(novos)
+
+        alterados: Dict[int, int] = {}
+        for cod_pesquisa_spv, _, resultado_atual, pagina_hash in registros:
+            resultado = resultados_por_hash[pagina_hash]
+            if resultado is None:
+                contadores["ausentes"] += 1
+            elif resultado != resultado_atual:
+                alterados[cod_pesquisa_spv] = resultado
+                contadores[f"{resultado_atual}->{resultado}"] += 1
+
+        contadores["alterados"] += len(alterados)
+        if alterados and not simular:
+            database_service.atualizar_resultados_spv(alterados)
+
+    return contadores
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--simular", action="store_true", help="Só mostra o que mudaria, sem gravar")
+    parser.add_argument("--processos", type=int, default=None, help="Processos de análise (padrão: CPUs)")
+    parser.add_argument("--lote", type=int, default=5000, help="Registros lidos do banco por vez")
+    args = parser.parse_args(argv)
+
+    config_service = ConfigService()
+    if not config_service.archive.enabled:
+        print("PAGE_ARCHIVE_DIR não configurado")
+        return 1
+
+    logging_service = LoggingService(config_service.logging)
+    database_service = DatabaseService(next(get_db()), logging_service)
+    configuracao = database_service.get_configuracao_website(config_service.scraping.website_type)
+
+    with ProcessPoolExecutor(
+        max_workers=args.processos,
+        initializer=_iniciar_processo,
+        initargs=(config_service.archive.directory, configuracao)
+    ) as executor:
+        contadores = reanalisar(database_service, executor, args.lote, args.simular)
+
+    print(f"Registros: {contadores['registros']} | páginas distintas: {contadores['paginas']} | "
+          f"sem página no arquivo: {contadores['ausentes']} | "
+          f"{'mudariam' if args.simular else 'alterados'}: {contadores['alterados']}")
+    for transicao, quantidade in sorted(contadores.items()):
+        if "->" in transicao:
+            print(f"  {transicao}: {quantidade}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
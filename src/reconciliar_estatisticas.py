@@ -0,0 +1,48 @@
+"""
+Refaz os contadores de estatísticas (tabela estatisticas_contadores) e a
+fila das pesquisas pendentes (tabela spv_fila)
+
+Uso (na raiz do projeto):
+
+    PYTHONPATH=. python src/reconciliar_estatisticas.py
+
+Os contadores e a fila são mantidos por triggers em pesquisas e
+pesquisa_spv. Rode depois de cargas feitas com os triggers desativados ou se
+as estatísticas ou as pendentes divergirem das tabelas. As gravações nessas
+tabelas esperam enquanto a contagem é feita.
+"""
+import argparse
+import sys
+from typing import List, Optional
+from config.database import get_db
+from services.config_service import ConfigService
+from services.database_service import DatabaseService
+from services.logging_service import LoggingService
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args(argv)
+
+    config_service = ConfigService()
+    logging_service = LoggingService(config_service.logging)
+    database_service = DatabaseService(next(get_db()), logging_service)
+
+    estatisticas = database_service.reconciliar_estatisticas()
+    if not estatisticas:
+        print("Não foi possível reconciliar os contadores (ver log)")
+        return 1
+
+    for chave, valor in estatisticas.items():
+        print(f"{chave}: {valor}")
+
+    pendentes = database_service.reconstruir_fila_pendentes()
+    if not pendentes:
+        print("Não foi possível refazer a fila das pendentes (ver log)")
+        return 1
+
+    for filtro, quantidade in pendentes.items():
+        print(f"pendentes filtro {filtro}: {quantidade}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
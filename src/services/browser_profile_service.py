@@ -0,0 +1,89 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from services.logging_service import LoggingService
+
+# Padrões do Network.setBlockedURLs (aceita apenas curingas "*")
+PADROES_FONTES = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+PADROES_CSS = ["*.css", "*.css?*"]
+PADROES_IMAGENS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp"]
+PADROES_TERCEIROS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*hotjar.com*",
+    "*clarity.ms*"
+]
+
+@dataclass
+class BrowserProfile:
+    """
+    Perfil leve do navegador
+
+    Com `bloquear_recursos` ligado, o driver não baixa imagens (preferência
+    do Edge), bloqueia fontes, folhas de estilo e terceiros pelo DevTools e
+    usa a estratégia de carregamento "eager" (não espera imagens e iframes).
+    A página de resultado continua sendo detectada pelos seletores de cada
+    website.
+    """
+    bloquear_recursos: bool = False
+    bloquear_imagens: bool = True
+    bloquear_fontes: bool = True
+    bloquear_css: bool = True
+    bloquear_terceiros: bool = True
+    page_load_strategy: str = "eager"
+    urls_bloqueadas: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_website(cls, configuracao: Optional[Dict[str, Any]], bloquear_recursos: bool = False) -> "BrowserProfile":
+        """
+        Lê o perfil de `websites.configuracao`:
+
+            {"perfil_navegador": {"bloquear_recursos": true, "bloquear_css": false,
+                                  "urls_bloqueadas": ["*.exemplo.com.br/*"]}}
+
+        Sem essa chave, usa `bloquear_recursos` (BROWSER_BLOCK_RESOURCES).
+        """
+        perfil = configuracao.get("perfil_navegador") if isinstance(configuracao, dict) else None
+        perfil = perfil or {}
+        campos = {nome: perfil[nome] for nome in cls.__dataclass_fields__ if nome in perfil}
+        campos.setdefault("bloquear_recursos", bloquear_recursos)
+        return cls(**campos)
+
+    def padroes_bloqueados(self) -> List[str]:
+        """Padrões de URL enviados ao Network.setBlockedURLs"""
+        if not self.bloquear_recursos:
+            return []
+        padroes = []
+        if self.bloquear_fontes:
+            padroes += PADROES_FONTES
+        if self.bloquear_css:
+            padroes += PADROES_CSS
+        if self.bloquear_imagens:
+            padroes += PADROES_IMAGENS
+        if self.bloquear_terceiros:
+            padroes += PADROES_TERCEIROS
+        return padroes + list(self.urls_bloqueadas)
+
+    def aplicar_opcoes(self, options: Any) -> None:
+        """Aplica as preferências e a estratégia de carregamento nas Options do Edge"""
+        if not self.bloquear_recursos:
+            return
+        options.page_load_strategy = self.page_load_strategy
+        if self.bloquear_imagens:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+            options.add_argument("--blink-settings=imagesEnabled=false")
+
+    def aplicar_bloqueio(self, driver: Any, logging_service: LoggingService = None) -> None:
+        """Ativa o bloqueio de URLs pelo DevTools no driver já aberto"""
+        padroes = self.padroes_bloqueados()
+        if not padroes:
+            return
+        logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+        except Exception as e:
+            # Sem DevTools o driver continua funcionando, só sem o bloqueio
+            logger.warning(f"Não foi possível bloquear recursos pelo DevTools: {e}")
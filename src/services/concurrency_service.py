@@ -0,0 +1,30 @@
+import asyncio
+from typing import Dict
+from urllib.parse import urlparse
+
+class HostSemaphores:
+    """
+    Semáforos asyncio por host
+
+    Limita quantas pesquisas ficam em andamento ao mesmo tempo em cada
+    tribunal, independente de quantas tarefas foram criadas. Deve ser criado
+    dentro do event loop que vai usá-lo.
+    """
+
+    def __init__(self, limite_por_host: int):
+        if limite_por_host < 1:
+            raise ValueError(f"Limite por host inválido: {limite_por_host}")
+        self.limite_por_host = limite_por_host
+        self._semaforos: Dict[str, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def host(url: str) -> str:
+        """Extrai o host de uma URL (ou retorna o próprio valor se não for URL)"""
+        return urlparse(url).hostname or url
+
+    def get(self, url: str) -> asyncio.Semaphore:
+        """Retorna o semáforo do host da URL, criando-o no primeiro uso"""
+        host = self.host(url)
+        if host not in self._semaforos:
+            self._semaforos[host] = asyncio.Semaphore(self.limite_por_host)
+        return self._semaforos[host]
@@ -18,6 +18,21 @@ def get_required_float(var_name: str) -> float:
 def get_required_bool(var_name: str) -> bool:
     return get_required_env(var_name).lower() == "true"
 
+def get_optional_env(var_name: str, default: str) -> str:
+    value = os.getenv(var_name)
+    if value is None or value.strip() == "":
+        return default
+    return value
+
+def get_optional_int(var_name: str, default: int) -> int:
+    return int(get_optional_env(var_name, str(default)))
+
+def get_optional_float(var_name: str, default: float) -> float:
+    return float(get_optional_env(var_name, str(default)))
+
+def get_optional_bool(var_name: str, default: bool) -> bool:
+    return get_optional_env(var_name, str(default)).lower() == "true"
+
 @dataclass
 class DatabaseConfig:
     url: str
@@ -25,6 +40,8 @@ class DatabaseConfig:
     max_overflow: int
     pool_pre_ping: bool
     pool_recycle: int
+    partition_months_ahead: int = 3
+    partition_retention_months: int = 0
 
 @dataclass
 class WebDriverConfig:
@@ -32,6 +49,9 @@ class WebDriverConfig:
     headless: bool
     timeout: int
     page_load_timeout: int
+    max_pages_per_driver: int = 200
+    max_rss_mb: int = 1500
+    block_resources: bool = False
 
 @dataclass
 class ScrapingConfig:
@@ -43,6 +63,42 @@ class ScrapingConfig:
     intervalo_espera: int
     max_tentativas: int
     disable_scraping: bool
+    pool_size: int = 1
+    engine: str = "selenium"
+    async_mode: bool = False
+    max_concurrent_per_host: int = 4
+    rate_limit_dir: str = ""
+    retry_backoff_base: float = 1.0
+    retry_backoff_max: float = 30.0
+    circuit_breaker_failures: int = 5
+    circuit_breaker_open_seconds: float = 60.0
+    analysis_processes: int = 0
+    pipeline_queue_size: int = 100
+    result_batch_size: int = 0
+    result_flush_ms: int = 500
+    claim_pesquisas: bool = False
+    claim_lease_seconds: int = 600
+    worker_id: str = ""
+    approximate_counts: bool = False
+
+@dataclass
+class CacheConfig:
+    ttl: int = 86400
+    max_entries: int = 10000
+    persistent: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+@dataclass
+class ArchiveConfig:
+    directory: str = ""
+    compression_level: int = 3
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
 
 @dataclass
 class LoggingConfig:
@@ -57,6 +113,8 @@ class ConfigService:
         self._webdriver_config = self._load_webdriver_config()
         self._scraping_config = self._load_scraping_config()
         self._logging_config = self._load_logging_config()
+        self._cache_config = self._load_cache_config()
+        self._archive_config = self._load_archive_config()
 
     def _load_database_config(self) -> DatabaseConfig:
         db_url = os.getenv("DATABASE_URL")
@@ -74,6 +132,8 @@ class ConfigService:
             max_overflow=get_required_int("DB_MAX_OVERFLOW"),
             pool_pre_ping=get_required_bool("DB_POOL_PRE_PING"),
             pool_recycle=get_required_int("DB_POOL_RECYCLE"),
+            partition_months_ahead=get_optional_int("DB_PARTITION_MONTHS_AHEAD", 3),
+            partition_retention_months=get_optional_int("DB_PARTITION_RETENTION_MONTHS", 0),
         )
 
     def _load_webdriver_config(self) -> WebDriverConfig:
@@ -82,6 +142,9 @@ class ConfigService:
             headless=get_required_bool("HEADLESS"),
             timeout=get_required_int("WEBDRIVER_TIMEOUT"),
             page_load_timeout=get_required_int("PAGE_LOAD_TIMEOUT"),
+            max_pages_per_driver=get_optional_int("DRIVER_MAX_PAGES", 200),
+            max_rss_mb=get_optional_int("DRIVER_MAX_RSS_MB", 1500),
+            block_resources=get_optional_bool("BROWSER_BLOCK_RESOURCES", False),
         )
 
     def _load_scraping_config(self) -> ScrapingConfig:
@@ -94,6 +157,23 @@ class ConfigService:
             intervalo_espera=get_required_int("WAITING_INTERVAL"),
             max_tentativas=get_required_int("MAX_ATTEMPTS"),
             disable_scraping=get_required_bool("DISABLE_SCRAPING"),
+            pool_size=get_optional_int("SCRAPER_POOL_SIZE", 1),
+            engine=get_optional_env("SCRAPER_ENGINE", "selenium"),
+            async_mode=get_optional_bool("SCRAPER_ASYNC", False),
+            max_concurrent_per_host=get_optional_int("MAX_CONCURRENT_PER_HOST", 4),
+            rate_limit_dir=get_optional_env("RATE_LIMIT_DIR", ""),
+            retry_backoff_base=get_optional_float("RETRY_BACKOFF_BASE", 1.0),
+            retry_backoff_max=get_optional_float("RETRY_BACKOFF_MAX", 30.0),
+            circuit_breaker_failures=get_optional_int("CIRCUIT_BREAKER_FAILURES", 5),
+            circuit_breaker_open_seconds=get_optional_float("CIRCUIT_BREAKER_OPEN_SECONDS", 60.0),
+            analysis_processes=get_optional_int("ANALYSIS_PROCESSES", 0),
+            pipeline_queue_size=get_optional_int("PIPELINE_QUEUE_SIZE", 100),
+            result_batch_size=get_optional_int("RESULT_BATCH_SIZE", 0),
+            result_flush_ms=get_optional_int("RESULT_FLUSH_MS", 500),
+            claim_pesquisas=get_optional_bool("CLAIM_PESQUISAS", False),
+            claim_lease_seconds=get_optional_int("CLAIM_LEASE_SECONDS", 600),
+            worker_id=get_optional_env("WORKER_ID", ""),
+            approximate_counts=get_optional_bool("APPROXIMATE_COUNTS", False),
         )
 
     def _load_logging_config(self) -> LoggingConfig:
@@ -103,6 +183,19 @@ class ConfigService:
             file_path=get_required_env("LOG_FILE"),
         )
 
+    def _load_cache_config(self) -> CacheConfig:
+        return CacheConfig(
+            ttl=get_optional_int("RESULT_CACHE_TTL", 86400),
+            max_entries=get_optional_int("RESULT_CACHE_MAX_ENTRIES", 10000),
+            persistent=get_optional_bool("RESULT_CACHE_PERSISTENT", False),
+        )
+
+    def _load_archive_config(self) -> ArchiveConfig:
+        return ArchiveConfig(
+            directory=get_optional_env("PAGE_ARCHIVE_DIR", ""),
+            compression_level=get_optional_int("PAGE_ARCHIVE_LEVEL", 3),
+        )
+
     @property
     def database(self) -> DatabaseConfig:
         return self._database_config
@@ -119,5 +212,13 @@ class ConfigService:
     def logging(self) -> LoggingConfig:
         return self._logging_config
 
+    @property
+    def cache(self) -> CacheConfig:
+        return self._cache_config
+
+    @property
+    def archive(self) -> ArchiveConfig:
+        return self._archive_config
+
     def is_development_mode(self) -> bool:
         return self.scraping.disable_scraping
@@ -1,15 +1,24 @@
-from typing import List, Optional, Tuple, Dict, Any
+from typing import Iterator, List, Optional, Tuple, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import text, and_, or_
-from models.models import Pesquisa, PesquisaSPV, Cliente, Estado, Servico
+from sqlalchemy import text, and_, or_, update, delete, func, select, exists, cast, column, values
+from sqlalchemy.dialects.postgresql import insert
+from models.models import Pesquisa, PesquisaSPV, PesquisaSPVProcesso, PesquisaSPVReserva, Cliente, Estado, Servico, Website, ResultadoCache
 from interfaces.database_interface import IDatabaseService
+from interfaces.pesquisa_pendente import PesquisaPendente
+from interfaces.processo_encontrado import ProcessoEncontrado
+from interfaces.resultado_spv import ResultadoSPV
 from services.logging_service import LoggingService
 from datetime import datetime
+import json
 import logging
 
 class DatabaseService(IDatabaseService):
     """Implementação do serviço de banco de dados"""
     
+    # Linhas de pesquisa_spv e de pesquisa_spv_processos por INSERT
+    LOTE_RESULTADOS = 1000
+    LOTE_PROCESSOS = 1000
+    
     def __init__(self, db: Session, logging_service: LoggingService):
         self.db = db
         self.logging_service = logging_service
@@ -46,6 +55,115 @@ class DatabaseService(IDatabaseService):
             )
             return []
 
+    def stream_pesquisas_pendentes(self, filtro: int = 0, tamanho_pagina: int = 100) -> Iterator[PesquisaPendente]:
+        """
+        Todas as pesquisas pendentes do filtro, uma a uma, lidas em páginas
+        
+        Paginação por keyset em (nome, cod_pesquisa) com a função
+        get_pesquisas_pendentes_apos, que só lê da fila e de pesquisas as
+        colunas que a consulta ao tribunal usa. Cada página é lida numa conexão própria e
+        a transação termina logo depois, então a drenagem não segura um
+        snapshot aberto (que impediria o vacuum de spv_fila e pesquisa_spv).
+        
+        A próxima página só é buscada quando a anterior já foi consumida:
+        pesquisas gravadas nesse meio tempo, por este ou outro worker, não
+        voltam, e as que continuam pendentes (com erro) ficam para a próxima
+        varredura.
+        
+        Raises:
+            Exception: erro do banco ao buscar uma página; o iterador não
+                termina em silêncio como se a fila tivesse acabado
+        """
+        query = text("""
+            SELECT cod_pesquisa, nome, cpf, rg
+            FROM get_pesquisas_pendentes_apos(:filtro, :limit, :nome, :cod_pesquisa)
+        """)
+        apos = (None, None)
+        while True:
+            try:
+                with self.db.get_bind().connect() as conexao:
+                    pagina = conexao.execute(query, {
+                        "filtro": filtro,
+                        "limit": tamanho_pagina,
+                        "nome": apos[0],
+                        "cod_pesquisa": apos[1]
+                    }).fetchall()
+            except Exception as e:
+                self.logging_service.log_database_error(
+                    self.logger, 
+                    "stream_pesquisas_pendentes", 
+                    str(e)
+                )
+                raise
+            
+            for cod_pesquisa, nome, cpf, rg in pagina:
+                yield PesquisaPendente(cod_pesquisa, nome, cpf, rg)
+            if len(pagina) < tamanho_pagina:
+                return
+            # Mesma chave de spv_fila.nome: COALESCE(nome_corrigido, nome, '')
+            ultima = pagina[-1]
+            apos = (ultima[1] or "", ultima[0])
+
+    def claim_pesquisas(self, filtro: int, n: int, worker_id: str, prazo_segundos: int = 600) -> List[Tuple]:
+        """
+        Reserva até `n` pesquisas pendentes para o worker
+        
+        As linhas têm o mesmo formato de get_pesquisas_pendentes. A reserva é
+        gravada (commit) antes de retornar, então outros workers já não
+        recebem essas pesquisas até o prazo vencer ou release_pesquisas.
+        """
+        try:
+            query = text("""
+                SELECT * FROM reservar_pesquisas_pendentes(:filtro, :limit, :worker_id, :prazo_segundos)
+            """)
+            
+            pesquisas = self.db.execute(query, {
+                "filtro": filtro,
+                "limit": n,
+                "worker_id": worker_id,
+                "prazo_segundos": prazo_segundos
+            }).fetchall()
+            self.db.commit()
+            return pesquisas
+            
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "claim_pesquisas", 
+                str(e)
+            )
+            self.db.rollback()
+            return []
+
+    def release_pesquisas(self, cod_pesquisas: List[int], filtro: int, worker_id: str) -> int:
+        """
+        Desfaz as reservas do worker (pesquisas com erro voltam a ficar disponíveis)
+        
+        Returns:
+            Número de reservas removidas
+        """
+        if not cod_pesquisas:
+            return 0
+        try:
+            removidas = self.db.execute(
+                delete(PesquisaSPVReserva).where(
+                    PesquisaSPVReserva.cod_pesquisa.in_(cod_pesquisas),
+                    PesquisaSPVReserva.filtro == filtro,
+                    PesquisaSPVReserva.worker_id == worker_id
+                )
+            ).rowcount
+            self.db.commit()
+            return removidas
+            
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "release_pesquisas", 
+                str(e)
+            )
+            self.db.rollback()
+            return 0
+
     def get_pesquisas_pendentes_alternative(
         self, 
         filtro: int = 0, 
@@ -112,42 +230,85 @@ class DatabaseService(IDatabaseService):
         filtro: int, 
         resultado: int, 
         tempo_execucao: float = None,
-        erro: str = None
+        erro: str = None,
+        cache_hit: bool = False,
+        pagina_hash: str = None,
+        processos: Optional[List[ProcessoEncontrado]] = None
     ) -> bool:
         """
         Salva o resultado de uma pesquisa SPV
+        
+        Com `processos` informado (mesmo vazio), os processos gravados antes
+        para o registro são substituídos; None mantém os existentes.
+        """
+        return self._gravar_resultados(
+            [ResultadoSPV(cod_pesquisa, filtro, resultado, tempo_execucao, erro, cache_hit, pagina_hash, processos)],
+            "salvar_resultado_spv"
+        )
+
+    def salvar_resultados_spv(
+        self, 
+        cod_pesquisas: List[int], 
+        filtro: int, 
+        resultado: int, 
+        tempo_execucao: float = None,
+        erro: str = None,
+        cache_hit: bool = False,
+        pagina_hash: str = None,
+        processos: Optional[List[ProcessoEncontrado]] = None
+    ) -> bool:
+        """
+        Salva o mesmo resultado SPV para várias pesquisas em uma única transação
+        
+        Os `processos` são gravados para cada pesquisa do grupo (ver salvar_resultado_spv).
+        """
+        return self._gravar_resultados(
+            [
+                ResultadoSPV(cod_pesquisa, filtro, resultado, tempo_execucao, erro, cache_hit, pagina_hash, processos)
+                for cod_pesquisa in cod_pesquisas
+            ],
+            "salvar_resultados_spv"
+        )
+
+    def gravar_resultados_spv(self, resultados: List[ResultadoSPV]) -> bool:
+        """
+        Grava resultados SPV de pesquisas diferentes em uma única transação
+        """
+        return self._gravar_resultados(resultados, "gravar_resultados_spv")
+
+    def _gravar_resultados(self, resultados: List[ResultadoSPV], operacao: str) -> bool:
         """
+        Grava os resultados com um UPDATE seguido de INSERT no mesmo comando
+        
+        O registro de cada pesquisa é identificado por (cod_pesquisa, cod_spv,
+        filtro). Como pesquisa_spv é particionada por data_execucao, não há
+        restrição única para um ON CONFLICT: o comando (ver
+        _comando_gravar_resultados) atualiza os registros que existem, em
+        qualquer partição, e insere os demais. Antes dele a transação trava
+        cada (cod_pesquisa, filtro) com pg_advisory_xact_lock, então dois
+        workers que gravem a mesma pesquisa ao mesmo tempo se alternam e o
+        segundo atualiza o registro inserido pelo primeiro.
+        """
+        if not resultados:
+            return True
         try:
-            # Verifica se já existe um registro para esta pesquisa e filtro
-            pesquisa_spv = self.db.query(PesquisaSPV).filter(
-                and_(
-                    PesquisaSPV.cod_pesquisa == cod_pesquisa,
-                    PesquisaSPV.cod_spv == 1,
-                    PesquisaSPV.filtro == filtro
-                )
-            ).first()
+            # Uma linha não pode ser alterada duas vezes no mesmo comando; vale o último resultado
+            por_registro = {(resultado.cod_pesquisa, resultado.filtro): resultado for resultado in resultados}
+            com_processos = [resultado for resultado in por_registro.values() if resultado.processos is not None]
+            ids: Dict[Tuple[int, int], int] = {}
 
-            if pesquisa_spv:
-                # Atualiza o registro existente
-                pesquisa_spv.resultado = resultado
-                pesquisa_spv.tempo_execucao = tempo_execucao
-                pesquisa_spv.erro = erro
-                pesquisa_spv.data_execucao = datetime.now()
-            else:
-                # Cria um novo registro
-                pesquisa_spv = PesquisaSPV(
-                    cod_pesquisa=cod_pesquisa,
-                    cod_spv=1,
-                    cod_spv_computador=36,  # Valor padrão do código original
-                    cod_spv_tipo=None,
-                    cod_funcionario=1,  # Sistema automático - usando funcionário existente
-                    filtro=filtro,
-                    website_id=1,
-                    resultado=resultado,
-                    tempo_execucao=tempo_execucao,
-                    erro=erro
-                )
-                self.db.add(pesquisa_spv)
+            self._travar_registros(sorted(por_registro))
+            registros = list(por_registro.values())
+            for inicio in range(0, len(registros), self.LOTE_RESULTADOS):
+                stmt = self._comando_gravar_resultados(registros[inicio:inicio + self.LOTE_RESULTADOS])
+                for cod_pesquisa_spv, cod_pesquisa, filtro in self.db.execute(stmt).all():
+                    ids[(cod_pesquisa, filtro)] = cod_pesquisa_spv
+
+            if com_processos:
+                self._gravar_processos([
+                    (ids[(resultado.cod_pesquisa, resultado.filtro)], resultado.processos)
+                    for resultado in com_processos
+                ])
 
             self.db.commit()
             return True
@@ -155,12 +316,130 @@ class DatabaseService(IDatabaseService):
         except Exception as e:
             self.logging_service.log_database_error(
                 self.logger, 
-                "salvar_resultado_spv", 
+                operacao, 
                 str(e)
             )
             self.db.rollback()
             return False
 
+    def _travar_registros(self, chaves: List[Tuple[int, int]]) -> None:
+        """
+        Trava (cod_pesquisa, filtro) até o fim da transação
+        
+        As travas são tomadas na ordem das chaves, a mesma em todos os
+        workers, para que dois lotes com pesquisas em comum não se
+        bloqueiem mutuamente. O comando de gravação que vem depois já enxerga
+        o que a transação que segurava a trava gravou.
+        """
+        self.db.execute(text("""
+            SELECT pg_advisory_xact_lock(chave.cod_pesquisa, chave.filtro)
+            FROM (
+                SELECT * FROM unnest(CAST(:cod_pesquisas AS integer[]), CAST(:filtros AS integer[]))
+                    AS chave(cod_pesquisa, filtro)
+                ORDER BY cod_pesquisa, filtro
+            ) chave
+        """), {
+            "cod_pesquisas": [cod_pesquisa for cod_pesquisa, _ in chaves],
+            "filtros": [filtro for _, filtro in chaves]
+        })
+
+    @classmethod
+    def _comando_gravar_resultados(cls, resultados: List[ResultadoSPV]):
+        """
+        WITH dados AS (VALUES ...), atualizados AS (UPDATE ... RETURNING),
+        inseridos AS (INSERT ... WHERE NOT EXISTS atualizados RETURNING)
+        
+        Retorna (cod_pesquisa_spv, cod_pesquisa, filtro) de cada registro
+        gravado. data_execucao é o now() do banco, o mesmo relógio de
+        pesquisas.data_entrada, com a qual a fila de pendentes a compara: um
+        relógio da aplicação atrasado faria um resultado novo parecer anterior
+        à entrada da pesquisa. Um UPDATE que muda data_execucao de mês move a
+        linha para a partição nova, mantendo o cod_pesquisa_spv.
+        """
+        tabela = PesquisaSPV.__table__
+        linhas = [cls._linha_pesquisa_spv(resultado) for resultado in resultados]
+        dados = select(values(
+            *(column(nome, tabela.c[nome].type) for nome in cls.COLUNAS_RESULTADO),
+            name="linhas"
+        ).data([tuple(linha[nome] for nome in cls.COLUNAS_RESULTADO) for linha in linhas])).cte("dados")
+        # Colunas só com NULL chegam do VALUES como texto
+        valores = {nome: cast(dados.c[nome], tabela.c[nome].type) for nome in cls.COLUNAS_RESULTADO}
+
+        atualizados = update(tabela).where(
+            tabela.c.cod_pesquisa == dados.c.cod_pesquisa,
+            tabela.c.cod_spv == dados.c.cod_spv,
+            tabela.c.filtro == dados.c.filtro
+        ).values(
+            resultado=valores["resultado"],
+            tempo_execucao=valores["tempo_execucao"],
+            erro=valores["erro"],
+            cache_hit=valores["cache_hit"],
+            pagina_hash=valores["pagina_hash"],
+            data_execucao=func.now(),
+            updated_at=func.now()
+        ).returning(tabela.c.cod_pesquisa_spv, tabela.c.cod_pesquisa, tabela.c.filtro).cte("atualizados")
+
+        inseridos = insert(tabela).from_select(
+            [*cls.COLUNAS_RESULTADO, "data_execucao"],
+            select(*valores.values(), func.now()).where(~exists().where(
+                atualizados.c.cod_pesquisa == dados.c.cod_pesquisa,
+                atualizados.c.filtro == dados.c.filtro
+            ))
+        ).returning(tabela.c.cod_pesquisa_spv, tabela.c.cod_pesquisa, tabela.c.filtro).cte("inseridos")
+
+        return select(atualizados).union_all(select(inseridos))
+
+    def _gravar_processos(self, registros: List[Tuple[int, List[ProcessoEncontrado]]]) -> None:
+        """
+        Substitui os processos dos registros de pesquisa_spv
+        
+        Todos os processos de todos os registros vão em INSERTs de várias
+        linhas (LOTE_PROCESSOS por comando), dentro da transação do resultado.
+        """
+        self.db.execute(delete(PesquisaSPVProcesso).where(
+            PesquisaSPVProcesso.cod_pesquisa_spv.in_([cod_pesquisa_spv for cod_pesquisa_spv, _ in registros])
+        ))
+        linhas = [
+            {
+                "cod_pesquisa_spv": cod_pesquisa_spv,
+                "numero": processo.numero,
+                "classe": processo.classe,
+                "assunto": processo.assunto,
+                "foro": processo.foro,
+                "data_distribuicao": processo.data_distribuicao,
+                "participacao": processo.participacao,
+                "criminal": processo.criminal
+            }
+            for cod_pesquisa_spv, processos in registros
+            for processo in processos
+        ]
+        for inicio in range(0, len(linhas), self.LOTE_PROCESSOS):
+            self.db.execute(insert(PesquisaSPVProcesso).values(linhas[inicio:inicio + self.LOTE_PROCESSOS]))
+
+    # Colunas de pesquisa_spv com valores da aplicação, na ordem de _linha_pesquisa_spv (data_execucao vem do banco)
+    COLUNAS_RESULTADO = (
+        "cod_pesquisa", "cod_spv", "cod_spv_computador", "cod_spv_tipo", "cod_funcionario", "filtro",
+        "website_id", "resultado", "tempo_execucao", "erro", "cache_hit", "pagina_hash"
+    )
+
+    @staticmethod
+    def _linha_pesquisa_spv(resultado: ResultadoSPV) -> Dict[str, Any]:
+        """Valores de um registro de pesquisa_spv do sistema automático"""
+        return {
+            "cod_pesquisa": resultado.cod_pesquisa,
+            "cod_spv": 1,
+            "cod_spv_computador": 36,  # Valor padrão do código original
+            "cod_spv_tipo": None,
+            "cod_funcionario": 1,  # Sistema automático - usando funcionário existente
+            "filtro": resultado.filtro,
+            "website_id": 1,
+            "resultado": resultado.resultado,
+            "tempo_execucao": resultado.tempo_execucao,
+            "erro": resultado.erro,
+            "cache_hit": resultado.cache_hit,
+            "pagina_hash": resultado.pagina_hash
+        }
+
     def marcar_pesquisa_concluida(self, cod_pesquisa: int) -> bool:
         """
         Marca uma pesquisa como concluída
@@ -187,39 +466,28 @@ class DatabaseService(IDatabaseService):
             self.db.rollback()
             return False
 
+    # Chaves de estatisticas_contadores, na ordem do retorno de get_estatisticas_pesquisas
+    CONTADORES = ("pendentes", "concluidas", "nada_consta", "criminal", "civel")
+
     def get_estatisticas_pesquisas(self) -> Dict[str, Any]:
         """
         Retorna estatísticas das pesquisas
+        
+        Lê os contadores mantidos pelos triggers em estatisticas_contadores
+        (algumas linhas por chave), sem contar nas tabelas. Se os contadores
+        ainda não existem, conta nas tabelas; reconciliar_estatisticas os cria.
         """
         try:
-            total_pendentes = self.db.query(Pesquisa).filter(
-                Pesquisa.data_conclusao.is_(None)
-            ).count()
-
-            total_concluidas = self.db.query(Pesquisa).filter(
-                Pesquisa.data_conclusao.isnot(None)
-            ).count()
-
-            nada_consta = self.db.query(PesquisaSPV).filter(
-                PesquisaSPV.resultado == 1
-            ).count()
-
-            criminal = self.db.query(PesquisaSPV).filter(
-                PesquisaSPV.resultado == 2
-            ).count()
-
-            civel = self.db.query(PesquisaSPV).filter(
-                PesquisaSPV.resultado == 5
-            ).count()
-
-            return {
-                "pendentes": total_pendentes,
-                "concluidas": total_concluidas,
-                "nada_consta": nada_consta,
-                "criminal": criminal,
-                "civel": civel,
-                "total": total_pendentes + total_concluidas
-            }
+            query = text("""
+                SELECT chave, SUM(valor) FROM estatisticas_contadores GROUP BY chave
+            """)
+            
+            result = self.db.execute(query)
+            contadores = {chave: int(valor) for chave, valor in result.fetchall()}
+            if not contadores:
+                self.logger.warning("Contadores de estatísticas vazios; contando nas tabelas")
+                contadores = self._contar_estatisticas()
+            return self._montar_estatisticas(contadores)
 
         except Exception as e:
             self.logging_service.log_database_error(
@@ -227,31 +495,352 @@ class DatabaseService(IDatabaseService):
                 "get_estatisticas_pesquisas", 
                 str(e)
             )
-            return {
-                "pendentes": 0,
-                "concluidas": 0,
-                "nada_consta": 0,
-                "criminal": 0,
-                "civel": 0,
-                "total": 0
-            }
+            return self._montar_estatisticas({})
 
-    def get_pesquisas_por_filtro(self, filtro: int) -> int:
+    def reconciliar_estatisticas(self) -> Dict[str, Any]:
         """
-        Retorna o número de pesquisas pendentes por filtro
+        Refaz os contadores das estatísticas a partir das tabelas
+        
+        Segura as gravações em pesquisas e pesquisa_spv enquanto conta
+        (função reconciliar_contadores).
+        
+        Returns:
+            Estatísticas recalculadas (vazio em caso de erro)
+        """
+        try:
+            query = text("""
+                SELECT chave, valor FROM reconciliar_contadores()
+            """)
+            
+            result = self.db.execute(query)
+            contadores = {chave: int(valor) for chave, valor in result.fetchall()}
+            self.db.commit()
+            return self._montar_estatisticas(contadores)
+            
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "reconciliar_estatisticas", 
+                str(e)
+            )
+            self.db.rollback()
+            return {}
+
+    def manter_particoes_pesquisa_spv(self, meses_a_frente: int = 3, meses_retencao: int = 0) -> Dict[str, List[str]]:
+        """
+        Cria as partições mensais de pesquisa_spv dos próximos meses e arquiva
+        as mais antigas que a retenção
+        
+        Args:
+            meses_a_frente: Meses futuros que já devem ter partição
+            meses_retencao: Meses mantidos em pesquisa_spv; as partições
+                anteriores são desanexadas e movidas para o schema arquivo
+                (0 mantém todas)
+        
+        Returns:
+            {"criadas": [...], "arquivadas": [...]} (vazio em caso de erro)
+        """
+        try:
+            criadas = self.db.execute(
+                text("SELECT * FROM criar_particoes_pesquisa_spv(:meses_a_frente)"),
+                {"meses_a_frente": meses_a_frente}
+            ).scalars().all()
+            arquivadas = self.db.execute(
+                text("SELECT * FROM arquivar_particoes_pesquisa_spv(:meses_retencao)"),
+                {"meses_retencao": meses_retencao}
+            ).scalars().all()
+            self.db.commit()
+            return {"criadas": list(criadas), "arquivadas": list(arquivadas)}
+            
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "manter_particoes_pesquisa_spv", 
+                str(e)
+            )
+            self.db.rollback()
+            return {}
+
+    def _contar_estatisticas(self) -> Dict[str, int]:
+        """Contagens direto nas tabelas (cinco varreduras)"""
+        return {
+            "pendentes": self.db.query(Pesquisa).filter(Pesquisa.data_conclusao.is_(None)).count(),
+            "concluidas": self.db.query(Pesquisa).filter(Pesquisa.data_conclusao.isnot(None)).count(),
+            "nada_consta": self.db.query(PesquisaSPV).filter(PesquisaSPV.resultado == 1).count(),
+            "criminal": self.db.query(PesquisaSPV).filter(PesquisaSPV.resultado == 2).count(),
+            "civel": self.db.query(PesquisaSPV).filter(PesquisaSPV.resultado == 5).count()
+        }
+
+    @classmethod
+    def _montar_estatisticas(cls, contadores: Dict[str, int]) -> Dict[str, Any]:
+        estatisticas = {chave: contadores.get(chave, 0) for chave in cls.CONTADORES}
+        estatisticas["total"] = estatisticas["pendentes"] + estatisticas["concluidas"]
+        return estatisticas
+
+    def contar_pesquisas_pendentes(self, aproximado: bool = False) -> Dict[int, int]:
+        """
+        Retorna o número de pesquisas pendentes de cada filtro (0 a 3)
+        
+        A contagem exata faz uma única passada agrupada pelo índice de
+        spv_fila (função contar_pesquisas_pendentes). Com `aproximado`, usa a
+        estimativa do planejador (EXPLAIN) para cada filtro, sem ler a fila:
+        serve para logs e acompanhamento, não para decidir se há trabalho.
+        """
+        try:
+            if aproximado:
+                return {filtro: self._estimar_pesquisas_pendentes(filtro) for filtro in range(4)}
+            
+            query = text("""
+                SELECT filtro, pendentes FROM contar_pesquisas_pendentes()
+            """)
+            
+            result = self.db.execute(query)
+            return {filtro: pendentes for filtro, pendentes in result.fetchall()}
+            
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "contar_pesquisas_pendentes", 
+                str(e)
+            )
+            return {}
+
+    def _estimar_pesquisas_pendentes(self, filtro: int) -> int:
+        """Linhas estimadas pelo planejador para as pendentes do filtro"""
+        query = text("""
+            EXPLAIN (FORMAT JSON) SELECT 1 FROM spv_fila WHERE filtro = :filtro
+        """)
+        
+        plano = self.db.execute(query, {"filtro": filtro}).scalar()
+        if isinstance(plano, str):
+            plano = json.loads(plano)
+        return int(plano[0]["Plan"]["Plan Rows"])
+
+    def existem_pesquisas_pendentes(self, filtro: int) -> bool:
+        """
+        Verifica se o filtro tem alguma pesquisa pendente
+        
+        Para na primeira linha do filtro no índice de spv_fila. Em caso de
+        erro retorna True, deixando a busca das páginas decidir.
         """
         try:
             query = text("""
-                SELECT COUNT(*) FROM get_pesquisas_pendentes(:filtro, 1000000, 0)
+                SELECT EXISTS (SELECT 1 FROM spv_fila WHERE filtro = :filtro)
             """)
             
             result = self.db.execute(query, {"filtro": filtro})
-            return result.scalar() or 0
+            return bool(result.scalar())
+            
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "existem_pesquisas_pendentes", 
+                str(e)
+            )
+            return True
+
+    def reconstruir_fila_pendentes(self) -> Dict[int, int]:
+        """
+        Refaz a fila das pendentes (spv_fila) a partir das tabelas
+        
+        A fila é mantida por triggers em pesquisas e pesquisa_spv; refazer só
+        é preciso depois de cargas com os triggers desativados. As gravações
+        nessas tabelas esperam enquanto a fila é refeita.
+        
+        Returns:
+            Pendentes de cada filtro depois de refeita (vazio em caso de erro)
+        """
+        try:
+            result = self.db.execute(text("""
+                SELECT filtro, pendentes FROM reconstruir_spv_fila()
+            """))
+            pendentes = {filtro: quantidade for filtro, quantidade in result.fetchall()}
+            self.db.commit()
+            return pendentes
             
         except Exception as e:
             self.logging_service.log_database_error(
                 self.logger, 
-                "get_pesquisas_por_filtro", 
+                "reconstruir_fila_pendentes", 
+                str(e)
+            )
+            self.db.rollback()
+            return {}
+
+    def get_pesquisas_por_filtro(self, filtro: int) -> int:
+        """
+        Retorna o número de pesquisas pendentes por filtro
+        """
+        return self.contar_pesquisas_pendentes().get(filtro, 0)
+
+    def get_configuracao_website(self, website_type: str) -> Dict[str, Any]:
+        """
+        Retorna a configuração JSON do website ativo do tipo informado
+        """
+        try:
+            website = self.db.query(Website).filter(
+                Website.tipo == website_type,
+                Website.ativo.is_(True)
+            ).first()
+
+            return (website.configuracao or {}) if website else {}
+
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "get_configuracao_website", 
+                str(e)
+            )
+            self.db.rollback()
+            return {}
+
+    def get_paginas_arquivadas(self, limit: int, apos: int = 0) -> List[Tuple[int, int, int, str]]:
+        """
+        Retorna (cod_pesquisa_spv, filtro, resultado, pagina_hash) dos resultados
+        com página arquivada e código maior que `apos`, em ordem de código
+        """
+        try:
+            return [
+                tuple(linha) for linha in self.db.query(
+                    PesquisaSPV.cod_pesquisa_spv,
+                    PesquisaSPV.filtro,
+                    PesquisaSPV.resultado,
+                    PesquisaSPV.pagina_hash
+                ).filter(
+                    PesquisaSPV.pagina_hash.isnot(None),
+                    PesquisaSPV.cod_pesquisa_spv > apos
+                ).order_by(PesquisaSPV.cod_pesquisa_spv).limit(limit).all()
+            ]
+
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "get_paginas_arquivadas", 
                 str(e)
             )
-            return 0 
\ No newline at end of file
+            self.db.rollback()
+            return []
+
+    def atualizar_resultados_spv(self, resultados: Dict[int, int]) -> int:
+        """
+        Atualiza o resultado de registros de pesquisa_spv em uma única
+        transação (UPDATE em lote pela chave primária)
+        """
+        if not resultados:
+            return 0
+        try:
+            self.db.execute(
+                update(PesquisaSPV),
+                [
+                    {"cod_pesquisa_spv": cod_pesquisa_spv, "resultado": resultado}
+                    for cod_pesquisa_spv, resultado in resultados.items()
+                ]
+            )
+            self.db.commit()
+            return len(resultados)
+
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "atualizar_resultados_spv", 
+                str(e)
+            )
+            self.db.rollback()
+            return 0
+
+    def get_versao_website(self, website_type: str) -> Optional[Tuple[int, datetime]]:
+        """
+        Retorna (website_id, updated_at) do website ativo do tipo informado,
+        usado para saber se a configuração mudou sem ler o JSON
+        """
+        try:
+            versao = self.db.query(Website.website_id, Website.updated_at).filter(
+                Website.tipo == website_type,
+                Website.ativo.is_(True)
+            ).first()
+
+            return (versao[0], versao[1]) if versao else None
+
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "get_versao_website", 
+                str(e)
+            )
+            self.db.rollback()
+            return None
+
+    def get_resultado_cache(
+        self,
+        website: str,
+        filtro: int,
+        documento: str,
+        validade: datetime
+    ) -> Optional[Tuple[int, datetime, Optional[List[ProcessoEncontrado]]]]:
+        """
+        Retorna (resultado, data_resultado, processos) do cache persistente se
+        o resultado for posterior a `validade`
+        
+        processos é None nas entradas gravadas antes da coluna existir.
+        """
+        try:
+            cache = self.db.query(ResultadoCache).filter(
+                ResultadoCache.website == website,
+                ResultadoCache.filtro == filtro,
+                ResultadoCache.documento == documento,
+                ResultadoCache.data_resultado >= validade
+            ).first()
+
+            if cache is None:
+                return None
+            processos = None
+            if cache.processos is not None:
+                processos = [ProcessoEncontrado.de_json(dados) for dados in cache.processos]
+            return cache.resultado, cache.data_resultado, processos
+
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "get_resultado_cache", 
+                str(e)
+            )
+            self.db.rollback()
+            return None
+
+    def salvar_resultado_cache(
+        self,
+        website: str,
+        filtro: int,
+        documento: str,
+        resultado: int,
+        processos: List[ProcessoEncontrado]
+    ) -> bool:
+        """
+        Grava ou atualiza o resultado e os processos de um documento no cache persistente
+        """
+        try:
+            agora = datetime.now()
+            processos_json = [processo.para_json() for processo in processos]
+            stmt = insert(ResultadoCache).values(
+                website=website,
+                filtro=filtro,
+                documento=documento,
+                resultado=resultado,
+                processos=processos_json,
+                data_resultado=agora
+            ).on_conflict_do_update(
+                index_elements=["website", "filtro", "documento"],
+                set_={"resultado": resultado, "processos": processos_json, "data_resultado": agora}
+            )
+            self.db.execute(stmt)
+            self.db.commit()
+            return True
+
+        except Exception as e:
+            self.logging_service.log_database_error(
+                self.logger, 
+                "salvar_resultado_cache", 
+                str(e)
+            )
+            self.db.rollback()
+            return False
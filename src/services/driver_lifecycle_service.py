@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+from services.logging_service import LoggingService
+
+@dataclass
+class DriverCounters:
+    """Contadores do ciclo de vida de um driver"""
+    inicios: int = 0
+    reciclagens: int = 0
+    reinicios: int = 0
+    paginas: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "inicios": self.inicios,
+            "reciclagens": self.reciclagens,
+            "reinicios": self.reinicios,
+            "paginas": self.paginas
+        }
+
+class DriverLifecycleManager:
+    """
+    Gerencia o ciclo de vida do driver de um web scraper
+
+    - Mantém o driver aberto entre pesquisas e ciclos
+    - Recicla o driver após `max_paginas` páginas ou quando a memória (RSS)
+      do driver e do navegador passa de `max_rss_mb`
+    - Reinicia o driver quando a sessão do navegador morre
+    """
+
+    # A memória é lida do /proc a cada N páginas
+    INTERVALO_VERIFICACAO_RSS = 10
+
+    def __init__(self,
+                 criar_scraper: Callable[[], Any],
+                 driver_path: str = None,
+                 max_paginas: int = 200,
+                 max_rss_mb: int = 1500,
+                 logging_service: LoggingService = None):
+        """
+        Args:
+            criar_scraper: Função que cria um WebScraperBase ainda sem driver
+            driver_path: Caminho do executável do WebDriver
+            max_paginas: Páginas por driver antes da reciclagem (0 desativa)
+            max_rss_mb: Memória máxima do driver em MB (0 desativa)
+            logging_service: Serviço de logging
+        """
+        self.criar_scraper = criar_scraper
+        self.driver_path = driver_path
+        self.max_paginas = max_paginas
+        self.max_rss_mb = max_rss_mb
+        self.scraper = None
+        self.counters = DriverCounters()
+        self._paginas_driver = 0
+        self._lock = threading.Lock()
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+
+    def obter_scraper(self) -> Any:
+        """Retorna o scraper com driver pronto, iniciando ou reciclando se necessário"""
+        with self._lock:
+            if self.scraper is None:
+                self._iniciar()
+            elif self._precisa_reciclar():
+                self._fechar()
+                self._iniciar()
+                self.counters.reciclagens += 1
+            return self.scraper
+
+    def registrar_pagina(self) -> None:
+        """Registra uma página carregada pelo driver atual"""
+        with self._lock:
+            self._paginas_driver += 1
+            self.counters.paginas += 1
+
+    def sessao_ativa(self) -> bool:
+        """Verifica se a sessão do navegador ainda responde"""
+        scraper = self.scraper
+        if scraper is None or scraper.driver is None:
+            return False
+        try:
+            scraper.driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def reiniciar(self) -> Any:
+        """Substitui um driver cuja sessão morreu"""
+        with self._lock:
+            self.logger.warning("Sessão do navegador encerrada inesperadamente, reiniciando driver")
+            self._fechar()
+            self._iniciar()
+            self.counters.reinicios += 1
+            return self.scraper
+
+    def encerrar(self) -> None:
+        """Fecha o driver atual"""
+        with self._lock:
+            self._fechar()
+
+    def rss_mb(self) -> float:
+        """Memória residente do WebDriver e de todos os processos do navegador, em MB"""
+        try:
+            pid = self.scraper.driver.service.process.pid
+            total_bytes = sum(self._rss_processo(p) for p in self._arvore_processos(pid))
+            return total_bytes / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    def get_counters(self) -> Dict[str, int]:
+        """Retorna os contadores de inícios, reciclagens, reinícios e páginas"""
+        with self._lock:
+            return self.counters.to_dict()
+
+    def _precisa_reciclar(self) -> bool:
+        if self.max_paginas and self._paginas_driver >= self.max_paginas:
+            self.logger.info(f"Reciclando driver após {self._paginas_driver} páginas")
+            return True
+
+        verificar_rss = self._paginas_driver and self._paginas_driver % self.INTERVALO_VERIFICACAO_RSS == 0
+        if self.max_rss_mb and verificar_rss:
+            rss = self.rss_mb()
+            if rss > self.max_rss_mb:
+                self.logger.info(f"Reciclando driver com {rss:.0f} MB de memória")
+                return True
+
+        return False
+
+    def _iniciar(self) -> None:
+        scraper = self.criar_scraper()
+        scraper.setup_driver(self.driver_path)
+        self.scraper = scraper
+        self._paginas_driver = 0
+        self.counters.inicios += 1
+
+    def _fechar(self) -> None:
+        if self.scraper is not None:
+            self.scraper.close_driver()
+            self.scraper = None
+
+    @staticmethod
+    def _arvore_processos(pid: int) -> List[int]:
+        """Retorna o pid e todos os descendentes (Linux)"""
+        pids = [pid]
+        pendentes = [pid]
+        while pendentes:
+            atual = pendentes.pop()
+            filhos = []
+            task_dir = f"/proc/{atual}/task"
+            try:
+                for tid in os.listdir(task_dir):
+                    with open(f"{task_dir}/{tid}/children") as arquivo:
+                        filhos.extend(int(filho) for filho in arquivo.read().split())
+            except OSError:
+                # Processo encerrou durante a leitura
+                continue
+            pids.extend(filhos)
+            pendentes.extend(filhos)
+        return pids
+
+    @staticmethod
+    def _rss_processo(pid: int) -> int:
+        """Memória residente de um processo em bytes"""
+        try:
+            with open(f"/proc/{pid}/statm") as arquivo:
+                return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return 0
@@ -0,0 +1,148 @@
+import logging
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from interfaces.web_scraper_interface import IWebScraperService
+from services.logging_service import LoggingService
+from services.retry_service import TransientScrapingError
+
+class HttpWebScraperService(IWebScraperService):
+    """
+    Pesquisa no e-SAJ (TJSP) por requisições HTTP, sem navegador
+
+    A consulta `cpopg` é um formulário GET simples: a sessão HTTP abre o
+    formulário uma vez para obter o cookie de sessão e reaproveita a mesma
+    conexão keep-alive em todas as pesquisas. Quando a resposta não é uma
+    página de resultado reconhecível, a pesquisa é repetida no serviço de
+    fallback (Selenium).
+    """
+
+    BASE_URL = "https://esaj.tjsp.jus.br/cpopg"
+
+    # Trechos do HTML presentes apenas em páginas de resultado
+    MARCADORES_RESULTADO = (
+        'id="mensagemRetorno"',
+        'id="listagemDeProcessos"',
+        'id="numeroProcesso"'
+    )
+
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
+        "Accept": "text/html,application/xhtml+xml",
+        "Accept-Language": "pt-BR,pt;q=0.9"
+    }
+
+    def __init__(self,
+                 base_url: str = BASE_URL,
+                 timeout: int = 30,
+                 pool_maxsize: int = 10,
+                 fallback: Optional[IWebScraperService] = None,
+                 logging_service: LoggingService = None):
+        """
+        Args:
+            base_url: URL base da consulta de 1º grau
+            timeout: Tempo máximo de cada requisição em segundos
+            pool_maxsize: Conexões keep-alive mantidas com o tribunal
+            fallback: Serviço usado quando a pesquisa HTTP falha
+            logging_service: Serviço de logging
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.fallback = fallback
+        self.session: Optional[requests.Session] = None
+        self.logging_service = logging_service
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+
+    def setup_driver(self) -> None:
+        """Cria a sessão HTTP e obtém o cookie de sessão do e-SAJ"""
+        try:
+            if self.session is None:
+                self.session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                self.session.mount("http://", adapter)
+                self.session.mount("https://", adapter)
+                self.session.headers.update(self.HEADERS)
+
+            self._abrir_sessao()
+        except Exception as e:
+            self.logger.error(f"Erro ao configurar sessão HTTP: {e}")
+            raise
+
+    def close_driver(self) -> None:
+        """Encerra a sessão HTTP e o serviço de fallback"""
+        if self.session:
+            self.session.close()
+            self.session = None
+        if self.fallback:
+            self.fallback.close_driver()
+
+    def pesquisar(self, filtro: int, documento: str) -> str:
+        """Executa uma pesquisa no e-SAJ, recorrendo ao fallback em caso de falha"""
+        params = self._parametros_pesquisa(filtro, documento)
+
+        try:
+            if not self.session:
+                self.setup_driver()
+
+            page_source = self._consultar(params)
+            if page_source is None:
+                # Sessão expirada: abre uma nova e tenta mais uma vez
+                self._abrir_sessao()
+                page_source = self._consultar(params)
+
+            if page_source is not None:
+                return page_source
+
+            self.logger.warning(f"Resposta do e-SAJ não reconhecida para o filtro {filtro}")
+
+        except Exception as e:
+            self.logger.error(f"Erro na pesquisa HTTP: {e}")
+
+        return self._pesquisar_fallback(filtro, documento)
+
+    def _parametros_pesquisa(self, filtro: int, documento: str) -> Dict[str, str]:
+        """Monta os parâmetros do formulário de consulta para o filtro"""
+        params = {
+            "conversationId": "",
+            "dadosConsulta.valorConsulta": documento,
+            "cdForo": "-1"
+        }
+        if filtro in [0, 1, 3]:  # CPF e RG
+            params["cbPesquisa"] = "DOCPARTE"
+        elif filtro == 2:  # Nome
+            params["cbPesquisa"] = "NMPARTE"
+            params["chNmCompleto"] = "true"
+        else:
+            raise ValueError(f"Filtro {filtro} não suportado")
+        return params
+
+    def _abrir_sessao(self) -> None:
+        """Abre o formulário de consulta para receber um novo cookie de sessão"""
+        self.session.cookies.clear()
+        response = self.session.get(f"{self.base_url}/open.do", timeout=self.timeout)
+        response.raise_for_status()
+
+    def _consultar(self, params: Dict[str, str]) -> Optional[str]:
+        """
+        Envia a consulta
+
+        Returns:
+            HTML da página de resultado, ou None se o e-SAJ devolveu outra
+            página (ex: formulário de uma sessão expirada)
+        """
+        response = self.session.get(f"{self.base_url}/search.do", params=params, timeout=self.timeout)
+        response.raise_for_status()
+
+        page_source = response.text
+        if any(marcador in page_source for marcador in self.MARCADORES_RESULTADO):
+            return page_source
+        return None
+
+    def _pesquisar_fallback(self, filtro: int, documento: str) -> str:
+        """Repete a pesquisa no serviço de fallback, se houver"""
+        if not self.fallback:
+            raise TransientScrapingError("Resposta do e-SAJ não reconhecida e sem fallback configurado")
+        self.logger.info(f"Usando fallback para a pesquisa com filtro {filtro}")
+        return self.fallback.pesquisar(filtro, documento)
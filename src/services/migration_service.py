@@ -0,0 +1,102 @@
+import logging
+import os
+import re
+from typing import List, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from services.logging_service import LoggingService
+
+# Chave do advisory lock que impede dois runners de aplicarem a mesma migração
+CHAVE_LOCK = 7_212_001
+
+class MigrationError(Exception):
+    """Falha ao aplicar uma migração (a transação dela foi desfeita)"""
+
+class MigrationRunner:
+    """
+    Aplica as migrações versionadas de storage/migrations
+
+    Cada arquivo `NNNN_descricao.sql` é aplicado uma única vez, em ordem de
+    versão, na sua própria transação, e registrado em schema_migrations.
+    Bancos criados pelo schema.sql já têm registradas as migrações que o
+    arquivo incorpora.
+    """
+
+    PADRAO_ARQUIVO = re.compile(r"^(\d{4})_[\w-]+\.sql$")
+
+    def __init__(self, db: Session, diretorio: str, logging_service: LoggingService = None):
+        self.db = db
+        self.diretorio = diretorio
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+
+    def migracoes(self) -> List[Tuple[str, str]]:
+        """(versão, nome do arquivo) de todas as migrações do diretório, em ordem"""
+        encontradas = []
+        for nome in os.listdir(self.diretorio):
+            correspondencia = self.PADRAO_ARQUIVO.match(nome)
+            if correspondencia:
+                encontradas.append((correspondencia.group(1), nome))
+        encontradas.sort()
+        versoes = [versao for versao, _ in encontradas]
+        repetidas = sorted({versao for versao in versoes if versoes.count(versao) > 1})
+        if repetidas:
+            raise MigrationError(f"Versões repetidas em {self.diretorio}: {', '.join(repetidas)}")
+        return encontradas
+
+    def aplicadas(self) -> Set[str]:
+        """Versões registradas em schema_migrations"""
+        self._criar_tabela()
+        result = self.db.execute(text("SELECT versao FROM schema_migrations"))
+        return {versao for (versao,) in result.fetchall()}
+
+    def pendentes(self) -> List[Tuple[str, str]]:
+        aplicadas = self.aplicadas()
+        return [(versao, nome) for versao, nome in self.migracoes() if versao not in aplicadas]
+
+    def aplicar(self) -> List[str]:
+        """
+        Aplica as migrações pendentes
+
+        Para na primeira que falhar, com MigrationError; as anteriores
+        continuam aplicadas.
+
+        Returns:
+            Nomes dos arquivos aplicados
+        """
+        aplicados = []
+        for versao, nome in self.pendentes():
+            with open(os.path.join(self.diretorio, nome), encoding="utf-8") as arquivo:
+                sql = arquivo.read()
+            try:
+                self.db.execute(text("SELECT pg_advisory_xact_lock(:chave)"), {"chave": CHAVE_LOCK})
+                # Outro runner pode ter aplicado enquanto esperávamos o lock
+                ja_aplicada = self.db.execute(
+                    text("SELECT 1 FROM schema_migrations WHERE versao = :versao"), {"versao": versao}
+                ).first()
+                if ja_aplicada:
+                    self.db.rollback()
+                    continue
+                # O arquivo vai inteiro ao driver, sem tratar ":" e "%" como parâmetros
+                self.db.connection().exec_driver_sql(sql, execution_options={"no_parameters": True})
+                self.db.execute(
+                    text("INSERT INTO schema_migrations (versao, nome) VALUES (:versao, :nome)"),
+                    {"versao": versao, "nome": nome}
+                )
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                raise MigrationError(f"Erro ao aplicar {nome}: {e}") from e
+            self.logger.info(f"Migração aplicada: {nome}")
+            aplicados.append(nome)
+        return aplicados
+
+    def _criar_tabela(self) -> None:
+        """Cria schema_migrations em bancos anteriores ao controle de migrações"""
+        self.db.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                versao VARCHAR(4) PRIMARY KEY,
+                nome VARCHAR(200) NOT NULL,
+                aplicada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        self.db.commit()
@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional
+import zstandard
+from services.logging_service import LoggingService
+
+class PageArchive:
+    """
+    Arquivo local das páginas de resultado, endereçado pelo conteúdo
+
+    Cada página é guardada comprimida com zstd em
+    `<diretorio>/<2 primeiros hex>/<sha256>.zst`. Páginas idênticas (como as
+    de "nada consta") têm o mesmo hash e ocupam um único arquivo. A escrita
+    vai para um arquivo temporário renomeado no final, então processos e
+    threads podem arquivar ao mesmo tempo.
+    """
+
+    EXTENSAO = ".zst"
+
+    def __init__(self, diretorio: str, nivel_compressao: int = 3, logging_service: LoggingService = None):
+        self.diretorio = diretorio
+        self.nivel_compressao = nivel_compressao
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+        # Compressores zstd não podem ser usados por duas threads ao mesmo tempo
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._arquivadas = 0
+        self._deduplicadas = 0
+        os.makedirs(diretorio, exist_ok=True)
+
+    @staticmethod
+    def calcular_hash(page_source: str) -> str:
+        """sha256 (hex) do conteúdo da página em UTF-8"""
+        return hashlib.sha256(page_source.encode("utf-8")).hexdigest()
+
+    def caminho(self, pagina_hash: str) -> str:
+        return os.path.join(self.diretorio, pagina_hash[:2], pagina_hash + self.EXTENSAO)
+
+    def guardar(self, page_source: str) -> Optional[str]:
+        """
+        Arquiva a página
+
+        Returns:
+            Hash da página, ou None se a página está vazia ou não foi possível gravar
+        """
+        if not page_source:
+            return None
+        try:
+            pagina_hash = self.calcular_hash(page_source)
+            caminho = self.caminho(pagina_hash)
+            if os.path.exists(caminho):
+                with self._lock:
+                    self._deduplicadas += 1
+                return pagina_hash
+
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            dados = self._compressor().compress(page_source.encode("utf-8"))
+            temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporario, "wb") as arquivo:
+                arquivo.write(dados)
+            os.replace(temporario, caminho)
+
+            with self._lock:
+                self._arquivadas += 1
+            return pagina_hash
+
+        except OSError as e:
+            self.logger.error(f"Erro ao arquivar página: {e}")
+            return None
+
+    def ler(self, pagina_hash: str) -> Optional[str]:
+        """Conteúdo da página arquivada, ou None se o hash não está no arquivo"""
+        try:
+            with open(self.caminho(pagina_hash), "rb") as arquivo:
+                dados = arquivo.read()
+        except FileNotFoundError:
+            return None
+        return self._descompressor().decompress(dados).decode("utf-8")
+
+    def contem(self, pagina_hash: str) -> bool:
+        return os.path.exists(self.caminho(pagina_hash))
+
+    def hashes(self) -> Iterator[str]:
+        """Hashes de todas as páginas arquivadas"""
+        for subdiretorio in sorted(os.listdir(self.diretorio)):
+            caminho = os.path.join(self.diretorio, subdiretorio)
+            if not os.path.isdir(caminho):
+                continue
+            for nome in sorted(os.listdir(caminho)):
+                if nome.endswith(self.EXTENSAO):
+                    yield nome[:-len(self.EXTENSAO)]
+
+    def get_estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "paginas_arquivadas": self._arquivadas,
+                "paginas_deduplicadas": self._deduplicadas
+            }
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        if not hasattr(self._local, "compressor"):
+            self._local.compressor = zstandard.ZstdCompressor(level=self.nivel_compressao)
+        return self._local.compressor
+
+    def _descompressor(self) -> zstandard.ZstdDecompressor:
+        if not hasattr(self._local, "descompressor"):
+            self._local.descompressor = zstandard.ZstdDecompressor()
+        return self._local.descompressor
@@ -0,0 +1,194 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from tqdm import tqdm
+from interfaces.processo_encontrado import ProcessoEncontrado
+from interfaces.web_scraper_interface import IResultAnalyzer
+from services.logging_service import LoggingService
+from services.page_archive_service import PageArchive
+
+@dataclass
+class PaginaColetada:
+    """Página baixada por um worker de scraping, a caminho da análise e da gravação"""
+    cod_pesquisas: List[int]
+    documento_normalizado: str
+    tempo_inicio: float
+    page_source: Optional[str] = None
+    resultado: Optional[int] = None  # já conhecido quando veio do cache
+    cache_hit: bool = False
+    pagina_hash: Optional[str] = None
+    processos: Optional[List[ProcessoEncontrado]] = None  # da análise ou, com cache_hit, do cache
+
+# Arquivos de páginas abertos em cada processo de análise
+_arquivos: Dict[str, PageArchive] = {}
+
+def analisar_pagina(analisador: IResultAnalyzer, page_source: str,
+                    arquivo: Optional[Tuple[str, int]] = None
+                    ) -> Tuple[int, List[ProcessoEncontrado], Optional[str]]:
+    """
+    Executada no processo de análise: classifica a página e, se houver
+    arquivo de páginas (diretório, nível de compressão), guarda a página
+
+    Returns:
+        (resultado, processos encontrados, hash da página arquivada)
+    """
+    resultado, processos = analisador.analisar_processos(page_source)
+    pagina_hash = None
+    if arquivo is not None:
+        diretorio, nivel_compressao = arquivo
+        if diretorio not in _arquivos:
+            _arquivos[diretorio] = PageArchive(diretorio, nivel_compressao)
+        pagina_hash = _arquivos[diretorio].guardar(page_source)
+    return resultado, processos, pagina_hash
+
+_FIM = object()
+
+class AnalysisPipeline:
+    """
+    Pesquisa em três estágios
+
+    1. Coleta: threads de scraping só baixam o HTML e o colocam em uma fila
+       limitada (`tamanho_fila`)
+    2. Análise: um despachante envia as páginas a um pool de processos, com
+       no máximo `2 * processos` análises em andamento
+    3. Gravação: uma única thread grava os resultados no banco
+
+    Os navegadores só esperam quando a fila enche, isto é, quando a análise
+    ou o banco estão mais lentos que o tribunal.
+    """
+
+    def __init__(self, processos: int, tamanho_fila: int = 100, arquivo: Optional[PageArchive] = None,
+                 logging_service: LoggingService = None):
+        self.processos = processos
+        self.tamanho_fila = tamanho_fila
+        self.arquivo = (arquivo.diretorio, arquivo.nivel_compressao) if arquivo is not None else None
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _obter_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # "spawn": os processos não herdam as threads e locks do scraping
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processos,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def processar(self,
+                  itens: Iterable[Any],
+                  coletar: Callable[[Any], Optional[PaginaColetada]],
+                  gravar: Callable[[PaginaColetada], int],
+                  analisador: IResultAnalyzer,
+                  workers: int = 1,
+                  deve_parar: Optional[Callable[[], bool]] = None,
+                  descricao: str = "") -> int:
+        """
+        Processa os itens pelos três estágios
+
+        Args:
+            itens: Itens de trabalho entregues a `coletar`
+            coletar: Baixa a página de um item (None se não há nada a gravar);
+                páginas com `resultado` preenchido vão direto para a gravação
+            gravar: Grava uma página analisada e retorna o número de pesquisas salvas
+            analisador: Analisador enviado aos processos (ver IResultAnalyzer.copia_para_processo)
+            workers: Threads de coleta (um por driver)
+            deve_parar: Interrompe a coleta de novos itens quando retorna True
+
+        Returns:
+            Número de pesquisas salvas
+        """
+        executor = self._obter_executor()
+        fila_analise: "queue.Queue[Any]" = queue.Queue(maxsize=self.tamanho_fila)
+        fila_gravacao: "queue.Queue[Any]" = queue.Queue()
+        vagas_analise = threading.BoundedSemaphore(2 * self.processos)
+        em_analise = threading.Condition()
+        pendentes = [0]
+        salvos = [0]
+
+        def concluir_analise(pagina: PaginaColetada, future: Future) -> None:
+            try:
+                pagina.resultado, pagina.processos, pagina.pagina_hash = future.result()
+                pagina.page_source = None
+                fila_gravacao.put(pagina)
+            except Exception as e:
+                self.logger.error(f"Erro ao analisar as pesquisas {pagina.cod_pesquisas}: {e}")
+            finally:
+                vagas_analise.release()
+                with em_analise:
+                    pendentes[0] -= 1
+                    em_analise.notify_all()
+
+        def despachar() -> None:
+            while True:
+                pagina = fila_analise.get()
+                if pagina is _FIM:
+                    break
+                if pagina.resultado is not None:
+                    fila_gravacao.put(pagina)
+                    continue
+                vagas_analise.acquire()
+                with em_analise:
+                    pendentes[0] += 1
+                try:
+                    future = executor.submit(analisar_pagina, analisador, pagina.page_source, self.arquivo)
+                except Exception as e:
+                    self.logger.error(f"Erro ao enviar as pesquisas {pagina.cod_pesquisas} para análise: {e}")
+                    vagas_analise.release()
+                    with em_analise:
+                        pendentes[0] -= 1
+                    continue
+                future.add_done_callback(lambda f, pagina=pagina: concluir_analise(pagina, f))
+
+            with em_analise:
+                em_analise.wait_for(lambda: pendentes[0] == 0)
+            fila_gravacao.put(_FIM)
+
+        def gravar_resultados() -> None:
+            while True:
+                pagina = fila_gravacao.get()
+                if pagina is _FIM:
+                    return
+                try:
+                    salvos[0] += gravar(pagina)
+                except Exception as e:
+                    self.logger.error(f"Erro ao gravar as pesquisas {pagina.cod_pesquisas}: {e}")
+
+        def coletar_item(item: Any) -> None:
+            if deve_parar is not None and deve_parar():
+                return
+            try:
+                pagina = coletar(item)
+            except Exception as e:
+                self.logger.error(f"Erro ao coletar página: {e}")
+                return
+            if pagina is not None:
+                fila_analise.put(pagina)
+
+        despachante = threading.Thread(target=despachar, name="spv-analise", daemon=True)
+        gravador = threading.Thread(target=gravar_resultados, name="spv-gravacao", daemon=True)
+        despachante.start()
+        gravador.start()
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="spv-scraper") as coleta:
+                futures = [coleta.submit(coletar_item, item) for item in itens]
+                for future in tqdm(as_completed(futures), total=len(futures), desc=descricao):
+                    future.result()
+        finally:
+            fila_analise.put(_FIM)
+            despachante.join()
+            gravador.join()
+
+        return salvos[0]
+
+    def encerrar(self) -> None:
+        """Encerra o pool de processos de análise"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
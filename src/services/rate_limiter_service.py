@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from services.logging_service import LoggingService
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+@dataclass
+class RateLimitConfig:
+    """Limite de requisições de um website"""
+    requests_per_second: float
+    burst: int = 1
+
+    @property
+    def ilimitado(self) -> bool:
+        return self.requests_per_second <= 0
+
+    @classmethod
+    def from_website(cls, configuracao: Optional[Dict[str, Any]], delay_padrao: float) -> "RateLimitConfig":
+        """
+        Lê o limite de `websites.configuracao`:
+
+            {"rate_limit": {"requests_per_second": 0.5, "burst": 2}}
+
+        Sem essa chave, usa uma requisição a cada `delay_padrao` segundos
+        (DELAY_BETWEEN_REQUESTS).
+        """
+        rate_limit = configuracao.get("rate_limit") if isinstance(configuracao, dict) else None
+        rate_limit = rate_limit or {}
+        if rate_limit.get("requests_per_second") is not None:
+            requests_per_second = float(rate_limit["requests_per_second"])
+        else:
+            requests_per_second = 1.0 / delay_padrao if delay_padrao > 0 else 0.0
+        burst = max(int(rate_limit.get("burst", 1)), 1)
+        return cls(requests_per_second=requests_per_second, burst=burst)
+
+class RateLimiter(ABC):
+    """
+    Token bucket com reserva
+
+    Cada chamada retira uma ficha; se o balde estiver vazio o saldo fica
+    negativo e a chamada espera até a sua ficha ser reposta. Assim as
+    esperas ficam em fila e a taxa nunca passa de `requests_per_second`,
+    independente de quantos workers disputam o balde.
+    """
+
+    def acquire(self) -> float:
+        """Bloqueia até haver uma ficha; retorna o tempo esperado em segundos"""
+        espera = self._reservar()
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    # _reservar faz I/O bloqueante (lock de arquivo) e não roda no event loop
+    reserva_bloqueante = False
+
+    async def acquire_async(self) -> float:
+        """Versão assíncrona de acquire"""
+        if self.reserva_bloqueante:
+            espera = await asyncio.to_thread(self._reservar)
+        else:
+            espera = self._reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        return espera
+
+    @abstractmethod
+    def _reservar(self) -> float:
+        """Retira uma ficha e retorna quanto tempo esperar por ela"""
+        pass
+
+    @staticmethod
+    def _retirar_ficha(config: RateLimitConfig, fichas: float, ultimo: float, agora: float):
+        """Repõe as fichas desde `ultimo`, retira uma e retorna (fichas, espera)"""
+        decorrido = max(agora - ultimo, 0.0)
+        fichas = min(float(config.burst), fichas + decorrido * config.requests_per_second) - 1
+        espera = -fichas / config.requests_per_second if fichas < 0 else 0.0
+        return fichas, espera
+
+class SemLimite(RateLimiter):
+    """Limiter que nunca espera (DELAY_BETWEEN_REQUESTS=0 sem rate_limit no website)"""
+
+    def _reservar(self) -> float:
+        return 0.0
+
+class TokenBucket(RateLimiter):
+    """Token bucket compartilhado pelas threads e tarefas de um processo"""
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self._fichas = float(config.burst)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reservar(self) -> float:
+        with self._lock:
+            agora = time.monotonic()
+            self._fichas, espera = self._retirar_ficha(self.config, self._fichas, self._ultimo, agora)
+            self._ultimo = agora
+            return espera
+
+class FileTokenBucket(RateLimiter):
+    """
+    Token bucket compartilhado entre processos da mesma máquina
+
+    O estado (fichas e horário da última retirada) fica em um arquivo
+    protegido por lock exclusivo; o lock só é mantido durante a reserva,
+    nunca durante a espera.
+    """
+
+    reserva_bloqueante = True
+
+    def __init__(self, config: RateLimitConfig, caminho: str):
+        self.config = config
+        self.caminho = caminho
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _reservar(self) -> float:
+        with open(self.caminho, "a+") as arquivo:
+            self._travar(arquivo)
+            try:
+                arquivo.seek(0)
+                agora = time.time()
+                fichas, ultimo = self._ler_estado(arquivo.read(), agora)
+                fichas, espera = self._retirar_ficha(self.config, fichas, ultimo, agora)
+                arquivo.seek(0)
+                arquivo.truncate()
+                arquivo.write(f"{fichas:.6f} {agora:.6f}")
+                arquivo.flush()
+                return espera
+            finally:
+                self._destravar(arquivo)
+
+    def _ler_estado(self, conteudo: str, agora: float):
+        """Retorna (fichas, ultimo); arquivo novo ou corrompido começa com o balde cheio"""
+        try:
+            fichas, ultimo = conteudo.split()
+            return float(fichas), float(ultimo)
+        except ValueError:
+            return float(self.config.burst), agora
+
+    @staticmethod
+    def _travar(arquivo) -> None:
+        if fcntl:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        else:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+
+    @staticmethod
+    def _destravar(arquivo) -> None:
+        if fcntl:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+        else:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+def criar_rate_limiter(website_type: str,
+                       config: RateLimitConfig,
+                       diretorio_estado: str = "",
+                       logging_service: LoggingService = None) -> RateLimiter:
+    """
+    Cria o rate limiter de um website
+
+    Args:
+        website_type: Tipo do website (ex: TJSP), usado no nome do arquivo de estado
+        config: Limite de requisições
+        diretorio_estado: Diretório dos arquivos de estado compartilhados entre
+            processos; vazio limita apenas dentro do processo
+        logging_service: Serviço de logging
+    """
+    logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+
+    if config.ilimitado:
+        logger.info(f"Sem limite de requisições para {website_type}")
+        return SemLimite()
+
+    logger.info(
+        f"Limite de requisições para {website_type}: "
+        f"{config.requests_per_second:g}/s, rajada de {config.burst}"
+    )
+    if diretorio_estado:
+        caminho = os.path.join(diretorio_estado, f"{website_type.lower()}.bucket")
+        return FileTokenBucket(config, caminho)
+    return TokenBucket(config)
@@ -0,0 +1,214 @@
+import logging
+import re
+import unicodedata
+from datetime import date
+from typing import List, Optional, Tuple
+import lxml.html
+from interfaces.processo_encontrado import ProcessoEncontrado
+from interfaces.web_scraper_interface import IResultAnalyzer
+from services.logging_service import LoggingService
+from services.result_rules_service import MATCHER_PADRAO, RuleMatcher, RuleRegistry
+
+# Classes processuais criminais (comparadas sem acentos e em minúsculas)
+# Só as prisões criminais: "Prisão Civil" (dívida de alimentos) é cível
+CLASSES_CRIMINAIS = re.compile(
+    r"\b(penal|criminal|crime|inquerito|termo circunstanciado|habeas corpus|"
+    r"prisao (preventiva|temporaria|em flagrante)|medidas protetivas|liberdade provisoria|queixa-crime)\b"
+)
+
+# Participações em que a parte não é acusada (vítima, testemunha...)
+PARTICIPACOES_SEM_ACUSACAO = re.compile(r"\b(vitima|ofendid[oa]|testemunha|assistente|querelante)")
+
+def _normalizar(texto: Optional[str]) -> str:
+    """Remove acentos e passa para minúsculas"""
+    if not texto:
+        return ""
+    sem_acentos = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sem_acentos.casefold().split())
+
+def _recortar(page_source: str, marcador: str, *fins: str) -> Optional[str]:
+    """
+    Recorta o trecho do HTML que começa na tag com `marcador` e termina no
+    último dos `fins`, procurados em sequência
+
+    A busca é feita no texto, sem montar o DOM da página inteira; só o
+    trecho recortado é entregue ao lxml.
+    """
+    posicao = page_source.find(marcador)
+    if posicao < 0:
+        return None
+    inicio = page_source.rfind("<", 0, posicao)
+    termino = inicio
+    for fim in fins:
+        termino = page_source.find(fim, termino)
+        if termino < 0:
+            return page_source[inicio:]
+    return page_source[inicio:termino + len(fins[-1])]
+
+def _recortar_elemento(page_source: str, marcador: str, tag: str) -> Optional[str]:
+    """
+    Recorta o elemento `tag` que tem `marcador`, até a tag de fechamento
+    correspondente
+
+    As aberturas e fechamentos de `tag` dentro dele são contados, então uma
+    lista aninhada (ex: um <ul> dentro de um item) não encerra o recorte.
+    """
+    posicao = page_source.find(marcador)
+    if posicao < 0:
+        return None
+    inicio = page_source.rfind("<", 0, posicao)
+    profundidade = 0
+    for tag_encontrada in re.compile(rf"<(/?){tag}\b", re.IGNORECASE).finditer(page_source, inicio):
+        profundidade += -1 if tag_encontrada.group(1) else 1
+        if profundidade == 0:
+            return page_source[inicio:page_source.find(">", tag_encontrada.end()) + 1]
+    return page_source[inicio:]
+
+def _texto(elementos: List) -> Optional[str]:
+    """Texto do primeiro elemento, com espaços normalizados"""
+    if not elementos:
+        return None
+    texto = " ".join(elementos[0].text_content().split())
+    return texto or None
+
+def _data(texto: Optional[str]) -> Optional[date]:
+    """Data no formato dd/mm/aaaa no início do texto (ex: "10/02/2022 às 09:15 - Livre")"""
+    encontrada = re.match(r"(\d{2})/(\d{2})/(\d{4})", texto or "")
+    if not encontrada:
+        return None
+    dia, mes, ano = (int(parte) for parte in encontrada.groups())
+    try:
+        return date(ano, mes, dia)
+    except ValueError:
+        return None
+
+def _classificar(processo: ProcessoEncontrado) -> ProcessoEncontrado:
+    """Marca o processo como criminal pela classe, ignorando vítimas e testemunhas"""
+    classe_criminal = bool(CLASSES_CRIMINAIS.search(_normalizar(processo.classe)))
+    acusado = not PARTICIPACOES_SEM_ACUSACAO.search(_normalizar(processo.participacao))
+    processo.criminal = classe_criminal and acusado
+    return processo
+
+def _processos_da_lista(bloco: str) -> List[ProcessoEncontrado]:
+    """Processos da lista de resultados (#listagemDeProcessos)"""
+    processos = []
+    # Só os itens da própria lista; os de listas aninhadas fazem parte do item
+    for item in lxml.html.fromstring(bloco).iterchildren("li"):
+        numero = _texto(item.find_class("linkProcesso"))
+        if not numero:
+            continue
+        distribuicao = _texto(item.find_class("dataLocalDistribuicaoProcesso"))
+        processos.append(ProcessoEncontrado(
+            numero=numero,
+            classe=_texto(item.find_class("classeProcesso")),
+            assunto=_texto(item.find_class("assuntoPrincipalProcesso")),
+            foro=distribuicao.split(" - ", 1)[-1] if distribuicao else None,
+            data_distribuicao=_data(distribuicao),
+            participacao=_texto(item.find_class("tipoDeParticipacao"))
+        ))
+    return processos
+
+def _processo_unico(bloco: str) -> List[ProcessoEncontrado]:
+    """Processo aberto direto quando a pesquisa encontra um único resultado"""
+    raiz = lxml.html.fromstring(bloco)
+    numero = _texto(raiz.xpath('//*[@id="numeroProcesso"]'))
+    if not numero:
+        return []
+    # Com mais de uma parte não dá para saber qual é a pesquisada
+    participacoes = raiz.xpath('//*[@id="tablePartesPrincipais"]//*[contains(@class, "tipoDeParticipacao")]')
+    return [ProcessoEncontrado(
+        numero=numero,
+        classe=_texto(raiz.xpath('//*[@id="classeProcesso"]')),
+        assunto=_texto(raiz.xpath('//*[@id="assuntoProcesso"]')),
+        foro=_texto(raiz.xpath('//*[@id="foroProcesso"]')),
+        data_distribuicao=_data(_texto(raiz.xpath('//*[@id="dataHoraDistribuicaoProcesso"]'))),
+        participacao=_texto(participacoes) if len(participacoes) == 1 else None
+    )]
+
+def extrair_processos(page_source: str) -> List[ProcessoEncontrado]:
+    """
+    Extrai os processos de uma página de resultado do e-SAJ
+
+    Returns:
+        Processos encontrados, já classificados; lista vazia se a página não
+        tem lista de processos nem processo único
+    """
+    if not page_source:
+        return []
+    bloco = _recortar_elemento(page_source, 'class="unj-list-row"', "ul")
+    if bloco is not None:
+        processos = _processos_da_lista(bloco)
+    else:
+        bloco = _recortar(page_source, 'id="numeroProcesso"', 'id="tablePartesPrincipais"', "</table>")
+        processos = _processo_unico(bloco) if bloco is not None else []
+    return [_classificar(processo) for processo in processos]
+
+class StructuredResultAnalyzer(IResultAnalyzer):
+    """
+    Analisador que lê os processos da página de resultado
+
+    Os marcadores da página são verificados pelas regras do website
+    (`websites.configuracao`, ver RuleRegistry) em uma única passada. Quando
+    as regras indicam que consta algo (5), os processos são extraídos e o
+    resultado vira criminal (2) se algum tem classe criminal e a parte não
+    aparece como vítima ou testemunha.
+    """
+
+    def __init__(self, logging_service: LoggingService = None, regras: Optional[RuleRegistry] = None,
+                 website_type: Optional[str] = None, matcher: Optional[RuleMatcher] = None):
+        """
+        Args:
+            regras: Regras por website, recarregadas em `atualizar`
+            website_type: Website das regras
+            matcher: Regras fixas usadas sem `regras` (padrão: REGRAS_PADRAO)
+        """
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+        self.regras = regras
+        self.website_type = website_type
+        self.matcher = matcher or MATCHER_PADRAO
+
+    def atualizar(self) -> None:
+        """Recarrega as regras do website se a configuração mudou"""
+        if self.regras is not None:
+            self.regras.atualizar(self.website_type)
+
+    def copia_para_processo(self) -> "StructuredResultAnalyzer":
+        """Cópia com as regras atuais do website, sem o acesso ao banco"""
+        matcher = self.regras.obter(self.website_type) if self.regras is not None else self.matcher
+        return StructuredResultAnalyzer(matcher=matcher)
+
+    def analisar_resultado(self, page_source: str) -> int:
+        """
+        Analisa o resultado da pesquisa e retorna o código do resultado
+
+        Returns:
+            1: Nada consta
+            2: Criminal
+            5: Cível
+            7: Erro
+        """
+        return self.analisar_processos(page_source)[0]
+
+    def analisar_processos(self, page_source: str) -> Tuple[int, List[ProcessoEncontrado]]:
+        """
+        Código do resultado e os processos da página
+
+        Os processos só são extraídos quando consta algo (2 ou 5).
+        """
+        if not page_source:
+            return 7, []  # Erro
+
+        matcher = self.regras.obter(self.website_type) if self.regras is not None else self.matcher
+        resultado = matcher.classificar(page_source)
+        if resultado not in (2, 5):
+            return resultado, []
+
+        try:
+            processos = extrair_processos(page_source)
+        except Exception as e:
+            self.logger.error(f"Erro ao extrair processos do resultado: {e}")
+            return resultado, []
+
+        if resultado == 5 and any(processo.criminal for processo in processos):
+            return 2, processos  # Criminal
+        return resultado, processos
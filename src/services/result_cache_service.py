@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from interfaces.database_interface import IDatabaseService
+from interfaces.processo_encontrado import ProcessoEncontrado
+from services.logging_service import LoggingService
+
+ChaveCache = Tuple[str, int, str]
+# Resultado e processos da página, como vieram da análise
+ResultadoEmCache = Tuple[int, List[ProcessoEncontrado]]
+
+class ResultCache:
+    """
+    Cache de resultados por (website, filtro, documento normalizado)
+
+    - Memória: LRU com no máximo `max_entradas` e validade de `ttl` segundos
+    - Persistente (opcional): tabela `resultado_cache`, consultada quando o
+      documento não está na memória e compartilhada entre processos
+
+    Só resultados definitivos (nada consta, criminal, cível) são guardados;
+    erros sempre voltam a ser pesquisados. Os processos da página são
+    guardados com o resultado, para que as pesquisas respondidas pelo cache
+    também tenham os seus em pesquisa_spv_processos.
+    """
+
+    RESULTADOS_CACHEAVEIS = {1, 2, 5}
+
+    def __init__(self,
+                 ttl: int,
+                 max_entradas: int = 10000,
+                 persistencia: Optional[IDatabaseService] = None,
+                 logging_service: LoggingService = None):
+        """
+        Args:
+            ttl: Validade de um resultado em segundos
+            max_entradas: Número máximo de documentos na memória
+            persistencia: Serviço de banco para a camada persistente
+            logging_service: Serviço de logging
+        """
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.persistencia = persistencia
+        self._entradas: "OrderedDict[ChaveCache, Tuple[ResultadoEmCache, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+
+    @property
+    def persistente(self) -> bool:
+        return self.persistencia is not None
+
+    def get(self, website: str, filtro: int, documento: str) -> Optional[ResultadoEmCache]:
+        """Retorna (resultado, processos) ainda válidos do documento, ou None"""
+        chave = (website, filtro, documento)
+        agora = time.time()
+
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                guardado, gravado_em = entrada
+                if agora - gravado_em < self.ttl:
+                    self._entradas.move_to_end(chave)
+                    self._hits += 1
+                    return guardado
+                del self._entradas[chave]
+
+        if self.persistente:
+            validade = datetime.fromtimestamp(agora) - timedelta(seconds=self.ttl)
+            encontrado = self.persistencia.get_resultado_cache(website, filtro, documento, validade)
+            # Entradas gravadas sem os processos (antes da 0004) contam como miss
+            if encontrado is not None and encontrado[2] is not None:
+                resultado, data_resultado, processos = encontrado
+                with self._lock:
+                    self._guardar(chave, (resultado, processos), data_resultado.timestamp())
+                    self._hits += 1
+                return resultado, processos
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, website: str, filtro: int, documento: str, resultado: int,
+            processos: List[ProcessoEncontrado]) -> None:
+        """Guarda o resultado e os processos de uma pesquisa feita no tribunal"""
+        if resultado not in self.RESULTADOS_CACHEAVEIS or not documento:
+            return
+
+        with self._lock:
+            self._guardar((website, filtro, documento), (resultado, processos), time.time())
+
+        if self.persistente:
+            self.persistencia.salvar_resultado_cache(website, filtro, documento, resultado, processos)
+
+    def get_estatisticas(self) -> Dict[str, int]:
+        """Retorna hits, misses e entradas em memória"""
+        with self._lock:
+            return {
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+                "cache_entradas": len(self._entradas)
+            }
+
+    def _guardar(self, chave: ChaveCache, guardado: ResultadoEmCache, gravado_em: float) -> None:
+        self._entradas[chave] = (guardado, gravado_em)
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
@@ -0,0 +1,154 @@
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from interfaces.database_interface import IDatabaseService
+from services.logging_service import LoggingService
+
+RESULTADOS_VALIDOS = {1, 2, 5, 7}
+
+@dataclass
+class RegraResultado:
+    """Marcador da página de resultado e o código que ele indica"""
+    nome: str
+    padrao: str
+    resultado: int
+    regex: bool = False
+
+# Marcadores do e-SAJ usados quando o website não define regras próprias
+REGRAS_PADRAO = [
+    RegraResultado("nada_consta", "Não existem informações disponíveis para os parâmetros informados.", 1),
+    RegraResultado("processos_encontrados", "Processos encontrados", 5),
+    RegraResultado("audiencias", "Audiências", 5),
+]
+
+class RuleMatcher:
+    """
+    Regras de análise compiladas em uma única expressão regular
+
+    Cada regra vira um grupo nomeado de uma alternância, e a página é
+    percorrida uma única vez com `finditer`, registrando todos os marcadores
+    encontrados. Vence a regra que aparece primeiro na lista; sem nenhum
+    marcador, vale `resultado_padrao`.
+    """
+
+    def __init__(self, regras: List[RegraResultado], resultado_padrao: int = 5):
+        if not regras:
+            raise ValueError("Nenhuma regra de análise informada")
+        self.regras = list(regras)
+        self.resultado_padrao = resultado_padrao
+        self._padrao = re.compile("|".join(
+            f"(?P<r{indice}>{regra.padrao if regra.regex else re.escape(regra.padrao)})"
+            for indice, regra in enumerate(self.regras)
+        ))
+
+    @classmethod
+    def from_configuracao(cls, configuracao: Optional[Dict[str, Any]]) -> "RuleMatcher":
+        """
+        Compila as regras de `websites.configuracao`:
+
+            {"analise_resultado": {
+                "resultado_padrao": 5,
+                "regras": [
+                    {"nome": "nada_consta", "padrao": "Não existem informações", "resultado": 1},
+                    {"nome": "reu", "padrao": "R[ée]u\\\\b", "resultado": 5, "regex": true}
+                ]}}
+
+        Sem essa chave, usa REGRAS_PADRAO.
+
+        Raises:
+            ValueError: regra sem padrão, com resultado desconhecido ou regex inválida
+        """
+        analise = configuracao.get("analise_resultado") if isinstance(configuracao, dict) else None
+        if not analise:
+            return MATCHER_PADRAO
+
+        regras = []
+        for indice, regra in enumerate(analise.get("regras") or []):
+            if not regra.get("padrao") or regra.get("resultado") not in RESULTADOS_VALIDOS:
+                raise ValueError(f"Regra de análise inválida: {regra}")
+            regras.append(RegraResultado(
+                nome=regra.get("nome") or f"regra_{indice}",
+                padrao=regra["padrao"],
+                resultado=regra["resultado"],
+                regex=bool(regra.get("regex", False))
+            ))
+        resultado_padrao = analise.get("resultado_padrao", 5)
+        if resultado_padrao not in RESULTADOS_VALIDOS:
+            raise ValueError(f"Resultado padrão inválido: {resultado_padrao}")
+        try:
+            return cls(regras, resultado_padrao)
+        except re.error as e:
+            raise ValueError(f"Expressão regular inválida nas regras de análise: {e}")
+
+    def encontrar(self, page_source: str) -> Set[str]:
+        """Nomes das regras cujos marcadores aparecem na página"""
+        return {self.regras[indice].nome for indice in self._indices_encontrados(page_source)}
+
+    def classificar(self, page_source: str) -> int:
+        """Código do resultado pela regra de maior prioridade encontrada"""
+        encontrados = self._indices_encontrados(page_source)
+        if not encontrados:
+            return self.resultado_padrao
+        return self.regras[min(encontrados)].resultado
+
+    def _indices_encontrados(self, page_source: str) -> Set[int]:
+        encontrados = set()
+        for match in self._padrao.finditer(page_source):
+            encontrados.add(int(match.lastgroup[1:]))
+            if len(encontrados) == len(self.regras):
+                break
+        return encontrados
+
+MATCHER_PADRAO = RuleMatcher(REGRAS_PADRAO)
+
+class RuleRegistry:
+    """
+    Regras de análise compiladas por website
+
+    O matcher fica em cache por `website_id` junto com o `updated_at` da
+    linha de `websites`; `atualizar` consulta só a versão e recompila as
+    regras quando ela muda. `obter` nunca acessa o banco e pode ser chamado
+    pelas threads de análise.
+    """
+
+    def __init__(self, database_service: IDatabaseService, logging_service: LoggingService = None):
+        self.database_service = database_service
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._matchers: Dict[int, Tuple[datetime, RuleMatcher]] = {}
+        self._website_ids: Dict[str, int] = {}
+
+    def atualizar(self, website_type: str) -> RuleMatcher:
+        """Recarrega as regras do website se a linha mudou desde a última leitura"""
+        versao = self.database_service.get_versao_website(website_type)
+        if versao is None:
+            return self.obter(website_type)
+
+        website_id, updated_at = versao
+        with self._lock:
+            self._website_ids[website_type] = website_id
+            atual = self._matchers.get(website_id)
+        if atual is not None and atual[0] == updated_at:
+            return atual[1]
+
+        configuracao = self.database_service.get_configuracao_website(website_type)
+        try:
+            matcher = RuleMatcher.from_configuracao(configuracao)
+        except ValueError as e:
+            self.logger.error(f"Regras de análise do website {website_type} ignoradas: {e}")
+            matcher = atual[1] if atual is not None else MATCHER_PADRAO
+
+        with self._lock:
+            self._matchers[website_id] = (updated_at, matcher)
+        self.logger.info(f"Regras de análise do website {website_type} carregadas ({len(matcher.regras)} regras)")
+        return matcher
+
+    def obter(self, website_type: str) -> RuleMatcher:
+        """Matcher já carregado do website, ou as regras padrão"""
+        with self._lock:
+            website_id = self._website_ids.get(website_type)
+            atual = self._matchers.get(website_id) if website_id is not None else None
+        return atual[1] if atual is not None else MATCHER_PADRAO
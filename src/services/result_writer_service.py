@@ -0,0 +1,115 @@
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from interfaces.database_interface import IDatabaseService
+from interfaces.resultado_spv import ResultadoSPV
+from services.logging_service import LoggingService
+
+class ResultWriter:
+    """
+    Acumula resultados SPV e grava vários de uma vez
+
+    Os resultados vão para o banco em um único comando (ver
+    DatabaseService.gravar_resultados_spv) quando o lote chega a
+    `tamanho_lote` ou a cada `intervalo` segundos, o que vier primeiro. Em
+    vez de um commit por pesquisa, há um commit por lote.
+
+    Resultados que não puderam ser gravados não são repetidos: as pesquisas
+    continuam pendentes e voltam no próximo ciclo.
+    """
+
+    def __init__(self,
+                 database_service: IDatabaseService,
+                 tamanho_lote: int = 100,
+                 intervalo: float = 0.5,
+                 lock: Optional[threading.Lock] = None,
+                 logging_service: LoggingService = None):
+        """
+        Args:
+            database_service: Serviço de banco de dados
+            tamanho_lote: Resultados que disparam a gravação
+            intervalo: Tempo máximo (segundos) que um resultado espera no lote
+            lock: Lock da sessão do banco, se compartilhada com outras threads
+        """
+        self.database_service = database_service
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.lock = lock or threading.Lock()
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+        self._pendentes: List[ResultadoSPV] = []
+        self._condicao = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._encerrado = False
+        self._gravados = 0
+        self._lotes = 0
+        self._perdidos = 0
+
+    def adicionar(self, resultados: Iterable[ResultadoSPV]) -> None:
+        """Coloca os resultados no lote; a gravação acontece na thread do writer"""
+        with self._condicao:
+            self._pendentes.extend(resultados)
+            if self._thread is None or not self._thread.is_alive():
+                self._encerrado = False
+                self._thread = threading.Thread(target=self._executar, name="spv-result-writer", daemon=True)
+                self._thread.start()
+            if len(self._pendentes) >= self.tamanho_lote:
+                self._condicao.notify_all()
+
+    def descarregar(self) -> bool:
+        """
+        Grava agora tudo o que está no lote
+
+        Returns:
+            True se não havia nada pendente ou se a gravação deu certo
+        """
+        # O lock da sessão também mantém os lotes na ordem em que foram retirados
+        with self.lock:
+            with self._condicao:
+                lote, self._pendentes = self._pendentes, []
+            if not lote:
+                return True
+
+            sucesso = self.database_service.gravar_resultados_spv(lote)
+
+        with self._condicao:
+            self._lotes += 1
+            if sucesso:
+                self._gravados += len(lote)
+            else:
+                self._perdidos += len(lote)
+        if not sucesso:
+            self.logger.error(f"{len(lote)} resultados não foram gravados; as pesquisas continuam pendentes")
+        return sucesso
+
+    def encerrar(self) -> None:
+        """Para a thread do writer e grava o que ainda está no lote"""
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.descarregar()
+
+    def get_estatisticas(self) -> Dict[str, Any]:
+        with self._condicao:
+            return {
+                "resultados_gravados": self._gravados,
+                "lotes_gravados": self._lotes,
+                "resultados_nao_gravados": self._perdidos,
+                "resultados_pendentes": len(self._pendentes)
+            }
+
+    def _executar(self) -> None:
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(
+                    lambda: self._encerrado or len(self._pendentes) >= self.tamanho_lote,
+                    timeout=self.intervalo
+                )
+                if self._encerrado:
+                    return
+            try:
+                self.descarregar()
+            except Exception as e:
+                self.logger.error(f"Erro ao gravar lote de resultados: {e}")
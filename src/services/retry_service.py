@@ -0,0 +1,253 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+import requests
+from interfaces.web_scraper_interface import IWebScraperService
+from services.logging_service import LoggingService
+
+class ScrapingError(Exception):
+    """Erro de uma pesquisa no website do tribunal"""
+
+class TransientScrapingError(ScrapingError):
+    """Falha que pode dar certo numa nova tentativa (timeout, página incompleta, erro do servidor)"""
+
+class PermanentScrapingError(ScrapingError):
+    """Falha que se repetiria em qualquer tentativa (parâmetros inválidos, website não suportado)"""
+
+class CircuitOpenError(ScrapingError):
+    """O circuit breaker do website continuou aberto durante toda a espera"""
+
+def erro_transitorio(erro: BaseException) -> bool:
+    """
+    Classifica o erro de uma pesquisa
+
+    São permanentes os erros de parâmetro (ValueError, TypeError) e as
+    respostas HTTP 4xx, exceto 408 e 429. Todo o resto (timeouts, conexão
+    recusada, sessão do navegador perdida, página sem marcador de resultado,
+    5xx) é tratado como transitório.
+    """
+    if isinstance(erro, TransientScrapingError):
+        return True
+    if isinstance(erro, (PermanentScrapingError, CircuitOpenError, ValueError, TypeError)):
+        return False
+    if isinstance(erro, requests.HTTPError) and erro.response is not None:
+        status = erro.response.status_code
+        return status >= 500 or status in (408, 429)
+    return True
+
+@dataclass
+class RetryPolicy:
+    """
+    Repetição com backoff exponencial e jitter
+
+    A espera antes da tentativa `n` (a partir de 1) fica entre metade e o
+    total de `min(maximo, base * 2 ** (n - 1))` segundos, espalhando os
+    workers que falharam ao mesmo tempo.
+    """
+    max_tentativas: int = 3
+    base: float = 1.0
+    maximo: float = 30.0
+
+    def espera(self, tentativa: int) -> float:
+        teto = min(self.maximo, self.base * 2 ** max(tentativa - 1, 0))
+        return teto / 2 + random.uniform(0, teto / 2)
+
+class CircuitBreaker:
+    """
+    Circuit breaker de um website
+
+    Depois de `limite_falhas` falhas transitórias seguidas o circuito abre e
+    todas as pesquisas do website aguardam em `liberar`. Passado
+    `tempo_aberto`, uma única pesquisa de teste é liberada (meio aberto): se
+    der certo o circuito fecha e libera todos; se falhar, reabre.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, nome: str, limite_falhas: int = 5, tempo_aberto: float = 60.0,
+                 logging_service: LoggingService = None):
+        self.nome = nome
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto = tempo_aberto
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+        self._condicao = threading.Condition()
+        self._estado = self.FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._aberturas = 0
+
+    @property
+    def estado(self) -> str:
+        with self._condicao:
+            return self._estado
+
+    def liberar(self, timeout: Optional[float] = None) -> None:
+        """
+        Aguarda o circuito permitir uma pesquisa
+
+        Raises:
+            CircuitOpenError: se o circuito não liberou dentro de `timeout` segundos
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._condicao:
+            while True:
+                if self._estado == self.FECHADO:
+                    return
+                agora = time.monotonic()
+                if self._estado == self.ABERTO and agora - self._aberto_em >= self.tempo_aberto:
+                    self._estado = self.MEIO_ABERTO
+                    self.logger.info(f"Circuit breaker {self.nome}: testando o website")
+                if self._estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+                    self._teste_em_andamento = True
+                    return
+
+                if self._estado == self.ABERTO:
+                    espera = self._aberto_em + self.tempo_aberto - agora
+                else:
+                    espera = self.tempo_aberto  # aguarda o resultado da pesquisa de teste
+                if limite is not None:
+                    if agora >= limite:
+                        raise CircuitOpenError(f"Circuit breaker {self.nome} aberto")
+                    espera = min(espera, limite - agora)
+                self._condicao.wait(espera)
+
+    def registrar_sucesso(self) -> None:
+        """O website respondeu: fecha o circuito e libera as pesquisas em espera"""
+        with self._condicao:
+            if self._estado != self.FECHADO:
+                self.logger.info(f"Circuit breaker {self.nome}: fechado")
+            self._estado = self.FECHADO
+            self._falhas = 0
+            self._teste_em_andamento = False
+            self._condicao.notify_all()
+
+    def registrar_falha(self) -> None:
+        """Conta uma falha transitória e abre o circuito ao atingir o limite"""
+        with self._condicao:
+            self._falhas += 1
+            if self._estado == self.MEIO_ABERTO or (
+                self._estado == self.FECHADO and self._falhas >= self.limite_falhas
+            ):
+                self._estado = self.ABERTO
+                self._aberto_em = time.monotonic()
+                self._teste_em_andamento = False
+                self._aberturas += 1
+                self.logger.warning(
+                    f"Circuit breaker {self.nome}: aberto após {self._falhas} falhas; "
+                    f"pesquisas pausadas por {self.tempo_aberto:.0f}s"
+                )
+                self._condicao.notify_all()
+
+    def get_estatisticas(self) -> Dict[str, Any]:
+        with self._condicao:
+            return {
+                "circuit_breaker": self._estado,
+                "circuit_breaker_aberturas": self._aberturas
+            }
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+def obter_circuit_breaker(website: str, limite_falhas: int = 5, tempo_aberto: float = 60.0,
+                          logging_service: LoggingService = None) -> CircuitBreaker:
+    """Circuit breaker único por website no processo, compartilhado por todos os workers"""
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(website)
+        if breaker is None:
+            breaker = CircuitBreaker(website, limite_falhas, tempo_aberto, logging_service)
+            _circuit_breakers[website] = breaker
+        return breaker
+
+class ResilientWebScraperService(IWebScraperService):
+    """
+    Serviço de scraping com repetição e circuit breaker
+
+    Envolve outro IWebScraperService. Falhas transitórias (inclusive página
+    vazia) são repetidas conforme a `RetryPolicy` e contadas no circuit
+    breaker; falhas permanentes são repassadas sem repetição. Esgotadas as
+    tentativas, o erro é repassado ao chamador em vez de virar uma página
+    vazia, e a pesquisa continua pendente.
+
+    A vez da primeira tentativa no limite de requisições do tribunal é
+    aguardada por quem chama pesquisar; cada nova tentativa chama
+    `aguardar_vez` antes de ir ao website, para que uma rajada de falhas
+    não passe da taxa configurada.
+    """
+
+    def __init__(self, service: IWebScraperService, circuit_breaker: CircuitBreaker,
+                 politica: Optional[RetryPolicy] = None, espera_maxima: Optional[float] = None,
+                 aguardar_vez: Optional[Callable[[], Any]] = None,
+                 logging_service: LoggingService = None):
+        """
+        Args:
+            service: Serviço de scraping envolvido
+            circuit_breaker: Circuit breaker do website
+            politica: Política de repetição
+            espera_maxima: Tempo máximo aguardando o circuito fechar antes de
+                desistir da pesquisa com CircuitOpenError (None aguarda sem limite)
+            aguardar_vez: Chamado antes de cada nova tentativa, ex:
+                RateLimiter.acquire (None repete sem limite de taxa)
+        """
+        self.service = service
+        self.circuit_breaker = circuit_breaker
+        self.politica = politica or RetryPolicy()
+        self.espera_maxima = espera_maxima
+        self.aguardar_vez = aguardar_vez
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._retentativas = 0
+        self._falhas_definitivas = 0
+
+    def setup_driver(self) -> None:
+        self.service.setup_driver()
+
+    def close_driver(self) -> None:
+        self.service.close_driver()
+
+    def pesquisar(self, filtro: int, documento: str) -> str:
+        tentativa = 1
+        while True:
+            self.circuit_breaker.liberar(self.espera_maxima)
+            try:
+                page_source = self.service.pesquisar(filtro, documento)
+                if not page_source:
+                    raise TransientScrapingError("Pesquisa retornou página vazia")
+            except Exception as e:
+                if not erro_transitorio(e):
+                    # O website respondeu; o erro está na pesquisa
+                    self.circuit_breaker.registrar_sucesso()
+                    raise
+                self.circuit_breaker.registrar_falha()
+                if tentativa >= self.politica.max_tentativas:
+                    with self._lock:
+                        self._falhas_definitivas += 1
+                    raise
+                espera = self.politica.espera(tentativa)
+                self.logger.warning(
+                    f"Falha transitória na tentativa {tentativa}/{self.politica.max_tentativas}: {e}; "
+                    f"repetindo em {espera:.1f}s"
+                )
+                with self._lock:
+                    self._retentativas += 1
+                time.sleep(espera)
+                if self.aguardar_vez is not None:
+                    self.aguardar_vez()
+                tentativa += 1
+                continue
+
+            self.circuit_breaker.registrar_sucesso()
+            return page_source
+
+    def get_estatisticas(self) -> Dict[str, Any]:
+        estatisticas = dict(self.service.get_estatisticas())
+        estatisticas.update(self.circuit_breaker.get_estatisticas())
+        with self._lock:
+            estatisticas["retentativas"] = self._retentativas
+            estatisticas["falhas_definitivas"] = self._falhas_definitivas
+        return estatisticas
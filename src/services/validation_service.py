@@ -1,4 +1,5 @@
 import re
+import unicodedata
 from typing import Optional, Tuple, Dict, Any
 from dataclasses import dataclass
 from interfaces.validation_result import ValidationResult
@@ -115,4 +116,18 @@ class ValidationService:
         """Remove caracteres especiais de um documento"""
         if not documento:
             return ""
-        return re.sub(r'[^\w\s]', '', documento).strip() 
\ No newline at end of file
+        return re.sub(r'[^\w\s]', '', documento).strip()
+    
+    def normalize_document(self, filtro: int, documento: str) -> str:
+        """
+        Normaliza um documento para comparação entre pesquisas
+        
+        CPF e RG ficam só com os dígitos; nomes ficam sem acentos, em
+        minúsculas e com espaços simples.
+        """
+        if not documento:
+            return ""
+        if filtro == 2:  # Nome
+            sem_acentos = unicodedata.normalize("NFKD", documento).encode("ascii", "ignore").decode("ascii")
+            return " ".join(sem_acentos.casefold().split())
+        return re.sub(r'[^\dXx]', '', documento).upper()
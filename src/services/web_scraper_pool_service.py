@@ -0,0 +1,149 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Any
+from interfaces.web_scraper_interface import IWebScraperService
+from services.logging_service import LoggingService
+
+@dataclass
+class DriverHealth:
+    """Estado de saúde de um driver do pool"""
+    driver_id: int
+    pesquisas: int = 0
+    falhas: int = 0
+    falhas_consecutivas: int = 0
+    reinicios: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "driver_id": self.driver_id,
+            "pesquisas": self.pesquisas,
+            "falhas": self.falhas,
+            "falhas_consecutivas": self.falhas_consecutivas,
+            "reinicios": self.reinicios
+        }
+
+@dataclass
+class DriverCheckout:
+    """Driver retirado do pool; `sucesso` indica o resultado da pesquisa"""
+    driver_id: int
+    scraper: IWebScraperService
+    sucesso: bool = False
+
+class WebScraperPool(IWebScraperService):
+    """
+    Pool de serviços de web scraping, cada um com o seu próprio navegador.
+
+    Permite que várias pesquisas sejam executadas ao mesmo tempo: cada chamada
+    a `pesquisar` retira um driver livre do pool e o devolve ao final.
+    """
+
+    def __init__(self,
+                 scraper_factory: Callable[[], IWebScraperService],
+                 pool_size: int = 2,
+                 max_falhas_consecutivas: int = 3,
+                 logging_service: LoggingService = None):
+        """
+        Args:
+            scraper_factory: Função que cria um novo serviço de scraping (um driver)
+            pool_size: Número de drivers no pool
+            max_falhas_consecutivas: Falhas seguidas até o driver ser reiniciado
+            logging_service: Serviço de logging
+        """
+        if pool_size < 1:
+            raise ValueError(f"Tamanho do pool inválido: {pool_size}")
+
+        self.pool_size = pool_size
+        self.max_falhas_consecutivas = max_falhas_consecutivas
+        self.logging_service = logging_service
+        self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+
+        self._scrapers: List[IWebScraperService] = [scraper_factory() for _ in range(pool_size)]
+        self._health: List[DriverHealth] = [DriverHealth(driver_id=i) for i in range(pool_size)]
+        self._livres: "queue.Queue[int]" = queue.Queue()
+        self._lock = threading.Lock()
+        for driver_id in range(pool_size):
+            self._livres.put(driver_id)
+
+    def setup_driver(self) -> None:
+        """Configura todos os drivers do pool"""
+        for scraper in self._scrapers:
+            scraper.setup_driver()
+
+    def close_driver(self) -> None:
+        """Fecha todos os drivers do pool"""
+        for scraper in self._scrapers:
+            scraper.close_driver()
+
+    def acquire(self, timeout: float = None) -> int:
+        """
+        Retira um driver livre do pool, aguardando se todos estiverem ocupados
+
+        Returns:
+            Identificador do driver retirado
+        """
+        return self._livres.get(timeout=timeout)
+
+    def release(self, driver_id: int, sucesso: bool) -> None:
+        """Devolve um driver ao pool registrando o resultado da última pesquisa"""
+        with self._lock:
+            health = self._health[driver_id]
+            health.pesquisas += 1
+            if sucesso:
+                health.falhas_consecutivas = 0
+            else:
+                health.falhas += 1
+                health.falhas_consecutivas += 1
+            reiniciar = health.falhas_consecutivas >= self.max_falhas_consecutivas
+
+        if reiniciar:
+            self._reiniciar(driver_id)
+
+        self._livres.put(driver_id)
+
+    @contextmanager
+    def checkout(self, timeout: float = None) -> Iterator[DriverCheckout]:
+        """Context manager que retira um driver e o devolve ao final"""
+        driver_id = self.acquire(timeout)
+        checkout = DriverCheckout(driver_id=driver_id, scraper=self._scrapers[driver_id])
+        try:
+            yield checkout
+        finally:
+            self.release(checkout.driver_id, checkout.sucesso)
+
+    def pesquisar(self, filtro: int, documento: str) -> str:
+        """Executa uma pesquisa usando o primeiro driver livre do pool"""
+        with self.checkout() as checkout:
+            page_source = checkout.scraper.pesquisar(filtro, documento)
+            checkout.sucesso = bool(page_source)
+            return page_source
+
+    def get_health(self) -> List[Dict[str, Any]]:
+        """Retorna o estado de saúde de cada driver do pool"""
+        with self._lock:
+            return [health.to_dict() for health in self._health]
+
+    def get_estatisticas(self) -> Dict[str, Any]:
+        """Retorna a saúde e os contadores de cada driver do pool"""
+        drivers = [
+            {**health, **scraper.get_estatisticas()}
+            for health, scraper in zip(self.get_health(), self._scrapers)
+        ]
+        return {"drivers": drivers}
+
+    def _reiniciar(self, driver_id: int) -> None:
+        """Fecha um driver com falhas seguidas; ele é recriado na próxima pesquisa"""
+        with self._lock:
+            health = self._health[driver_id]
+            self.logger.warning(
+                f"Driver {driver_id} com {health.falhas_consecutivas} falhas consecutivas, reiniciando"
+            )
+            health.falhas_consecutivas = 0
+            health.reinicios += 1
+
+        try:
+            self._scrapers[driver_id].close_driver()
+        except Exception as e:
+            self.logger.error(f"Erro ao fechar driver {driver_id}: {e}")
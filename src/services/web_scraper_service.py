@@ -1,4 +1,3 @@
-import time
 import logging
 from typing import Optional, Dict, Any
 from selenium import webdriver
@@ -8,18 +7,29 @@ from selenium.webdriver.support.select import Select
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
 from abc import ABC, abstractmethod
 import json
 from interfaces.web_scraper_interface import IWebScraperService, IResultAnalyzer
+from services.http_scraper_service import HttpWebScraperService
+from services.driver_lifecycle_service import DriverLifecycleManager
+from services.browser_profile_service import BrowserProfile
+from services.retry_service import TransientScrapingError
+from services.result_rules_service import MATCHER_PADRAO
 from services.logging_service import LoggingService
 
 class WebScraperBase(ABC):
     """Classe base abstrata para web scrapers"""
     
-    def __init__(self, headless: bool = True, timeout: int = 30, logging_service: LoggingService = None):
+    # Seletores CSS que indicam que a página de resultado terminou de carregar,
+    # na ordem em que são verificados (sobrescrito por cada website)
+    result_selectors: Dict[str, str] = {}
+    
+    def __init__(self, headless: bool = True, timeout: int = 30, logging_service: LoggingService = None,
+                 perfil: Optional[BrowserProfile] = None):
         self.headless = headless
         self.timeout = timeout
+        self.perfil = perfil or BrowserProfile()
         self.driver = None
         self.logging_service = logging_service
         self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
@@ -28,25 +38,32 @@ class WebScraperBase(ABC):
         """Configura o driver do Edge"""
         try:
             service = Service(executable_path=driver_path) if driver_path else Service()
-            options = Options()
-            
-            if self.headless:
-                options.add_argument("-headless")
-            
-            options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--window-size=1920,1080")
+            options = self._criar_options()
             
             self.driver = webdriver.Edge(service=service, options=options)
-            self.driver.implicitly_wait(10)
+            self.perfil.aplicar_bloqueio(self.driver, self.logging_service)
             return self.driver
             
         except Exception as e:
             self.logger.error(f"Erro ao configurar driver: {e}")
             raise
     
+    def _criar_options(self) -> Options:
+        """Monta as opções do Edge, incluindo as do perfil do navegador"""
+        options = Options()
+        
+        if self.headless:
+            options.add_argument("-headless")
+        
+        options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+        self.perfil.aplicar_opcoes(options)
+        
+        return options
+    
     def close_driver(self):
         """Fecha o driver"""
         if self.driver:
@@ -81,13 +98,59 @@ class WebScraperBase(ABC):
         except TimeoutException:
             self.logger.warning(f"Elemento não encontrado: {value}")
             return None
+    
+    def wait_for_result(self, elemento_anterior: Any = None, timeout: int = None) -> Optional[str]:
+        """
+        Aguarda a página de resultado ficar pronta
+        
+        Args:
+            elemento_anterior: Elemento da página de pesquisa (ex: botão consultar);
+                quando informado, aguarda a navegação descartá-lo antes de
+                procurar os marcadores, evitando ler a página anterior
+            timeout: Tempo máximo de espera em segundos
+            
+        Returns:
+            Nome do marcador de `result_selectors` encontrado, ou None se nenhum
+            apareceu dentro do tempo limite
+        """
+        timeout = timeout or self.timeout
+        # Um marcador pode ser descartado entre o find_elements e o is_displayed
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=0.1,
+                             ignored_exceptions=(StaleElementReferenceException,))
+        try:
+            if elemento_anterior is not None:
+                wait.until(EC.staleness_of(elemento_anterior))
+            return wait.until(self._marcador_resultado)
+        except TimeoutException:
+            self.logger.warning("Página de resultado não carregou dentro do tempo limite")
+            return None
+    
+    def _marcador_resultado(self, driver: webdriver.Edge) -> Any:
+        """
+        Condição de espera: retorna o primeiro marcador visível na página
+        
+        Só elementos visíveis contam: a página de pesquisa já traz alguns
+        marcadores ocultos (ex: a tabela de mensagens de erro vazia).
+        """
+        for marcador, seletor in self.result_selectors.items():
+            if any(elemento.is_displayed() for elemento in driver.find_elements(By.CSS_SELECTOR, seletor)):
+                return marcador
+        return False
 
 class TJSPWebScraper(WebScraperBase):
     """Web scraper específico para o TJSP"""
     
-    def __init__(self, headless: bool = True, logging_service: LoggingService = None):
-        super().__init__(headless, logging_service=logging_service)
-        self.base_url = "https://esaj.tjsp.jus.br/cpopg/open.do"
+    result_selectors = {
+        "mensagem": "#mensagemRetorno",  # "Não existem informações..." e avisos de validação
+        "processos": "#listagemDeProcessos",
+        "processo": "#numeroProcesso",  # Resultado único abre direto o processo
+        "erro": "#spwTabelaMensagem, .mensagemErro"
+    }
+    
+    def __init__(self, headless: bool = True, logging_service: LoggingService = None,
+                 perfil: Optional[BrowserProfile] = None):
+        super().__init__(headless, logging_service=logging_service, perfil=perfil)
+        self.base_url = WebScraperFactory.get_website_url("TJSP")
         self.selectors = {
             "tipo_pesquisa": "//*[@id=\"cbPesquisa\"]",
             "campo_cpf": "//*[@id=\"campo_DOCPARTE\"]",
@@ -104,7 +167,7 @@ class TJSPWebScraper(WebScraperBase):
             # Seleciona tipo de pesquisa
             select_element = self.wait_for_element(By.XPATH, self.selectors["tipo_pesquisa"])
             if not select_element:
-                raise Exception("Elemento de seleção de tipo não encontrado")
+                raise TransientScrapingError("Elemento de seleção de tipo não encontrado")
             
             select = Select(select_element)
             select.select_by_value('DOCPARTE')
@@ -112,7 +175,7 @@ class TJSPWebScraper(WebScraperBase):
             # Preenche CPF
             campo_cpf = self.wait_for_element(By.XPATH, self.selectors["campo_cpf"])
             if not campo_cpf:
-                raise Exception("Campo CPF não encontrado")
+                raise TransientScrapingError("Campo CPF não encontrado")
             
             campo_cpf.clear()
             campo_cpf.send_keys(cpf)
@@ -120,18 +183,26 @@ class TJSPWebScraper(WebScraperBase):
             # Clica em consultar
             botao_consultar = self.wait_for_element(By.XPATH, self.selectors["botao_consultar"])
             if not botao_consultar:
-                raise Exception("Botão consultar não encontrado")
+                raise TransientScrapingError("Botão consultar não encontrado")
             
             botao_consultar.click()
             
-            # Aguarda carregamento da página
-            time.sleep(3)
+            # Aguarda a página de resultado
+            self._aguardar_pagina_de_resultado(botao_consultar)
             
             return self.driver.page_source
             
         except Exception as e:
             self.logger.error(f"Erro na pesquisa por CPF: {e}")
-            return ""
+            raise
+    
+    def _aguardar_pagina_de_resultado(self, botao_consultar: Any) -> None:
+        """Aguarda o resultado; página de erro ou sem marcador é falha transitória"""
+        marcador = self.wait_for_result(botao_consultar)
+        if marcador is None:
+            raise TransientScrapingError("Página de resultado não carregou")
+        if marcador == "erro":
+            raise TransientScrapingError("e-SAJ retornou página de erro")
     
     def pesquisar_por_rg(self, rg: str) -> str:
         """Pesquisa por RG no TJSP (mesmo que CPF)"""
@@ -145,7 +216,7 @@ class TJSPWebScraper(WebScraperBase):
             # Seleciona tipo de pesquisa
             select_element = self.wait_for_element(By.XPATH, self.selectors["tipo_pesquisa"])
             if not select_element:
-                raise Exception("Elemento de seleção de tipo não encontrado")
+                raise TransientScrapingError("Elemento de seleção de tipo não encontrado")
             
             select = Select(select_element)
             select.select_by_value('NMPARTE')
@@ -153,14 +224,14 @@ class TJSPWebScraper(WebScraperBase):
             # Clica em pesquisar por nome completo
             pesquisar_nome = self.wait_for_element(By.XPATH, self.selectors["pesquisar_por_nome"])
             if not pesquisar_nome:
-                raise Exception("Botão pesquisar por nome não encontrado")
+                raise TransientScrapingError("Botão pesquisar por nome não encontrado")
             
             pesquisar_nome.click()
             
             # Preenche nome
             campo_nome = self.wait_for_element(By.XPATH, self.selectors["campo_nome"])
             if not campo_nome:
-                raise Exception("Campo nome não encontrado")
+                raise TransientScrapingError("Campo nome não encontrado")
             
             campo_nome.clear()
             campo_nome.send_keys(nome)
@@ -168,78 +239,155 @@ class TJSPWebScraper(WebScraperBase):
             # Clica em consultar
             botao_consultar = self.wait_for_element(By.XPATH, self.selectors["botao_consultar"])
             if not botao_consultar:
-                raise Exception("Botão consultar não encontrado")
+                raise TransientScrapingError("Botão consultar não encontrado")
             
             botao_consultar.click()
             
-            # Aguarda carregamento da página
-            time.sleep(3)
+            # Aguarda a página de resultado
+            self._aguardar_pagina_de_resultado(botao_consultar)
             
             return self.driver.page_source
             
         except Exception as e:
             self.logger.error(f"Erro na pesquisa por nome: {e}")
-            return ""
+            raise
 
 class WebScraperFactory:
     """Factory para criar web scrapers específicos"""
     
+    WEBSITE_URLS = {
+        "TJSP": "https://esaj.tjsp.jus.br/cpopg/open.do"
+    }
+    
     @staticmethod
-    def create_scraper(website_type: str, headless: bool = True, logging_service: LoggingService = None) -> WebScraperBase:
+    def get_website_url(website_type: str) -> str:
+        """Retorna a URL de consulta do website"""
+        if website_type.upper() not in WebScraperFactory.WEBSITE_URLS:
+            raise ValueError(f"Tipo de website não suportado: {website_type}")
+        return WebScraperFactory.WEBSITE_URLS[website_type.upper()]
+    
+    @staticmethod
+    def create_scraper(website_type: str, headless: bool = True, logging_service: LoggingService = None,
+                       perfil: Optional[BrowserProfile] = None) -> WebScraperBase:
         """Cria um web scraper baseado no tipo de website"""
         if website_type.upper() == "TJSP":
-            return TJSPWebScraper(headless, logging_service)
+            return TJSPWebScraper(headless, logging_service, perfil)
         else:
             raise ValueError(f"Tipo de website não suportado: {website_type}")
+    
+    @staticmethod
+    def create_service(engine: str = "selenium", website_type: str = "TJSP", headless: bool = True,
+                       driver_path: str = None, logging_service: LoggingService = None,
+                       max_paginas: int = 200, max_rss_mb: int = 1500,
+                       perfil: Optional[BrowserProfile] = None) -> IWebScraperService:
+        """
+        Cria o serviço de scraping da engine configurada
+        
+        Args:
+            engine: "selenium" (navegador) ou "http" (requisições diretas,
+                com Selenium como fallback)
+            max_paginas: Páginas por driver antes da reciclagem
+            max_rss_mb: Memória máxima do driver em MB antes da reciclagem
+            perfil: Perfil leve do navegador (bloqueio de recursos)
+        """
+        selenium_service = WebScraperService(website_type, headless, driver_path, logging_service,
+                                              max_paginas, max_rss_mb, perfil)
+        
+        if engine.lower() == "selenium":
+            return selenium_service
+        elif engine.lower() == "http":
+            if website_type.upper() != "TJSP":
+                raise ValueError(f"Engine HTTP não suporta o website: {website_type}")
+            return HttpWebScraperService(fallback=selenium_service, logging_service=logging_service)
+        else:
+            raise ValueError(f"Engine de scraping não suportada: {engine}")
 
 class WebScraperService(IWebScraperService):
     """Serviço principal de web scraping"""
     
-    def __init__(self, website_type: str = "TJSP", headless: bool = True, driver_path: str = None, logging_service: LoggingService = None):
+    def __init__(self, website_type: str = "TJSP", headless: bool = True, driver_path: str = None,
+                 logging_service: LoggingService = None, max_paginas: int = 200, max_rss_mb: int = 1500,
+                 perfil: Optional[BrowserProfile] = None):
         self.website_type = website_type
         self.headless = headless
         self.driver_path = driver_path
-        self.scraper = None
+        self.perfil = perfil
         self.logging_service = logging_service
         self.logger = logging_service.get_logger(__name__) if logging_service else logging.getLogger(__name__)
+        self.lifecycle = DriverLifecycleManager(
+            criar_scraper=lambda: WebScraperFactory.create_scraper(
+                self.website_type, 
+                self.headless, 
+                self.logging_service,
+                self.perfil
+            ),
+            driver_path=driver_path,
+            max_paginas=max_paginas,
+            max_rss_mb=max_rss_mb,
+            logging_service=logging_service
+        )
+    
+    @property
+    def scraper(self) -> Optional[WebScraperBase]:
+        """Scraper com o driver atual (None se nenhum driver estiver aberto)"""
+        return self.lifecycle.scraper
+    
+    @scraper.setter
+    def scraper(self, scraper: Optional[WebScraperBase]) -> None:
+        self.lifecycle.scraper = scraper
     
     def setup_driver(self) -> None:
-        """Configura o driver do navegador"""
+        """Configura o driver do navegador (reaproveita o driver já aberto)"""
         try:
-            self.scraper = WebScraperFactory.create_scraper(
-                self.website_type, 
-                self.headless, 
-                self.logging_service
-            )
-            self.scraper.setup_driver(self.driver_path)
+            self.lifecycle.obter_scraper()
         except Exception as e:
             self.logger.error(f"Erro ao configurar driver: {e}")
             raise
     
     def close_driver(self) -> None:
-        """Fecha o driver do navegador"""
-        if self.scraper:
-            self.scraper.close_driver()
-    
+        """Fecha o driver do navegador; um novo é criado na próxima pesquisa"""
+        self.lifecycle.encerrar()
+
     def pesquisar(self, filtro: int, documento: str) -> str:
-        """Executa uma pesquisa no website do tribunal"""
+        """
+        Executa uma pesquisa no website do tribunal
+        
+        Raises:
+            ValueError: filtro não suportado
+            TransientScrapingError: a página de resultado não carregou
+        """
+        if filtro not in [0, 1, 2, 3]:
+            raise ValueError(f"Filtro {filtro} não suportado")
+        
+        try:
+            page_source = self._pesquisar_no_driver(filtro, documento)
+            if page_source or self.lifecycle.sessao_ativa():
+                return page_source
+        except Exception as e:
+            if self.lifecycle.sessao_ativa():
+                self.logger.error(f"Erro na pesquisa: {e}")
+                raise
+        
+        # O navegador morreu: reinicia e repete a pesquisa uma vez
+        self.lifecycle.reiniciar()
+        return self._pesquisar_no_driver(filtro, documento)
+    
+    def get_estatisticas(self) -> Dict[str, Any]:
+        """Retorna os contadores do ciclo de vida do driver"""
+        return self.lifecycle.get_counters()
+    
+    def _pesquisar_no_driver(self, filtro: int, documento: str) -> str:
+        """Executa a pesquisa no driver atual, iniciando ou reciclando se necessário"""
+        scraper = self.lifecycle.obter_scraper()
         try:
-            if not self.scraper:
-                # Configura o driver automaticamente se não estiver configurado
-                self.setup_driver()
-            
             if filtro == 0:  # CPF
-                return self.scraper.pesquisar_por_cpf(documento)
+                return scraper.pesquisar_por_cpf(documento)
             elif filtro in [1, 3]:  # RG
-                return self.scraper.pesquisar_por_rg(documento)
-            elif filtro == 2:  # Nome
-                return self.scraper.pesquisar_por_nome(documento)
-            else:
-                raise ValueError(f"Filtro {filtro} não suportado")
-                
-        except Exception as e:
-            self.logger.error(f"Erro na pesquisa: {e}")
-            return ""
+                return scraper.pesquisar_por_rg(documento)
+            else:  # Nome
+                return scraper.pesquisar_por_nome(documento)
+        finally:
+            self.lifecycle.registrar_pagina()
     
     def __enter__(self):
         """Context manager entry"""
@@ -251,12 +399,7 @@ class WebScraperService(IWebScraperService):
         self.close_driver()
 
 class ResultAnalyzer(IResultAnalyzer):
-    """Analisador de resultados das pesquisas"""
-    
-    # Constantes para resultados
-    NADA_CONSTA = 'Não existem informações disponíveis para os parâmetros informados.'
-    CONSTA01 = 'Processos encontrados'
-    CONSTA02 = 'Audiências'
+    """Analisador de resultados das pesquisas pelos marcadores padrão do e-SAJ"""
     
     @staticmethod
     def analisar_resultado(page_source: str) -> int:
@@ -273,24 +416,9 @@ class ResultAnalyzer(IResultAnalyzer):
             if not page_source:
                 return 7  # Erro
             
-            # Verifica se não há resultados
-            if ResultAnalyzer.NADA_CONSTA in page_source:
-                return 1  # Nada consta
-            
-            # Verifica se há processos
-            if ResultAnalyzer.CONSTA01 in page_source:
-                # Aqui você pode implementar lógica mais sofisticada
-                # para determinar se é criminal ou cível baseado no conteúdo
-                # Por enquanto, retorna cível como padrão
-                return 5  # Cível
-            
-            # Verifica se há audiências
-            if ResultAnalyzer.CONSTA02 in page_source:
-                return 5  # Cível
-            
-            # Se chegou até aqui, assume que há algo mas não conseguiu classificar
-            return 5  # Cível (padrão)
+            # Uma única passada pela página com todos os marcadores (REGRAS_PADRAO)
+            return MATCHER_PADRAO.classificar(page_source)
             
         except Exception as e:
             logging.getLogger(__name__).error(f"Erro ao analisar resultado: {e}")
-            return 7  # Erro 
\ No newline at end of file
+            return 7  # Erro
@@ -1,19 +1,48 @@
+import asyncio
 import datetime
 import time
 import logging
 import sys
 import os
-from typing import List, Tuple, Optional
+import socket
+import threading
+from contextlib import nullcontext
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 from tqdm import tqdm
 from config.database import get_db
 from interfaces.database_interface import IDatabaseService
 from interfaces.web_scraper_interface import IWebScraperService, IResultAnalyzer
+from interfaces.pesquisa_pendente import PesquisaPendente
+from interfaces.processo_encontrado import ProcessoEncontrado
+from interfaces.resultado_spv import ResultadoSPV
 from services.database_service import DatabaseService
-from services.web_scraper_service import WebScraperService, ResultAnalyzer
+from services.web_scraper_service import WebScraperFactory
+from services.result_analyzer_service import StructuredResultAnalyzer
+from services.result_rules_service import RuleRegistry
+from services.web_scraper_pool_service import WebScraperPool
+from services.browser_profile_service import BrowserProfile
+from services.concurrency_service import HostSemaphores
+from services.rate_limiter_service import RateLimiter, RateLimitConfig, criar_rate_limiter
+from services.result_cache_service import ResultCache, ResultadoEmCache
+from services.page_archive_service import PageArchive
+from services.pipeline_service import AnalysisPipeline, PaginaColetada
+from services.result_writer_service import ResultWriter
+from services.retry_service import CircuitOpenError, ResilientWebScraperService, RetryPolicy, obter_circuit_breaker
 from services.config_service import ConfigService
 from services.logging_service import LoggingService
 from services.validation_service import ValidationService
 
+@dataclass
+class GrupoPesquisa:
+    """Pesquisas pendentes de uma página com o mesmo documento"""
+    nome: str
+    cpf: str
+    rg: str
+    cod_pesquisas: List[int]
+
 class SPVAutomatico:
     """
     Sistema de Pesquisa Virtual Automático seguindo princípios SOLID
@@ -26,7 +55,12 @@ class SPVAutomatico:
                  config_service: ConfigService,
                  logging_service: LoggingService,
                  validation_service: ValidationService,
-                 filtro: int = 0):
+                 filtro: int = 0,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 page_archive: Optional[PageArchive] = None,
+                 pipeline: Optional[AnalysisPipeline] = None,
+                 result_writer: Optional[ResultWriter] = None):
         """
         Inicializa o sistema SPV com injeção de dependência
         
@@ -38,6 +72,14 @@ class SPVAutomatico:
             logging_service: Serviço de logging
             validation_service: Serviço de validação
             filtro: Tipo de filtro (0=CPF, 1=RG, 2=Nome, 3=RG alternativo)
+            rate_limiter: Limite de requisições ao tribunal; se omitido é criado
+                no primeiro uso a partir da configuração do website
+            result_cache: Cache de resultados por documento (None desativa)
+            page_archive: Arquivo das páginas de resultado (None desativa)
+            pipeline: Pipeline de coleta, análise em processos e gravação
+                (None analisa e grava na própria thread de scraping)
+            result_writer: Gravação dos resultados em lotes (None grava um
+                commit por documento pesquisado)
         """
         self.database_service = database_service
         self.web_scraper_service = web_scraper_service
@@ -48,6 +90,17 @@ class SPVAutomatico:
         self.filtro = filtro
         self.tempo_inicio = None
         self.logger = logging_service.get_logger(__name__)
+        # A sessão do banco é compartilhada entre as threads de scraping (e o writer de resultados)
+        self._db_lock = result_writer.lock if result_writer is not None else threading.Lock()
+        self.rate_limiter = rate_limiter
+        self.result_cache = result_cache
+        self.page_archive = page_archive
+        self.pipeline = pipeline
+        self.result_writer = result_writer
+        # Identifica este processo nas reservas de pesquisas (CLAIM_PESQUISAS)
+        self.worker_id = config_service.scraping.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._reservadas: List[int] = []
+        self._rate_limiter_lock = threading.Lock()
         
     def executar_pesquisa(self, nome: str, cpf: str, rg: str, cod_pesquisa: int, 
                          spv_tipo: Optional[int] = None) -> bool:
@@ -64,44 +117,268 @@ class SPVAutomatico:
         Returns:
             True se a pesquisa foi executada com sucesso
         """
+        return self.executar_pesquisa_grupo(nome, cpf, rg, [cod_pesquisa]) == 1
+    
+    def executar_pesquisa_grupo(self, nome: str, cpf: str, rg: str, cod_pesquisas: List[int]) -> int:
+        """
+        Executa uma única pesquisa no tribunal para pesquisas com o mesmo documento
+        
+        O resultado é gravado para todas as pesquisas do grupo de uma vez.
+        
+        Args:
+            nome: Nome da pessoa
+            cpf: CPF da pessoa
+            rg: RG da pessoa
+            cod_pesquisas: Códigos das pesquisas que compartilham o documento
+            
+        Returns:
+            Número de pesquisas com resultado salvo
+        """
         try:
-            tempo_inicio_pesquisa = time.time()
+            pagina = self._coletar_pagina(GrupoPesquisa(nome=nome, cpf=cpf, rg=rg, cod_pesquisas=cod_pesquisas))
+            if pagina is None:
+                return 0
             
-            # Valida o documento apropriado para o filtro
-            validation_result = self.validation_service.validate_document_for_filter(
-                self.filtro, cpf, rg, nome
-            )
+            if pagina.resultado is None:
+                # Analisa o resultado e guarda a página para reanálises
+                pagina.resultado, pagina.processos = self.result_analyzer.analisar_processos(pagina.page_source)
+                pagina.pagina_hash = self._arquivar_pagina(pagina.page_source)
             
-            if not validation_result.is_valid:
-                self.logging_service.log_pesquisa_error(
-                    self.logger, 
-                    cod_pesquisa, 
-                    f"{validation_result.error_message} | Valor recebido: CPF='{cpf}', RG='{rg}', Nome='{nome}'"
-                )
-                return False
+            return self._gravar_pagina(pagina)
+                
+        except Exception as e:
+            for cod_pesquisa in cod_pesquisas:
+                self.logging_service.log_pesquisa_error(self.logger, cod_pesquisa, str(e))
+            return 0
+    
+    def _coletar_pagina(self, grupo: GrupoPesquisa) -> Optional[PaginaColetada]:
+        """
+        Estágio de coleta: valida o documento, consulta o cache e baixa a página do tribunal
+        
+        Returns:
+            Página baixada, página com o resultado do cache, ou None se o
+            documento é inválido ou a pesquisa falhou (continua pendente)
+        """
+        cod_pesquisas = grupo.cod_pesquisas
+        try:
+            tempo_inicio_pesquisa = time.time()
             
-            documento = validation_result.corrected_value
+            documento = self._validar_documento(grupo.nome, grupo.cpf, grupo.rg, cod_pesquisas)
+            if documento is None:
+                return None
             
-            # Loga início da pesquisa
-            self.logging_service.log_pesquisa_start(self.logger, cod_pesquisa, documento)
+            # Documento já pesquisado recentemente não volta ao tribunal
+            documento_normalizado = self.validation_service.normalize_document(self.filtro, documento)
+            em_cache = self._consultar_cache(documento_normalizado)
+            if em_cache is not None:
+                resultado, processos = em_cache
+                return PaginaColetada(cod_pesquisas, documento_normalizado, tempo_inicio_pesquisa,
+                                      resultado=resultado, cache_hit=True, processos=processos)
+            
+            # Aguarda a vez no limite de requisições do tribunal
+            self._obter_rate_limiter().acquire()
             
             # Executa a pesquisa usando o web scraper
             page_source = self.web_scraper_service.pesquisar(self.filtro, documento)
+            return PaginaColetada(cod_pesquisas, documento_normalizado, tempo_inicio_pesquisa,
+                                  page_source=page_source)
+                
+        except CircuitOpenError as e:
+            self.logger.warning(f"{e}; {len(cod_pesquisas)} pesquisa(s) continuam pendentes")
+            return None
+        except Exception as e:
+            for cod_pesquisa in cod_pesquisas:
+                self.logging_service.log_pesquisa_error(self.logger, cod_pesquisa, str(e))
+            return None
+    
+    def _gravar_pagina(self, pagina: PaginaColetada) -> int:
+        """
+        Estágio de gravação: guarda o resultado no cache e no banco
+        
+        Returns:
+            Número de pesquisas com resultado salvo
+        """
+        if not pagina.cache_hit:
+            self._gravar_cache(pagina.documento_normalizado, pagina.resultado, pagina.processos)
+        
+        # Calcula tempo de execução
+        tempo_execucao = round(time.time() - pagina.tempo_inicio, 2)
+        
+        return self._salvar_resultado(
+            pagina.cod_pesquisas, pagina.resultado, tempo_execucao, pagina.cache_hit, pagina.pagina_hash,
+            pagina.processos
+        )
+    
+    async def executar_pesquisa_async(self, nome: str, cpf: str, rg: str, cod_pesquisa: int,
+                                      semaforo: asyncio.Semaphore) -> bool:
+        """
+        Versão assíncrona de executar_pesquisa
+        
+        Returns:
+            True se a pesquisa foi executada com sucesso
+        """
+        return await self.executar_pesquisa_grupo_async(nome, cpf, rg, [cod_pesquisa], semaforo) == 1
+    
+    async def executar_pesquisa_grupo_async(self, nome: str, cpf: str, rg: str, cod_pesquisas: List[int],
+                                            semaforo: asyncio.Semaphore) -> int:
+        """
+        Versão assíncrona de executar_pesquisa_grupo
+        
+        A pesquisa, a análise e a gravação rodam em threads para não bloquear o event loop;
+        o semáforo limita as pesquisas simultâneas no host do tribunal e o
+        rate limiter a taxa de requisições.
+        
+        Returns:
+            Número de pesquisas com resultado salvo
+        """
+        try:
+            tempo_inicio_pesquisa = time.time()
+            
+            documento = self._validar_documento(nome, cpf, rg, cod_pesquisas)
+            if documento is None:
+                return 0
             
-            # Analisa o resultado
-            resultado = self.result_analyzer.analisar_resultado(page_source)
+            documento_normalizado = self.validation_service.normalize_document(self.filtro, documento)
+            em_cache = await asyncio.to_thread(self._consultar_cache, documento_normalizado)
+            if em_cache is not None:
+                resultado, processos = em_cache
+                tempo_execucao = round(time.time() - tempo_inicio_pesquisa, 2)
+                return await asyncio.to_thread(
+                    self._salvar_resultado, cod_pesquisas, resultado, tempo_execucao, True, None, processos
+                )
+            
+            async with semaforo:
+                await self._obter_rate_limiter().acquire_async()
+                page_source = await asyncio.to_thread(self.web_scraper_service.pesquisar, self.filtro, documento)
             
-            # Calcula tempo de execução
+            # A análise (lxml e regras) bloquearia as outras pesquisas no event loop
+            resultado, processos = await asyncio.to_thread(self.result_analyzer.analisar_processos, page_source)
+            await asyncio.to_thread(self._gravar_cache, documento_normalizado, resultado, processos)
+            pagina_hash = await asyncio.to_thread(self._arquivar_pagina, page_source)
             tempo_execucao = round(time.time() - tempo_inicio_pesquisa, 2)
             
-            # Salva o resultado no banco
-            sucesso = self.database_service.salvar_resultado_spv(
-                cod_pesquisa=cod_pesquisa,
-                filtro=self.filtro,
-                resultado=resultado,
-                tempo_execucao=tempo_execucao
+            return await asyncio.to_thread(
+                self._salvar_resultado, cod_pesquisas, resultado, tempo_execucao, False, pagina_hash, processos
             )
             
+        except CircuitOpenError as e:
+            self.logger.warning(f"{e}; {len(cod_pesquisas)} pesquisa(s) continuam pendentes")
+            return 0
+        except Exception as e:
+            for cod_pesquisa in cod_pesquisas:
+                self.logging_service.log_pesquisa_error(self.logger, cod_pesquisa, str(e))
+            return 0
+    
+    def _arquivar_pagina(self, page_source: str) -> Optional[str]:
+        """Guarda a página no arquivo de páginas e retorna o hash (None sem arquivo)"""
+        if self.page_archive is None:
+            return None
+        return self.page_archive.guardar(page_source)
+    
+    def _atualizar_analisador(self) -> None:
+        """Recarrega as regras do analisador de resultados se a configuração do website mudou"""
+        try:
+            with self._db_lock:
+                self.result_analyzer.atualizar()
+        except Exception as e:
+            self.logger.warning(f"Não foi possível atualizar as regras de análise: {e}")
+    
+    def _obter_rate_limiter(self) -> RateLimiter:
+        """
+        Retorna o rate limiter do website, criando-o no primeiro uso
+        
+        O limite vem de `websites.configuracao` ("rate_limit") ou, na falta
+        dele, de DELAY_BETWEEN_REQUESTS.
+        """
+        with self._rate_limiter_lock:
+            if self.rate_limiter is None:
+                website_type = self.config_service.scraping.website_type
+                with self._db_lock:
+                    configuracao = self.database_service.get_configuracao_website(website_type)
+                self.rate_limiter = criar_rate_limiter(
+                    website_type,
+                    RateLimitConfig.from_website(configuracao, self.config_service.scraping.delay_between_requests),
+                    self.config_service.scraping.rate_limit_dir,
+                    self.logging_service
+                )
+            return self.rate_limiter
+    
+    def _consultar_cache(self, documento_normalizado: str) -> Optional[ResultadoEmCache]:
+        """Retorna (resultado, processos) em cache do documento no filtro atual, ou None"""
+        if self.result_cache is None:
+            return None
+        # A camada persistente usa a sessão do banco compartilhada
+        with self._db_lock if self.result_cache.persistente else nullcontext():
+            return self.result_cache.get(
+                self.config_service.scraping.website_type, self.filtro, documento_normalizado
+            )
+    
+    def _gravar_cache(self, documento_normalizado: str, resultado: int,
+                      processos: List[ProcessoEncontrado]) -> None:
+        """Guarda o resultado e os processos de uma pesquisa feita no tribunal"""
+        if self.result_cache is None:
+            return
+        with self._db_lock if self.result_cache.persistente else nullcontext():
+            self.result_cache.set(
+                self.config_service.scraping.website_type, self.filtro, documento_normalizado, resultado, processos
+            )
+    
+    def _validar_documento(self, nome: str, cpf: str, rg: str, cod_pesquisas: List[int]) -> Optional[str]:
+        """
+        Valida o documento apropriado para o filtro
+        
+        Returns:
+            Documento corrigido, ou None se for inválido
+        """
+        validation_result = self.validation_service.validate_document_for_filter(
+            self.filtro, cpf, rg, nome
+        )
+        
+        if not validation_result.is_valid:
+            for cod_pesquisa in cod_pesquisas:
+                self.logging_service.log_pesquisa_error(
+                    self.logger, 
+                    cod_pesquisa, 
+                    f"{validation_result.error_message} | Valor recebido: CPF='{cpf}', RG='{rg}', Nome='{nome}'"
+                )
+            return None
+        
+        documento = validation_result.corrected_value
+        
+        # Loga início da pesquisa
+        for cod_pesquisa in cod_pesquisas:
+            self.logging_service.log_pesquisa_start(self.logger, cod_pesquisa, documento)
+        
+        return documento
+    
+    def _salvar_resultado(self, cod_pesquisas: List[int], resultado: int, tempo_execucao: float,
+                          cache_hit: bool = False, pagina_hash: Optional[str] = None,
+                          processos: Optional[List[ProcessoEncontrado]] = None) -> int:
+        """
+        Salva o resultado no banco para todas as pesquisas do grupo
+        
+        Args:
+            cache_hit: Resultado veio do cache de resultados
+            pagina_hash: Hash da página no arquivo de páginas
+            processos: Processos da página ou do cache (None mantém os já gravados)
+        
+        Returns:
+            Número de pesquisas com resultado salvo
+        """
+        if self.result_writer is not None:
+            # Gravado no próximo lote; falhas deixam as pesquisas pendentes
+            self.result_writer.adicionar(
+                ResultadoSPV(cod_pesquisa, self.filtro, resultado, tempo_execucao,
+                             cache_hit=cache_hit, pagina_hash=pagina_hash, processos=processos)
+                for cod_pesquisa in cod_pesquisas
+            )
+            sucesso = True
+        else:
+            sucesso = self._salvar_resultado_no_banco(
+                cod_pesquisas, resultado, tempo_execucao, cache_hit, pagina_hash, processos
+            )
+        
+        for cod_pesquisa in cod_pesquisas:
             if sucesso:
                 self.logging_service.log_pesquisa_success(
                     self.logger, 
@@ -109,22 +386,48 @@ class SPVAutomatico:
                     resultado, 
                     tempo_execucao
                 )
-                return True
             else:
                 self.logging_service.log_pesquisa_error(
                     self.logger, 
                     cod_pesquisa, 
                     "Erro ao salvar resultado no banco"
                 )
-                return False
-                
-        except Exception as e:
-            self.logging_service.log_pesquisa_error(self.logger, cod_pesquisa, str(e))
-            return False
+        
+        return len(cod_pesquisas) if sucesso else 0
+    
+    def _salvar_resultado_no_banco(self, cod_pesquisas: List[int], resultado: int, tempo_execucao: float,
+                                   cache_hit: bool, pagina_hash: Optional[str],
+                                   processos: Optional[List[ProcessoEncontrado]]) -> bool:
+        """Grava o resultado do grupo imediatamente, em uma transação"""
+        with self._db_lock:
+            if len(cod_pesquisas) == 1:
+                return self.database_service.salvar_resultado_spv(
+                    cod_pesquisa=cod_pesquisas[0],
+                    filtro=self.filtro,
+                    resultado=resultado,
+                    tempo_execucao=tempo_execucao,
+                    cache_hit=cache_hit,
+                    pagina_hash=pagina_hash,
+                    processos=processos
+                )
+            else:
+                # Uma única escrita para o grupo inteiro
+                return self.database_service.salvar_resultados_spv(
+                    cod_pesquisas=cod_pesquisas,
+                    filtro=self.filtro,
+                    resultado=resultado,
+                    tempo_execucao=tempo_execucao,
+                    cache_hit=cache_hit,
+                    pagina_hash=pagina_hash,
+                    processos=processos
+                )
     
     def processar_pesquisas_pendentes(self, limit: int = 100) -> int:
         """
-        Processa pesquisas pendentes com paginação
+        Processa uma página de pesquisas pendentes
+        
+        Pesquisas da página com o mesmo documento são agrupadas e pesquisadas
+        uma única vez no tribunal.
         
         Args:
             limit: Número máximo de pesquisas a processar por vez
@@ -133,56 +436,353 @@ class SPVAutomatico:
             Número de pesquisas processadas
         """
         try:
+            self._atualizar_analisador()
+            
             # Obtém pesquisas pendentes
-            pesquisas = self.database_service.get_pesquisas_pendentes(
-                filtro=self.filtro,
-                limit=limit,
-                offset=0
-            )
+            pesquisas = self._buscar_pesquisas_pendentes(limit)
             
             if not pesquisas:
                 self.logger.info(f"Nenhuma pesquisa pendente encontrada para filtro {self.filtro}")
                 return 0
             
-            self.logger.info(f"Processando {len(pesquisas)} pesquisas com filtro {self.filtro}")
+            return self._processar_pagina(pesquisas)
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao processar pesquisas pendentes: {e}")
+            return 0
+        finally:
+            # A próxima página de pendentes não pode trazer pesquisas ainda no lote
+            self._descarregar_resultados()
+            self._liberar_reservas()
+    
+    def drenar_pesquisas_pendentes(self, tamanho_pagina: int = 100) -> int:
+        """
+        Processa página após página até acabarem as pendentes do filtro ou o tempo
+        
+        As páginas vêm de DatabaseService.stream_pesquisas_pendentes (keyset
+        por nome e cod_pesquisa): pesquisas que falharam ficam para o próximo
+        ciclo em vez de voltar na página seguinte.
+        
+        Returns:
+            Número de pesquisas processadas
+        
+        Raises:
+            Exception: erro ao buscar as pendentes; o ciclo falha em vez de
+                parecer que a fila acabou
+        """
+        pesquisas_processadas = 0
+        try:
+            self._atualizar_analisador()
+            
+            for pesquisas in self._paginas_pendentes(tamanho_pagina):
+                pesquisas_processadas += self._processar_pagina(pesquisas)
+                self._descarregar_resultados()
+                
+                if self._tempo_esgotado():
+                    self.logger.info("Tempo máximo de execução atingido")
+                    break
             
-            # Processa cada pesquisa
+            return pesquisas_processadas
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao processar pesquisas pendentes ({pesquisas_processadas} processadas): {e}")
+            raise
+        finally:
+            self._descarregar_resultados()
+            self._liberar_reservas()
+    
+    def _processar_pagina(self, pesquisas: List[PesquisaPendente]) -> int:
+        """
+        Agrupa a página por documento e distribui os documentos entre os drivers
+        
+        Returns:
+            Número de pesquisas processadas
+        """
+        grupos = self._agrupar_por_documento(pesquisas)
+        self.logger.info(
+            f"Processando {len(pesquisas)} pesquisas ({len(grupos)} documentos distintos) com filtro {self.filtro}"
+        )
+        
+        pool_size = self.config_service.scraping.pool_size
+        if self.pipeline is not None:
+            pesquisas_processadas = self._processar_em_pipeline(grupos, pool_size)
+        elif pool_size > 1:
+            pesquisas_processadas = self._processar_em_paralelo(grupos, pool_size)
+        else:
+            # Processa cada documento
             pesquisas_processadas = 0
-            for pesquisa in tqdm(pesquisas, desc=f"Filtro {self.filtro}"):
+            for grupo in tqdm(grupos, desc=f"Filtro {self.filtro}"):
                 # Verifica se o tempo máximo foi atingido
-                if self.tempo_inicio and (time.time() - self.tempo_inicio) >= self.config_service.scraping.max_execution_time:
+                if self._tempo_esgotado():
                     self.logger.info("Tempo máximo de execução atingido")
                     break
-                
-                # Extrai dados da pesquisa
-                cod_pesquisa = pesquisa[0]
-                cod_cliente = pesquisa[1]
-                nome_cliente = pesquisa[2]
-                uf = pesquisa[3]
-                data_entrada = pesquisa[4]
-                nome = pesquisa[5]
-                cpf = pesquisa[6]
-                rg = pesquisa[7]
-                nascimento = pesquisa[8]
-                mae = pesquisa[9]
-                anexo = pesquisa[10]
-                resultado = pesquisa[11]
-                spv_tipo = pesquisa[12]
-                
-                # Executa a pesquisa
-                if self.executar_pesquisa(nome, cpf, rg, cod_pesquisa, spv_tipo):
-                    pesquisas_processadas += 1
-                
-                # Pequena pausa entre pesquisas para não sobrecarregar o servidor
-                time.sleep(self.config_service.scraping.delay_between_requests)
+
+                pesquisas_processadas += self._processar_grupo(grupo)
+        
+        self.logger.info(f"Processadas {pesquisas_processadas} pesquisas com filtro {self.filtro}")
+        return pesquisas_processadas
+    
+    async def processar_pesquisas_pendentes_async(self, limit: int = 100) -> int:
+        """
+        Processa pesquisas pendentes com várias pesquisas em andamento ao mesmo tempo
+        
+        As pesquisas pendentes são consumidas como um stream assíncrono e
+        agrupadas por documento; cada documento vira uma tarefa e o semáforo
+        do host limita quantas ficam em andamento no tribunal.
+        
+        Args:
+            limit: Número máximo de pesquisas a processar por vez
             
-            self.logger.info(f"Processadas {pesquisas_processadas} pesquisas com filtro {self.filtro}")
-            return pesquisas_processadas
+        Returns:
+            Número de pesquisas processadas
+        """
+        try:
+            semaforo = await self._preparar_async()
+            
+            pesquisas = []
+            async for pesquisa in self._stream_pesquisas_pendentes(limit):
+                # Verifica se o tempo máximo foi atingido
+                if self._tempo_esgotado():
+                    self.logger.info("Tempo máximo de execução atingido")
+                    break
+                pesquisas.append(pesquisa)
+            
+            if not pesquisas:
+                self.logger.info(f"Nenhuma pesquisa pendente encontrada para filtro {self.filtro}")
+                return 0
+            
+            return await self._processar_pagina_async(pesquisas, semaforo)
             
         except Exception as e:
             self.logger.error(f"Erro ao processar pesquisas pendentes: {e}")
             return 0
+        finally:
+            await asyncio.to_thread(self._descarregar_resultados)
+            await asyncio.to_thread(self._liberar_reservas)
+    
+    async def drenar_pesquisas_pendentes_async(self, tamanho_pagina: int = 100) -> int:
+        """
+        Versão asyncio de drenar_pesquisas_pendentes
+        
+        Returns:
+            Número de pesquisas processadas
+        
+        Raises:
+            Exception: erro ao buscar as pendentes
+        """
+        pesquisas_processadas = 0
+        try:
+            semaforo = await self._preparar_async()
+            paginas = self._paginas_pendentes(tamanho_pagina)
+            
+            while True:
+                pesquisas = await asyncio.to_thread(next, paginas, None)
+                if pesquisas is None:
+                    break
+                pesquisas_processadas += await self._processar_pagina_async(pesquisas, semaforo)
+                await asyncio.to_thread(self._descarregar_resultados)
+                
+                if self._tempo_esgotado():
+                    self.logger.info("Tempo máximo de execução atingido")
+                    break
+            
+            return pesquisas_processadas
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao processar pesquisas pendentes ({pesquisas_processadas} processadas): {e}")
+            raise
+        finally:
+            await asyncio.to_thread(self._descarregar_resultados)
+            await asyncio.to_thread(self._liberar_reservas)
+    
+    async def _preparar_async(self) -> asyncio.Semaphore:
+        """Semáforo do host do website; cria o rate limiter e recarrega as regras fora do event loop"""
+        semaforos = HostSemaphores(self.config_service.scraping.max_concurrent_per_host)
+        semaforo = semaforos.get(
+            WebScraperFactory.get_website_url(self.config_service.scraping.website_type)
+        )
+        
+        # Cria o rate limiter e recarrega as regras de análise fora do event loop (consulta o banco)
+        await asyncio.to_thread(self._obter_rate_limiter)
+        await asyncio.to_thread(self._atualizar_analisador)
+        return semaforo
+    
+    async def _processar_pagina_async(self, pesquisas: List[PesquisaPendente], semaforo: asyncio.Semaphore) -> int:
+        """Uma tarefa por documento da página, limitadas pelo semáforo do host"""
+        grupos = self._agrupar_por_documento(pesquisas)
+        self.logger.info(
+            f"Processando {len(pesquisas)} pesquisas ({len(grupos)} documentos distintos) com filtro {self.filtro}"
+        )
+        
+        tarefas = [
+            asyncio.create_task(
+                self.executar_pesquisa_grupo_async(grupo.nome, grupo.cpf, grupo.rg, grupo.cod_pesquisas, semaforo)
+            )
+            for grupo in grupos
+        ]
+        pesquisas_processadas = sum(await asyncio.gather(*tarefas))
+        
+        self.logger.info(f"Processadas {pesquisas_processadas} pesquisas com filtro {self.filtro}")
+        return pesquisas_processadas
+    
+    async def _stream_pesquisas_pendentes(self, limit: int) -> AsyncIterator[PesquisaPendente]:
+        """Busca a página de pesquisas pendentes fora do event loop e a entrega linha a linha"""
+        for pesquisa in await asyncio.to_thread(self._buscar_pesquisas_pendentes, limit):
+            yield pesquisa
+    
+    def _buscar_pesquisas_pendentes(self, limit: int) -> List[PesquisaPendente]:
+        """
+        Página de pesquisas pendentes do filtro atual
+        
+        Com CLAIM_PESQUISAS, as pesquisas são reservadas para este worker e
+        outros workers no mesmo banco não as recebem.
+        """
+        with self._db_lock:
+            if not self.config_service.scraping.claim_pesquisas:
+                linhas = self.database_service.get_pesquisas_pendentes(
+                    filtro=self.filtro,
+                    limit=limit,
+                    offset=0
+                )
+                return [PesquisaPendente.da_linha(linha) for linha in linhas]
+            linhas = self.database_service.claim_pesquisas(
+                self.filtro, limit, self.worker_id, self.config_service.scraping.claim_lease_seconds
+            )
+            pesquisas = [PesquisaPendente.da_linha(linha) for linha in linhas]
+            self._reservadas.extend(pesquisa.cod_pesquisa for pesquisa in pesquisas)
+            return pesquisas
+    
+    def _paginas_pendentes(self, tamanho_pagina: int) -> Iterator[List[PesquisaPendente]]:
+        """
+        Todas as pesquisas pendentes do filtro atual, página por página
+        
+        Com CLAIM_PESQUISAS cada página é uma nova reserva; as pesquisas já
+        reservadas por este worker (inclusive as que falharam) não voltam
+        até _liberar_reservas. Sem reservas, as páginas são as de
+        DatabaseService.stream_pesquisas_pendentes.
+        """
+        if self.config_service.scraping.claim_pesquisas:
+            while True:
+                pesquisas = self._buscar_pesquisas_pendentes(tamanho_pagina)
+                if not pesquisas:
+                    return
+                yield pesquisas
+        
+        # O islice para no fim da página, antes de o stream buscar a seguinte
+        stream = self.database_service.stream_pesquisas_pendentes(self.filtro, tamanho_pagina)
+        while True:
+            pesquisas = list(islice(stream, tamanho_pagina))
+            if not pesquisas:
+                return
+            yield pesquisas
+    
+    def _liberar_reservas(self) -> None:
+        """
+        Desfaz as reservas da página processada
+        
+        Pesquisas gravadas já não estão pendentes; as que falharam voltam a
+        ficar disponíveis para qualquer worker sem esperar o prazo da reserva.
+        """
+        if not self._reservadas:
+            return
+        reservadas, self._reservadas = self._reservadas, []
+        with self._db_lock:
+            self.database_service.release_pesquisas(reservadas, self.filtro, self.worker_id)
+    
+    def _descarregar_resultados(self) -> None:
+        """Grava os resultados que ainda estão no lote do writer"""
+        if self.result_writer is not None:
+            self.result_writer.descarregar()
+    
+    def _agrupar_por_documento(self, pesquisas: List[PesquisaPendente]) -> List[GrupoPesquisa]:
+        """
+        Agrupa as pesquisas pendentes pelo documento normalizado do filtro
+        
+        A ordem da primeira ocorrência de cada documento é mantida. Linhas sem
+        documento ficam em grupos próprios para a validação registrar o erro
+        de cada uma.
+        """
+        grupos: Dict[str, GrupoPesquisa] = {}
+        for pesquisa in pesquisas:
+            cod_pesquisa = pesquisa.cod_pesquisa
+            nome = pesquisa.nome
+            cpf = pesquisa.cpf
+            rg = pesquisa.rg
+            
+            documento = nome if self.filtro == 2 else cpf if self.filtro == 0 else rg
+            chave = self.validation_service.normalize_document(self.filtro, documento) or f"#{cod_pesquisa}"
+            
+            if chave in grupos:
+                grupos[chave].cod_pesquisas.append(cod_pesquisa)
+            else:
+                grupos[chave] = GrupoPesquisa(nome=nome, cpf=cpf, rg=rg, cod_pesquisas=[cod_pesquisa])
+        
+        return list(grupos.values())
     
+    def _processar_em_paralelo(self, grupos: List[GrupoPesquisa], pool_size: int) -> int:
+        """
+        Distribui os documentos entre os drivers do pool
+
+        Args:
+            grupos: Pesquisas agrupadas por documento
+            pool_size: Número de pesquisas simultâneas
+
+        Returns:
+            Número de pesquisas processadas
+        """
+        def processar_no_prazo(grupo: GrupoPesquisa) -> int:
+            if self._tempo_esgotado():
+                return 0
+            return self._processar_grupo(grupo)
+
+        pesquisas_processadas = 0
+        with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="spv-scraper") as executor:
+            futures = [executor.submit(processar_no_prazo, grupo) for grupo in grupos]
+            for future in tqdm(as_completed(futures), total=len(futures), desc=f"Filtro {self.filtro}"):
+                pesquisas_processadas += future.result()
+
+        if self._tempo_esgotado():
+            self.logger.info("Tempo máximo de execução atingido")
+
+        return pesquisas_processadas
+
+    def _processar_em_pipeline(self, grupos: List[GrupoPesquisa], pool_size: int) -> int:
+        """
+        Processa os documentos pelo pipeline: os drivers só baixam as páginas,
+        a análise roda no pool de processos e a gravação em uma thread própria
+
+        Returns:
+            Número de pesquisas processadas
+        """
+        pesquisas_processadas = self.pipeline.processar(
+            grupos,
+            coletar=self._coletar_pagina,
+            gravar=self._gravar_pagina,
+            analisador=self.result_analyzer.copia_para_processo(),
+            workers=pool_size,
+            deve_parar=self._tempo_esgotado,
+            descricao=f"Filtro {self.filtro}"
+        )
+
+        if self._tempo_esgotado():
+            self.logger.info("Tempo máximo de execução atingido")
+
+        return pesquisas_processadas
+
+    def _processar_grupo(self, grupo: GrupoPesquisa) -> int:
+        """
+        Executa a pesquisa de um documento e grava o resultado em todas as pesquisas do grupo
+
+        Returns:
+            Número de pesquisas processadas
+        """
+        # O intervalo entre requisições é controlado pelo rate limiter
+        return self.executar_pesquisa_grupo(grupo.nome, grupo.cpf, grupo.rg, grupo.cod_pesquisas)
+
+    def _tempo_esgotado(self) -> bool:
+        """Verifica se o tempo máximo de execução foi atingido"""
+        return bool(self.tempo_inicio) and (time.time() - self.tempo_inicio) >= self.config_service.scraping.max_execution_time
+
     def executar_ciclo_completo(self) -> bool:
         """
         Executa um ciclo completo de pesquisas com todos os filtros
@@ -198,20 +798,22 @@ class SPVAutomatico:
                 self.config_service.scraping.website_type
             )
             
+            self._manter_particoes()
+            pendentes = self._contar_pendentes()
+            
             # Executa com cada filtro
             for filtro in range(4):  # 0, 1, 2, 3
                 self.filtro = filtro
                 
                 # Verifica se há pesquisas pendentes para este filtro
-                count = self.database_service.get_pesquisas_por_filtro(filtro)
-                if count == 0:
+                if not self._existem_pendentes(filtro):
                     self.logger.info(f"Nenhuma pesquisa pendente para filtro {filtro}")
                     continue
                 
-                self.logger.info(f"Executando filtro {filtro} com {count} pesquisas pendentes")
+                self.logger.info(f"Executando filtro {filtro} com {pendentes.get(filtro, '?')} pesquisas pendentes")
                 
-                # Processa pesquisas pendentes
-                pesquisas_processadas = self.processar_pesquisas_pendentes()
+                # Processa as pendentes do filtro até acabarem ou acabar o tempo
+                pesquisas_processadas = self.drenar_pesquisas_pendentes(self.config_service.scraping.batch_size)
                 
                 if pesquisas_processadas > 0:
                     self.logger.info(f"Filtro {filtro} concluído: {pesquisas_processadas} pesquisas processadas")
@@ -223,6 +825,7 @@ class SPVAutomatico:
             
             tempo_total = time.time() - self.tempo_inicio
             self.logging_service.log_execution_end(self.logger, 0, tempo_total)
+            self._log_estatisticas_scraper()
             
             return True
             
@@ -230,6 +833,90 @@ class SPVAutomatico:
             self.logger.error(f"Erro ao executar ciclo completo: {e}")
             return False
     
+    async def executar_ciclo_completo_async(self) -> bool:
+        """
+        Executa um ciclo completo de pesquisas com todos os filtros no modo asyncio
+        
+        Returns:
+            True se o ciclo foi executado com sucesso
+        """
+        try:
+            self.tempo_inicio = time.time()
+            self.logging_service.log_execution_start(
+                self.logger, 
+                self.filtro, 
+                self.config_service.scraping.website_type
+            )
+            
+            await asyncio.to_thread(self._manter_particoes)
+            pendentes = await asyncio.to_thread(self._contar_pendentes)
+            
+            for filtro in range(4):  # 0, 1, 2, 3
+                self.filtro = filtro
+                
+                if not await asyncio.to_thread(self._existem_pendentes, filtro):
+                    self.logger.info(f"Nenhuma pesquisa pendente para filtro {filtro}")
+                    continue
+                
+                self.logger.info(f"Executando filtro {filtro} com {pendentes.get(filtro, '?')} pesquisas pendentes")
+                pesquisas_processadas = await self.drenar_pesquisas_pendentes_async(
+                    self.config_service.scraping.batch_size
+                )
+                
+                if pesquisas_processadas > 0:
+                    self.logger.info(f"Filtro {filtro} concluído: {pesquisas_processadas} pesquisas processadas")
+                
+                if self._tempo_esgotado():
+                    self.logger.info("Tempo máximo de execução atingido")
+                    break
+            
+            tempo_total = time.time() - self.tempo_inicio
+            self.logging_service.log_execution_end(self.logger, 0, tempo_total)
+            self._log_estatisticas_scraper()
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao executar ciclo completo: {e}")
+            return False
+    
+    def _manter_particoes(self) -> None:
+        """Garante as partições de pesquisa_spv dos próximos meses (DB_PARTITION_MONTHS_AHEAD=0 desativa)"""
+        config = self.config_service.database
+        if config.partition_months_ahead <= 0:
+            return
+        with self._db_lock:
+            particoes = self.database_service.manter_particoes_pesquisa_spv(
+                config.partition_months_ahead, config.partition_retention_months
+            )
+        for nome in particoes.get("criadas", []):
+            self.logger.info(f"Partição criada: {nome}")
+        for nome in particoes.get("arquivadas", []):
+            self.logger.info(f"Partição arquivada: {nome}")
+    
+    def _contar_pendentes(self) -> Dict[int, int]:
+        """Pendentes de cada filtro no início do ciclo (estimadas com APPROXIMATE_COUNTS)"""
+        with self._db_lock:
+            return self.database_service.contar_pesquisas_pendentes(
+                aproximado=self.config_service.scraping.approximate_counts
+            )
+    
+    def _existem_pendentes(self, filtro: int) -> bool:
+        with self._db_lock:
+            return self.database_service.existem_pesquisas_pendentes(filtro)
+    
+    def _log_estatisticas_scraper(self) -> None:
+        """Loga os contadores dos drivers (inícios, reciclagens, reinícios), do cache, do arquivo de páginas e do writer"""
+        estatisticas = self.web_scraper_service.get_estatisticas()
+        if self.result_cache is not None:
+            estatisticas = {**estatisticas, **self.result_cache.get_estatisticas()}
+        if self.page_archive is not None:
+            estatisticas = {**estatisticas, **self.page_archive.get_estatisticas()}
+        if self.result_writer is not None:
+            estatisticas = {**estatisticas, **self.result_writer.get_estatisticas()}
+        if estatisticas:
+            self.logging_service.log_statistics(self.logger, estatisticas)
+    
     def executar_loop_continuo(self, intervalo_espera: int = 60, max_tentativas: int = 20) -> None:
         """
         Executa o sistema em loop contínuo
@@ -240,6 +927,12 @@ class SPVAutomatico:
         """
         tentativas = 0
         
+        # Abre os drivers uma vez; eles são reaproveitados entre os ciclos
+        try:
+            self.web_scraper_service.setup_driver()
+        except Exception as e:
+            self.logger.warning(f"Não foi possível pré-aquecer os drivers: {e}")
+        
         while tentativas < max_tentativas:
             try:
                 self.logger.info(f"Iniciando ciclo {tentativas + 1}/{max_tentativas}")
@@ -271,6 +964,16 @@ class SPVAutomatico:
         
         if tentativas >= max_tentativas:
             self.logger.error(f"Número máximo de tentativas ({max_tentativas}) atingido")
+        
+        self.encerrar()
+    
+    def encerrar(self) -> None:
+        """Fecha os drivers e encerra o pipeline de análise e a gravação em lotes"""
+        self.web_scraper_service.close_driver()
+        if self.pipeline is not None:
+            self.pipeline.encerrar()
+        if self.result_writer is not None:
+            self.result_writer.encerrar()
     
     def reiniciar_programa(self) -> None:
         """Reinicia o programa"""
@@ -291,16 +994,117 @@ def create_spv_automatico(config_service: ConfigService) -> SPVAutomatico:
     db = next(get_db())
     database_service = DatabaseService(db, logging_service)
     
-    # Cria web scraper service
-    web_scraper_service = WebScraperService(
-        website_type=config_service.scraping.website_type,
-        headless=config_service.webdriver.headless,
-        driver_path=config_service.webdriver.driver_path,
+    # Perfil do navegador definido para o website (bloqueio de recursos)
+    configuracao_website = database_service.get_configuracao_website(config_service.scraping.website_type)
+    perfil = BrowserProfile.from_website(configuracao_website, config_service.webdriver.block_resources)
+    
+    # Cria web scraper service (um navegador por driver do pool)
+    def criar_web_scraper_service() -> IWebScraperService:
+        return WebScraperFactory.create_service(
+            engine=config_service.scraping.engine,
+            website_type=config_service.scraping.website_type,
+            headless=config_service.webdriver.headless,
+            driver_path=config_service.webdriver.driver_path,
+            logging_service=logging_service,
+            max_paginas=config_service.webdriver.max_pages_per_driver,
+            max_rss_mb=config_service.webdriver.max_rss_mb,
+            perfil=perfil
+        )
+
+    # No modo asyncio o pool também serializa o acesso a cada driver; com menos
+    # drivers que MAX_CONCURRENT_PER_HOST as tarefas esperariam por um driver livre
+    pool_size = config_service.scraping.pool_size
+    if config_service.scraping.async_mode and pool_size < config_service.scraping.max_concurrent_per_host:
+        pool_size = config_service.scraping.max_concurrent_per_host
+        logging_service.get_logger(__name__).info(
+            f"Modo asyncio: pool com {pool_size} drivers (MAX_CONCURRENT_PER_HOST) "
+            f"em vez de SCRAPER_POOL_SIZE={config_service.scraping.pool_size}"
+        )
+    if pool_size > 1 or config_service.scraping.async_mode:
+        web_scraper_service = WebScraperPool(
+            scraper_factory=criar_web_scraper_service,
+            pool_size=pool_size,
+            logging_service=logging_service
+        )
+    else:
+        web_scraper_service = criar_web_scraper_service()
+    
+    # Limite de requisições ao tribunal (rate_limit do website ou DELAY_BETWEEN_REQUESTS)
+    scraping = config_service.scraping
+    rate_limiter = criar_rate_limiter(
+        scraping.website_type,
+        RateLimitConfig.from_website(configuracao_website, scraping.delay_between_requests),
+        scraping.rate_limit_dir,
+        logging_service
+    )
+    
+    # Repetição de falhas transitórias e circuit breaker compartilhado por todos os drivers
+    web_scraper_service = ResilientWebScraperService(
+        web_scraper_service,
+        circuit_breaker=obter_circuit_breaker(
+            scraping.website_type,
+            limite_falhas=scraping.circuit_breaker_failures,
+            tempo_aberto=scraping.circuit_breaker_open_seconds,
+            logging_service=logging_service
+        ),
+        politica=RetryPolicy(
+            max_tentativas=scraping.max_retries + 1,
+            base=scraping.retry_backoff_base,
+            maximo=scraping.retry_backoff_max
+        ),
+        # Uma pesquisa aguarda no máximo duas janelas do circuito aberto e volta à fila
+        espera_maxima=2 * scraping.circuit_breaker_open_seconds,
+        # Cada nova tentativa de uma falha transitória também retira uma ficha do limite do tribunal
+        aguardar_vez=rate_limiter.acquire,
         logging_service=logging_service
     )
     
-    # Cria analisador de resultados
-    result_analyzer = ResultAnalyzer()
+    # Cria analisador de resultados (regras do website e processos da página)
+    result_analyzer = StructuredResultAnalyzer(
+        logging_service,
+        regras=RuleRegistry(database_service, logging_service),
+        website_type=config_service.scraping.website_type
+    )
+    result_analyzer.atualizar()
+    
+    # Cria cache de resultados por documento
+    result_cache = None
+    if config_service.cache.enabled:
+        result_cache = ResultCache(
+            ttl=config_service.cache.ttl,
+            max_entradas=config_service.cache.max_entries,
+            persistencia=database_service if config_service.cache.persistent else None,
+            logging_service=logging_service
+        )
+    
+    # Cria arquivo das páginas de resultado
+    page_archive = None
+    if config_service.archive.enabled:
+        page_archive = PageArchive(
+            config_service.archive.directory,
+            nivel_compressao=config_service.archive.compression_level,
+            logging_service=logging_service
+        )
+    
+    # Análise em processos separados dos drivers (ANALYSIS_PROCESSES)
+    pipeline = None
+    if config_service.scraping.analysis_processes > 0:
+        pipeline = AnalysisPipeline(
+            processos=config_service.scraping.analysis_processes,
+            tamanho_fila=config_service.scraping.pipeline_queue_size,
+            arquivo=page_archive,
+            logging_service=logging_service
+        )
+    
+    # Gravação dos resultados em lotes (RESULT_BATCH_SIZE)
+    result_writer = None
+    if config_service.scraping.result_batch_size > 0:
+        result_writer = ResultWriter(
+            database_service,
+            tamanho_lote=config_service.scraping.result_batch_size,
+            intervalo=config_service.scraping.result_flush_ms / 1000,
+            logging_service=logging_service
+        )
     
     # Cria instância principal
     return SPVAutomatico(
@@ -309,7 +1113,12 @@ def create_spv_automatico(config_service: ConfigService) -> SPVAutomatico:
         result_analyzer=result_analyzer,
         config_service=config_service,
         logging_service=logging_service,
-        validation_service=validation_service
+        validation_service=validation_service,
+        rate_limiter=rate_limiter,
+        result_cache=result_cache,
+        page_archive=page_archive,
+        pipeline=pipeline,
+        result_writer=result_writer
     )
 
 def main():
@@ -325,7 +1134,8 @@ def main():
         config_info = {
             "website_type": config_service.scraping.website_type,
             "headless": config_service.webdriver.headless,
-            "max_execution_time": config_service.scraping.max_execution_time
+            "max_execution_time": config_service.scraping.max_execution_time,
+            "async_mode": config_service.scraping.async_mode
         }
         logging_service.log_configuration(logger, config_info)
         
@@ -336,7 +1146,13 @@ def main():
         
         # Cria e executa o sistema
         spv = create_spv_automatico(config_service)
-        spv.executar_ciclo_completo()
+        try:
+            if config_service.scraping.async_mode:
+                asyncio.run(spv.executar_ciclo_completo_async())
+            else:
+                spv.executar_ciclo_completo()
+        finally:
+            spv.encerrar()
         
     except Exception as e:
         print(f"Erro crítico: {e}")
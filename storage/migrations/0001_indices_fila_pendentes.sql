@@ -0,0 +1,16 @@
+-- Índices das consultas da fila de pendentes
+
+-- A restrição única de pesquisa_spv passa a carregar resultado (INCLUDE): a
+-- junção das pendentes por (cod_pesquisa, cod_spv, filtro) com o teste
+-- ps.resultado IS NULL é respondida pelo índice, sem ler a tabela.
+-- O nome é mantido (alvo do ON CONFLICT ao gravar resultados).
+ALTER TABLE pesquisa_spv DROP CONSTRAINT IF EXISTS uq_pesquisa_spv_pesquisa_filtro;
+ALTER TABLE pesquisa_spv ADD CONSTRAINT uq_pesquisa_spv_pesquisa_filtro
+    UNIQUE (cod_pesquisa, cod_spv, filtro) INCLUDE (resultado);
+
+-- Pesquisas abertas na ordem do nome (e do cursor de get_pesquisas_pendentes_apos)
+-- Só as linhas com data_conclusao IS NULL e tipo = 0 entram no índice.
+DROP INDEX IF EXISTS idx_pesquisas_pendentes_nome;
+CREATE INDEX IF NOT EXISTS idx_pesquisas_abertas_nome
+    ON pesquisas ((COALESCE(nome_corrigido, nome, '')), cod_pesquisa)
+    WHERE data_conclusao IS NULL AND tipo = 0;
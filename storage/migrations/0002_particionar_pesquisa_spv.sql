@@ -0,0 +1,387 @@
+-- Particiona pesquisa_spv por mês de data_execucao
+-- Requer PostgreSQL 13 ou mais novo (triggers BEFORE em tabelas particionadas).
+-- Reescreve a tabela inteira em uma transação: rode fora do horário dos workers.
+
+-- Cria as partições mensais de pesquisa_spv que faltam, de p_inicio (padrão:
+-- mês atual) até p_meses_a_frente meses à frente; retorna as criadas
+CREATE OR REPLACE FUNCTION criar_particoes_pesquisa_spv(
+    p_meses_a_frente INTEGER DEFAULT 3,
+    p_inicio DATE DEFAULT NULL
+)
+RETURNS SETOF VARCHAR AS $$
+DECLARE
+    v_mes DATE := date_trunc('month', COALESCE(p_inicio, CURRENT_DATE))::date;
+    v_fim DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_meses_a_frente))::date;
+    v_nome VARCHAR;
+BEGIN
+    -- Workers fazendo a manutenção ao mesmo tempo esperam um pelo outro
+    PERFORM pg_advisory_xact_lock(hashtext('particoes_pesquisa_spv'));
+    WHILE v_mes <= v_fim LOOP
+        v_nome := 'pesquisa_spv_' || to_char(v_mes, 'YYYY_MM');
+        IF to_regclass(v_nome) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF pesquisa_spv FOR VALUES FROM (%L) TO (%L)',
+                v_nome, v_mes, (v_mes + INTERVAL '1 month')::date
+            );
+            RETURN NEXT v_nome;
+        END IF;
+        v_mes := (v_mes + INTERVAL '1 month')::date;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Desanexa as partições mensais anteriores aos últimos p_meses_retencao meses
+-- e as move, com os seus processos, para o schema arquivo; retorna as arquivadas.
+-- Os contadores de estatísticas deixam de contar os resultados arquivados, e
+-- pesquisas ainda abertas com resultado arquivado voltam a ficar pendentes.
+CREATE OR REPLACE FUNCTION arquivar_particoes_pesquisa_spv(p_meses_retencao INTEGER)
+RETURNS SETOF VARCHAR AS $$
+DECLARE
+    v_limite DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_meses_retencao))::date;
+    v_nome VARCHAR;
+BEGIN
+    IF p_meses_retencao IS NULL OR p_meses_retencao <= 0 THEN
+        RETURN;
+    END IF;
+    PERFORM pg_advisory_xact_lock(hashtext('particoes_pesquisa_spv'));
+    CREATE SCHEMA IF NOT EXISTS arquivo;
+    FOR v_nome IN
+        SELECT c.relname
+        FROM pg_inherits i
+        INNER JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'pesquisa_spv'::regclass
+        AND c.relname ~ '^pesquisa_spv_\d{4}_\d{2}$'
+        AND to_date(substring(c.relname FROM '\d{4}_\d{2}$'), 'YYYY_MM') < v_limite
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE pesquisa_spv DETACH PARTITION %I', v_nome);
+        EXECUTE format(
+            'SELECT ajustar_contador(chave_contador_resultado(resultado), -COUNT(*)) FROM %I GROUP BY resultado',
+            v_nome
+        );
+        EXECUTE format(
+            'CREATE TABLE arquivo.%I AS SELECT pp.* FROM pesquisa_spv_processos pp WHERE pp.cod_pesquisa_spv IN (SELECT cod_pesquisa_spv FROM %I)',
+            v_nome || '_processos', v_nome
+        );
+        EXECUTE format(
+            'DELETE FROM pesquisa_spv_processos pp WHERE pp.cod_pesquisa_spv IN (SELECT cod_pesquisa_spv FROM %I)',
+            v_nome
+        );
+        EXECUTE format('ALTER TABLE %I SET SCHEMA arquivo', v_nome);
+        RETURN NEXT v_nome;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Tabela atual sai do caminho; os nomes dos índices ficam livres
+ALTER TABLE pesquisa_spv RENAME TO pesquisa_spv_antiga;
+ALTER TABLE pesquisa_spv_antiga DROP CONSTRAINT IF EXISTS uq_pesquisa_spv_pesquisa_filtro;
+ALTER INDEX IF EXISTS pesquisa_spv_pkey RENAME TO pesquisa_spv_antiga_pkey;
+DROP INDEX IF EXISTS idx_pesquisa_spv_cod_pesquisa;
+DROP INDEX IF EXISTS idx_pesquisa_spv_resultado;
+DROP INDEX IF EXISTS idx_pesquisa_spv_filtro;
+ALTER TABLE pesquisa_spv_processos DROP CONSTRAINT IF EXISTS pesquisa_spv_processos_cod_pesquisa_spv_fkey;
+
+CREATE TABLE pesquisa_spv (
+    cod_pesquisa_spv INTEGER NOT NULL DEFAULT nextval('pesquisa_spv_cod_pesquisa_spv_seq'),
+    cod_pesquisa INTEGER REFERENCES pesquisas(cod_pesquisa),
+    cod_spv INTEGER DEFAULT 1,
+    cod_spv_computador INTEGER,
+    cod_spv_tipo INTEGER,
+    cod_funcionario INTEGER REFERENCES funcionarios(cod_funcionario),
+    filtro INTEGER NOT NULL,
+    website_id INTEGER DEFAULT 1,
+    resultado INTEGER,
+    data_execucao TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    tempo_execucao DECIMAL(10,2),
+    erro TEXT,
+    cache_hit BOOLEAN DEFAULT FALSE,
+    pagina_hash VARCHAR(64),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (cod_pesquisa_spv, data_execucao)
+) PARTITION BY RANGE (data_execucao);
+ALTER SEQUENCE pesquisa_spv_cod_pesquisa_spv_seq OWNED BY pesquisa_spv.cod_pesquisa_spv;
+
+CREATE TABLE pesquisa_spv_padrao PARTITION OF pesquisa_spv DEFAULT;
+SELECT * FROM criar_particoes_pesquisa_spv(
+    3,
+    (SELECT MIN(COALESCE(data_execucao, created_at, CURRENT_TIMESTAMP))::date FROM pesquisa_spv_antiga)
+);
+
+-- Cópia antes dos triggers: os contadores de estatísticas já contam estas linhas
+INSERT INTO pesquisa_spv (
+    cod_pesquisa_spv, cod_pesquisa, cod_spv, cod_spv_computador, cod_spv_tipo, cod_funcionario, filtro,
+    website_id, resultado, data_execucao, tempo_execucao, erro, cache_hit, pagina_hash, created_at, updated_at
+)
+SELECT
+    cod_pesquisa_spv, cod_pesquisa, cod_spv, cod_spv_computador, cod_spv_tipo, cod_funcionario, filtro,
+    website_id, resultado, COALESCE(data_execucao, created_at, CURRENT_TIMESTAMP), tempo_execucao, erro,
+    cache_hit, pagina_hash, created_at, updated_at
+FROM pesquisa_spv_antiga;
+
+DROP TABLE pesquisa_spv_antiga;
+
+CREATE INDEX idx_pesquisa_spv_pesquisa_filtro ON pesquisa_spv (cod_pesquisa, cod_spv, filtro) INCLUDE (resultado);
+CREATE INDEX idx_pesquisa_spv_resultado ON pesquisa_spv(resultado);
+CREATE INDEX idx_pesquisa_spv_filtro ON pesquisa_spv(filtro);
+
+CREATE TRIGGER update_pesquisa_spv_updated_at BEFORE UPDATE ON pesquisa_spv FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+CREATE TRIGGER contar_pesquisa_spv_insert_delete AFTER INSERT OR DELETE ON pesquisa_spv
+    FOR EACH ROW EXECUTE FUNCTION contar_pesquisa_spv();
+CREATE TRIGGER contar_pesquisa_spv_update AFTER UPDATE OF resultado ON pesquisa_spv
+    FOR EACH ROW WHEN (OLD.resultado IS DISTINCT FROM NEW.resultado) EXECUTE FUNCTION contar_pesquisa_spv();
+
+-- Consultas das pendentes com o limite por data_entrada, que restringe as partições lidas
+
+-- Função para obter pesquisas pendentes com paginação
+CREATE OR REPLACE FUNCTION get_pesquisas_pendentes(
+    p_filtro INTEGER DEFAULT 0,
+    p_limit INTEGER DEFAULT 100,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    cod_pesquisa INTEGER,
+    cod_cliente INTEGER,
+    nome_cliente VARCHAR,
+    uf VARCHAR,
+    data_entrada TIMESTAMP,
+    nome VARCHAR,
+    cpf VARCHAR,
+    rg VARCHAR,
+    nascimento DATE,
+    mae VARCHAR,
+    anexo TEXT,
+    resultado INTEGER,
+    spv_tipo INTEGER
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT DISTINCT 
+        p.cod_pesquisa,
+        p.cod_cliente,
+        c.nome as nome_cliente,
+        e.uf,
+        p.data_entrada,
+        COALESCE(p.nome_corrigido, p.nome) AS nome,
+        p.cpf,
+        COALESCE(p.rg_corrigido, p.rg) AS rg,
+        p.nascimento,
+        COALESCE(p.mae_corrigido, p.mae) AS mae,
+        p.anexo,
+        ps.resultado,
+        ps.cod_spv_tipo
+    FROM pesquisas p
+    INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+    INNER JOIN servicos s ON p.cod_servico = s.cod_servico
+    LEFT JOIN lote_pesquisas lp ON p.cod_pesquisa = lp.cod_pesquisa
+    LEFT JOIN lotes l ON l.cod_lote = lp.cod_lote
+    LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+    LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa 
+        AND ps.cod_spv = 1 
+        AND ps.filtro = p_filtro
+        -- Resultados são posteriores à entrada da pesquisa: só as partições recentes são lidas
+        AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    WHERE p.data_conclusao IS NULL
+    AND ps.resultado IS NULL
+    AND p.tipo = 0
+    AND p.cpf IS NOT NULL 
+    AND p.cpf != ''
+    AND (p_filtro = 0 OR (p_filtro IN (1, 3) AND p.rg IS NOT NULL AND p.rg != ''))
+    AND (e.uf = 'SP' OR p.cod_uf_nascimento = 26 OR p.cod_uf_rg = 26)
+    ORDER BY nome ASC, ps.resultado DESC
+    LIMIT p_limit OFFSET p_offset;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para obter pesquisas pendentes com paginação por keyset
+-- Continua depois do cursor (p_nome, p_cod_pesquisa) da última linha da
+-- página anterior, na ordem de idx_pesquisas_abertas_nome; NULL começa do início.
+CREATE OR REPLACE FUNCTION get_pesquisas_pendentes_apos(
+    p_filtro INTEGER DEFAULT 0,
+    p_limit INTEGER DEFAULT 100,
+    p_nome VARCHAR DEFAULT NULL,
+    p_cod_pesquisa INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+    cod_pesquisa INTEGER,
+    cod_cliente INTEGER,
+    nome_cliente VARCHAR,
+    uf VARCHAR,
+    data_entrada TIMESTAMP,
+    nome VARCHAR,
+    cpf VARCHAR,
+    rg VARCHAR,
+    nascimento DATE,
+    mae VARCHAR,
+    anexo TEXT,
+    resultado INTEGER,
+    spv_tipo INTEGER
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        p.cod_pesquisa,
+        p.cod_cliente,
+        c.nome as nome_cliente,
+        e.uf,
+        p.data_entrada,
+        COALESCE(p.nome_corrigido, p.nome) AS nome,
+        p.cpf,
+        COALESCE(p.rg_corrigido, p.rg) AS rg,
+        p.nascimento,
+        COALESCE(p.mae_corrigido, p.mae) AS mae,
+        p.anexo,
+        ps.resultado,
+        ps.cod_spv_tipo
+    FROM pesquisas p
+    INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+    INNER JOIN servicos s ON p.cod_servico = s.cod_servico
+    LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+    LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa
+        AND ps.cod_spv = 1
+        AND ps.filtro = p_filtro
+        -- Resultados são posteriores à entrada da pesquisa: só as partições recentes são lidas
+        AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    WHERE p.data_conclusao IS NULL
+    AND ps.resultado IS NULL
+    AND p.tipo = 0
+    AND p.cpf IS NOT NULL
+    AND p.cpf != ''
+    AND (p_filtro = 0 OR (p_filtro IN (1, 3) AND p.rg IS NOT NULL AND p.rg != ''))
+    AND (e.uf = 'SP' OR p.cod_uf_nascimento = 26 OR p.cod_uf_rg = 26)
+    AND (p_nome IS NULL OR (COALESCE(p.nome_corrigido, p.nome, ''), p.cod_pesquisa) > (p_nome, p_cod_pesquisa))
+    ORDER BY COALESCE(p.nome_corrigido, p.nome, ''), p.cod_pesquisa
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para contar as pesquisas pendentes de todos os filtros
+-- Mesmo critério de get_pesquisas_pendentes, mas em uma única passada por
+-- pesquisas, sem ordenação e sem as junções com lotes (que só duplicavam linhas).
+CREATE OR REPLACE FUNCTION contar_pesquisas_pendentes()
+RETURNS TABLE (
+    filtro INTEGER,
+    pendentes BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH candidatas AS (
+        SELECT p.cod_pesquisa, COALESCE(p.data_entrada, '-infinity') AS data_entrada,
+            (p.rg IS NOT NULL AND p.rg != '') AS tem_rg
+        FROM pesquisas p
+        INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+        INNER JOIN servicos s ON p.cod_servico = s.cod_servico
+        LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+        WHERE p.data_conclusao IS NULL
+        AND p.tipo = 0
+        AND p.cpf IS NOT NULL
+        AND p.cpf != ''
+        AND (e.uf = 'SP' OR p.cod_uf_nascimento = 26 OR p.cod_uf_rg = 26)
+    )
+    SELECT f.filtro, COUNT(ca.cod_pesquisa)
+    FROM generate_series(0, 3) AS f(filtro)
+    LEFT JOIN candidatas ca
+        ON (f.filtro = 0 OR (f.filtro IN (1, 3) AND ca.tem_rg))
+        AND NOT EXISTS (
+            SELECT 1 FROM pesquisa_spv ps
+            WHERE ps.cod_pesquisa = ca.cod_pesquisa
+            AND ps.cod_spv = 1
+            AND ps.filtro = f.filtro
+            AND ps.data_execucao >= ca.data_entrada
+            AND ps.resultado IS NOT NULL
+        )
+    GROUP BY f.filtro
+    ORDER BY f.filtro;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para reservar pesquisas pendentes para um worker
+-- As pesquisas candidatas são travadas com FOR UPDATE SKIP LOCKED: workers
+-- concorrentes pulam as linhas em disputa em vez de esperar, e cada pesquisa
+-- só é entregue a quem gravou a reserva (nova ou com o prazo vencido).
+CREATE OR REPLACE FUNCTION reservar_pesquisas_pendentes(
+    p_filtro INTEGER,
+    p_limit INTEGER,
+    p_worker_id VARCHAR,
+    p_prazo_segundos INTEGER DEFAULT 600
+)
+RETURNS TABLE (
+    cod_pesquisa INTEGER,
+    cod_cliente INTEGER,
+    nome_cliente VARCHAR,
+    uf VARCHAR,
+    data_entrada TIMESTAMP,
+    nome VARCHAR,
+    cpf VARCHAR,
+    rg VARCHAR,
+    nascimento DATE,
+    mae VARCHAR,
+    anexo TEXT,
+    resultado INTEGER,
+    spv_tipo INTEGER
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH candidatas AS (
+        SELECT p.cod_pesquisa
+        FROM pesquisas p
+        INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+        INNER JOIN servicos s ON p.cod_servico = s.cod_servico
+        LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+        LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa
+            AND ps.cod_spv = 1
+            AND ps.filtro = p_filtro
+            -- Resultados são posteriores à entrada da pesquisa: só as partições recentes são lidas
+            AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+        LEFT JOIN pesquisa_spv_reservas r ON r.cod_pesquisa = p.cod_pesquisa
+            AND r.filtro = p_filtro
+        WHERE p.data_conclusao IS NULL
+        AND ps.resultado IS NULL
+        AND p.tipo = 0
+        AND p.cpf IS NOT NULL
+        AND p.cpf != ''
+        AND (p_filtro = 0 OR (p_filtro IN (1, 3) AND p.rg IS NOT NULL AND p.rg != ''))
+        AND (e.uf = 'SP' OR p.cod_uf_nascimento = 26 OR p.cod_uf_rg = 26)
+        AND (r.cod_pesquisa IS NULL OR r.expira_em < CURRENT_TIMESTAMP)
+        ORDER BY COALESCE(p.nome_corrigido, p.nome) ASC
+        LIMIT p_limit
+        FOR UPDATE OF p SKIP LOCKED
+    ),
+    reservadas AS (
+        INSERT INTO pesquisa_spv_reservas AS r (cod_pesquisa, filtro, worker_id, expira_em)
+        SELECT candidatas.cod_pesquisa, p_filtro, p_worker_id,
+               CURRENT_TIMESTAMP + make_interval(secs => p_prazo_segundos)
+        FROM candidatas
+        ON CONFLICT ON CONSTRAINT pesquisa_spv_reservas_pkey DO UPDATE
+            SET worker_id = EXCLUDED.worker_id, expira_em = EXCLUDED.expira_em
+            WHERE r.expira_em < CURRENT_TIMESTAMP
+        RETURNING r.cod_pesquisa
+    )
+    SELECT
+        p.cod_pesquisa,
+        p.cod_cliente,
+        c.nome as nome_cliente,
+        e.uf,
+        p.data_entrada,
+        COALESCE(p.nome_corrigido, p.nome) AS nome,
+        p.cpf,
+        COALESCE(p.rg_corrigido, p.rg) AS rg,
+        p.nascimento,
+        COALESCE(p.mae_corrigido, p.mae) AS mae,
+        p.anexo,
+        ps.resultado,
+        ps.cod_spv_tipo
+    FROM reservadas
+    INNER JOIN pesquisas p ON p.cod_pesquisa = reservadas.cod_pesquisa
+    INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+    LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+    LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa
+        AND ps.cod_spv = 1
+        AND ps.filtro = p_filtro
+        -- Resultados são posteriores à entrada da pesquisa: só as partições recentes são lidas
+        AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    ORDER BY 6 ASC;
+END;
+$$ LANGUAGE plpgsql;
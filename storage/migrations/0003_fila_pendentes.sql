@@ -0,0 +1,389 @@
+-- Fila das pesquisas pendentes (spv_fila), mantida por triggers
+-- As funções das pendentes passam a ler a fila em vez de refazer as junções
+-- a cada chamada. idx_pesquisas_abertas_nome (0001) só servia a essas
+-- consultas e é removido. No final a fila é preenchida com as pendentes
+-- atuais; as gravações em pesquisas e pesquisa_spv esperam até o commit.
+
+-- Fila das pesquisas pendentes de cada filtro, mantida por triggers
+-- Uma linha por pesquisa e filtro pendente (ver spv_fila_calculada), com a
+-- chave da ordem de processamento; os workers leem as páginas só por ela.
+CREATE TABLE spv_fila (
+    cod_pesquisa INTEGER NOT NULL REFERENCES pesquisas(cod_pesquisa) ON DELETE CASCADE,
+    filtro INTEGER NOT NULL,
+    nome VARCHAR(200) NOT NULL, -- COALESCE(nome_corrigido, nome, '')
+    PRIMARY KEY (cod_pesquisa, filtro)
+);
+
+-- Pendentes na ordem do nome e do cursor de get_pesquisas_pendentes_apos: a
+-- página de um filtro é um trecho contínuo do índice
+CREATE INDEX idx_spv_fila_ordem ON spv_fila (filtro, nome, cod_pesquisa);
+DROP INDEX IF EXISTS idx_pesquisas_abertas_nome;
+
+-- Pesquisas pendentes de cada filtro, calculadas a partir das tabelas
+-- É a definição das pendentes: spv_fila é mantida igual a esta view pelos
+-- triggers (atualizar_spv_fila) e refeita por reconstruir_spv_fila. Só os
+-- filtros 0 (CPF), 1 e 3 (RG) têm pendentes, como nas consultas anteriores.
+CREATE OR REPLACE VIEW spv_fila_calculada AS
+SELECT
+    p.cod_pesquisa,
+    f.filtro,
+    COALESCE(p.nome_corrigido, p.nome, '')::VARCHAR(200) AS nome
+FROM pesquisas p
+INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+INNER JOIN servicos s ON p.cod_servico = s.cod_servico
+LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+CROSS JOIN (VALUES (0), (1), (3)) AS f(filtro)
+WHERE p.data_conclusao IS NULL
+AND p.tipo = 0
+AND p.cpf IS NOT NULL
+AND p.cpf != ''
+AND (f.filtro = 0 OR (p.rg IS NOT NULL AND p.rg != ''))
+AND (e.uf = 'SP' OR p.cod_uf_nascimento = 26 OR p.cod_uf_rg = 26)
+AND NOT EXISTS (
+    SELECT 1 FROM pesquisa_spv ps
+    WHERE ps.cod_pesquisa = p.cod_pesquisa
+    AND ps.cod_spv = 1
+    AND ps.filtro = f.filtro
+    -- Resultados são posteriores à entrada da pesquisa: só as partições recentes são lidas
+    AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    AND ps.resultado IS NOT NULL
+);
+
+-- Acerta as linhas de spv_fila de uma pesquisa com spv_fila_calculada
+-- Só remove os filtros que deixaram de estar pendentes e só insere os que
+-- faltam, sem mexer nas linhas que continuam na fila (e podem estar
+-- travadas por uma reserva em andamento).
+CREATE OR REPLACE FUNCTION atualizar_spv_fila(p_cod_pesquisa INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM spv_fila q
+    WHERE q.cod_pesquisa = p_cod_pesquisa
+    AND NOT EXISTS (
+        SELECT 1 FROM spv_fila_calculada fc
+        WHERE fc.cod_pesquisa = p_cod_pesquisa
+        AND fc.filtro = q.filtro
+    );
+    INSERT INTO spv_fila (cod_pesquisa, filtro, nome)
+    SELECT fc.cod_pesquisa, fc.filtro, fc.nome
+    FROM spv_fila_calculada fc
+    WHERE fc.cod_pesquisa = p_cod_pesquisa
+    ON CONFLICT (cod_pesquisa, filtro) DO UPDATE
+    SET nome = EXCLUDED.nome
+    WHERE spv_fila.nome IS DISTINCT FROM EXCLUDED.nome;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION atualizar_spv_fila_pesquisa()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM atualizar_spv_fila(NEW.cod_pesquisa);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION atualizar_spv_fila_resultado()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM atualizar_spv_fila(OLD.cod_pesquisa);
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.cod_pesquisa IS DISTINCT FROM OLD.cod_pesquisa) THEN
+        PERFORM atualizar_spv_fila(NEW.cod_pesquisa);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Triggers da fila: só disparam quando muda alguma coluna do critério das pendentes
+-- (pesquisas excluídas saem da fila pela chave estrangeira)
+CREATE TRIGGER fila_pesquisas_insert AFTER INSERT ON pesquisas
+    FOR EACH ROW EXECUTE FUNCTION atualizar_spv_fila_pesquisa();
+CREATE TRIGGER fila_pesquisas_update AFTER UPDATE OF
+    cod_cliente, cod_servico, cod_uf, cod_uf_nascimento, cod_uf_rg, tipo, cpf, rg,
+    nome, nome_corrigido, data_entrada, data_conclusao
+    ON pesquisas
+    FOR EACH ROW EXECUTE FUNCTION atualizar_spv_fila_pesquisa();
+CREATE TRIGGER fila_pesquisa_spv_insert_delete AFTER INSERT OR DELETE ON pesquisa_spv
+    FOR EACH ROW EXECUTE FUNCTION atualizar_spv_fila_resultado();
+CREATE TRIGGER fila_pesquisa_spv_update AFTER UPDATE OF cod_pesquisa, cod_spv, filtro, resultado, data_execucao
+    ON pesquisa_spv
+    FOR EACH ROW EXECUTE FUNCTION atualizar_spv_fila_resultado();
+
+-- Refaz spv_fila a partir de spv_fila_calculada; retorna as pendentes por filtro
+-- Mesmo lock de reconciliar_contadores: as gravações esperam a reconstrução.
+CREATE OR REPLACE FUNCTION reconstruir_spv_fila()
+RETURNS TABLE (
+    filtro INTEGER,
+    pendentes BIGINT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    LOCK TABLE pesquisas, pesquisa_spv IN SHARE MODE;
+    DELETE FROM spv_fila;
+    INSERT INTO spv_fila (cod_pesquisa, filtro, nome)
+    SELECT fc.cod_pesquisa, fc.filtro, fc.nome FROM spv_fila_calculada fc;
+
+    RETURN QUERY
+    SELECT cp.filtro, cp.pendentes FROM contar_pesquisas_pendentes() cp;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para obter pesquisas pendentes com paginação
+-- A página sai de spv_fila na ordem de idx_spv_fila_ordem; as demais colunas
+-- vêm das pesquisas da página, pela chave primária.
+CREATE OR REPLACE FUNCTION get_pesquisas_pendentes(
+    p_filtro INTEGER DEFAULT 0,
+    p_limit INTEGER DEFAULT 100,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    cod_pesquisa INTEGER,
+    cod_cliente INTEGER,
+    nome_cliente VARCHAR,
+    uf VARCHAR,
+    data_entrada TIMESTAMP,
+    nome VARCHAR,
+    cpf VARCHAR,
+    rg VARCHAR,
+    nascimento DATE,
+    mae VARCHAR,
+    anexo TEXT,
+    resultado INTEGER,
+    spv_tipo INTEGER
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        p.cod_pesquisa,
+        p.cod_cliente,
+        c.nome as nome_cliente,
+        e.uf,
+        p.data_entrada,
+        COALESCE(p.nome_corrigido, p.nome) AS nome,
+        p.cpf,
+        COALESCE(p.rg_corrigido, p.rg) AS rg,
+        p.nascimento,
+        COALESCE(p.mae_corrigido, p.mae) AS mae,
+        p.anexo,
+        ps.resultado,
+        ps.cod_spv_tipo
+    FROM (
+        SELECT q.cod_pesquisa, q.nome
+        FROM spv_fila q
+        WHERE q.filtro = p_filtro
+        ORDER BY q.nome, q.cod_pesquisa
+        LIMIT p_limit OFFSET p_offset
+    ) fila
+    INNER JOIN pesquisas p ON p.cod_pesquisa = fila.cod_pesquisa
+    INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+    LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+    LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa
+        AND ps.cod_spv = 1
+        AND ps.filtro = p_filtro
+        AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    ORDER BY fila.nome, fila.cod_pesquisa;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para obter pesquisas pendentes com paginação por keyset
+-- Continua depois do cursor (p_nome, p_cod_pesquisa) da última linha da
+-- página anterior, na ordem de idx_spv_fila_ordem; NULL começa do início.
+CREATE OR REPLACE FUNCTION get_pesquisas_pendentes_apos(
+    p_filtro INTEGER DEFAULT 0,
+    p_limit INTEGER DEFAULT 100,
+    p_nome VARCHAR DEFAULT NULL,
+    p_cod_pesquisa INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+    cod_pesquisa INTEGER,
+    cod_cliente INTEGER,
+    nome_cliente VARCHAR,
+    uf VARCHAR,
+    data_entrada TIMESTAMP,
+    nome VARCHAR,
+    cpf VARCHAR,
+    rg VARCHAR,
+    nascimento DATE,
+    mae VARCHAR,
+    anexo TEXT,
+    resultado INTEGER,
+    spv_tipo INTEGER
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        p.cod_pesquisa,
+        p.cod_cliente,
+        c.nome as nome_cliente,
+        e.uf,
+        p.data_entrada,
+        COALESCE(p.nome_corrigido, p.nome) AS nome,
+        p.cpf,
+        COALESCE(p.rg_corrigido, p.rg) AS rg,
+        p.nascimento,
+        COALESCE(p.mae_corrigido, p.mae) AS mae,
+        p.anexo,
+        ps.resultado,
+        ps.cod_spv_tipo
+    FROM (
+        SELECT q.cod_pesquisa, q.nome
+        FROM spv_fila q
+        WHERE q.filtro = p_filtro
+        AND (p_nome IS NULL OR (q.nome, q.cod_pesquisa) > (p_nome, p_cod_pesquisa))
+        ORDER BY q.nome, q.cod_pesquisa
+        LIMIT p_limit
+    ) fila
+    INNER JOIN pesquisas p ON p.cod_pesquisa = fila.cod_pesquisa
+    INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+    LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+    LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa
+        AND ps.cod_spv = 1
+        AND ps.filtro = p_filtro
+        AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    ORDER BY fila.nome, fila.cod_pesquisa;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para contar as pesquisas pendentes de todos os filtros
+-- Uma passada pelo índice de spv_fila, agrupada por filtro.
+CREATE OR REPLACE FUNCTION contar_pesquisas_pendentes()
+RETURNS TABLE (
+    filtro INTEGER,
+    pendentes BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT f.filtro, COUNT(q.cod_pesquisa)
+    FROM generate_series(0, 3) AS f(filtro)
+    LEFT JOIN spv_fila q ON q.filtro = f.filtro
+    GROUP BY f.filtro
+    ORDER BY f.filtro;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para reservar pesquisas pendentes para um worker
+-- As linhas candidatas de spv_fila são travadas com FOR UPDATE SKIP LOCKED:
+-- workers concorrentes pulam as linhas em disputa em vez de esperar, e cada
+-- pesquisa só é entregue a quem gravou a reserva (nova ou com o prazo vencido).
+CREATE OR REPLACE FUNCTION reservar_pesquisas_pendentes(
+    p_filtro INTEGER,
+    p_limit INTEGER,
+    p_worker_id VARCHAR,
+    p_prazo_segundos INTEGER DEFAULT 600
+)
+RETURNS TABLE (
+    cod_pesquisa INTEGER,
+    cod_cliente INTEGER,
+    nome_cliente VARCHAR,
+    uf VARCHAR,
+    data_entrada TIMESTAMP,
+    nome VARCHAR,
+    cpf VARCHAR,
+    rg VARCHAR,
+    nascimento DATE,
+    mae VARCHAR,
+    anexo TEXT,
+    resultado INTEGER,
+    spv_tipo INTEGER
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH candidatas AS (
+        SELECT q.cod_pesquisa
+        FROM spv_fila q
+        LEFT JOIN pesquisa_spv_reservas r ON r.cod_pesquisa = q.cod_pesquisa
+            AND r.filtro = q.filtro
+        WHERE q.filtro = p_filtro
+        AND (r.cod_pesquisa IS NULL OR r.expira_em < CURRENT_TIMESTAMP)
+        ORDER BY q.nome, q.cod_pesquisa
+        LIMIT p_limit
+        FOR UPDATE OF q SKIP LOCKED
+    ),
+    reservadas AS (
+        INSERT INTO pesquisa_spv_reservas AS r (cod_pesquisa, filtro, worker_id, expira_em)
+        SELECT candidatas.cod_pesquisa, p_filtro, p_worker_id,
+               CURRENT_TIMESTAMP + make_interval(secs => p_prazo_segundos)
+        FROM candidatas
+        ON CONFLICT ON CONSTRAINT pesquisa_spv_reservas_pkey DO UPDATE
+            SET worker_id = EXCLUDED.worker_id, expira_em = EXCLUDED.expira_em
+            WHERE r.expira_em < CURRENT_TIMESTAMP
+        RETURNING r.cod_pesquisa
+    )
+    SELECT
+        p.cod_pesquisa,
+        p.cod_cliente,
+        c.nome as nome_cliente,
+        e.uf,
+        p.data_entrada,
+        COALESCE(p.nome_corrigido, p.nome) AS nome,
+        p.cpf,
+        COALESCE(p.rg_corrigido, p.rg) AS rg,
+        p.nascimento,
+        COALESCE(p.mae_corrigido, p.mae) AS mae,
+        p.anexo,
+        ps.resultado,
+        ps.cod_spv_tipo
+    FROM reservadas
+    INNER JOIN pesquisas p ON p.cod_pesquisa = reservadas.cod_pesquisa
+    INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+    LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+    LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa
+        AND ps.cod_spv = 1
+        AND ps.filtro = p_filtro
+        -- Resultados são posteriores à entrada da pesquisa: só as partições recentes são lidas
+        AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    ORDER BY 6 ASC;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Arquivar partições também devolve à fila as pesquisas abertas
+-- Desanexa as partições mensais anteriores aos últimos p_meses_retencao meses
+-- e as move, com os seus processos, para o schema arquivo; retorna as arquivadas.
+-- Os contadores de estatísticas deixam de contar os resultados arquivados, e
+-- pesquisas ainda abertas com resultado arquivado voltam para spv_fila.
+CREATE OR REPLACE FUNCTION arquivar_particoes_pesquisa_spv(p_meses_retencao INTEGER)
+RETURNS SETOF VARCHAR AS $$
+DECLARE
+    v_limite DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_meses_retencao))::date;
+    v_nome VARCHAR;
+BEGIN
+    IF p_meses_retencao IS NULL OR p_meses_retencao <= 0 THEN
+        RETURN;
+    END IF;
+    PERFORM pg_advisory_xact_lock(hashtext('particoes_pesquisa_spv'));
+    CREATE SCHEMA IF NOT EXISTS arquivo;
+    FOR v_nome IN
+        SELECT c.relname
+        FROM pg_inherits i
+        INNER JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'pesquisa_spv'::regclass
+        AND c.relname ~ '^pesquisa_spv_\d{4}_\d{2}$'
+        AND to_date(substring(c.relname FROM '\d{4}_\d{2}$'), 'YYYY_MM') < v_limite
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE pesquisa_spv DETACH PARTITION %I', v_nome);
+        EXECUTE format(
+            'SELECT ajustar_contador(chave_contador_resultado(resultado), -COUNT(*)) FROM %I GROUP BY resultado',
+            v_nome
+        );
+        EXECUTE format(
+            'SELECT atualizar_spv_fila(a.cod_pesquisa) FROM (SELECT DISTINCT cod_pesquisa FROM %I) a '
+            'INNER JOIN pesquisas p ON p.cod_pesquisa = a.cod_pesquisa WHERE p.data_conclusao IS NULL',
+            v_nome
+        );
+        EXECUTE format(
+            'CREATE TABLE arquivo.%I AS SELECT pp.* FROM pesquisa_spv_processos pp WHERE pp.cod_pesquisa_spv IN (SELECT cod_pesquisa_spv FROM %I)',
+            v_nome || '_processos', v_nome
+        );
+        EXECUTE format(
+            'DELETE FROM pesquisa_spv_processos pp WHERE pp.cod_pesquisa_spv IN (SELECT cod_pesquisa_spv FROM %I)',
+            v_nome
+        );
+        EXECUTE format('ALTER TABLE %I SET SCHEMA arquivo', v_nome);
+        RETURN NEXT v_nome;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT * FROM reconstruir_spv_fila();
@@ -0,0 +1,5 @@
+-- Processos da página junto com o resultado no cache persistente
+-- Pesquisas respondidas pelo cache passam a gravar os processos em
+-- pesquisa_spv_processos. Entradas antigas ficam com processos NULL e são
+-- tratadas como miss: o documento volta ao tribunal uma vez.
+ALTER TABLE resultado_cache ADD COLUMN IF NOT EXISTS processos JSONB;
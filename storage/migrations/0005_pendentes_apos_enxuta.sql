@@ -0,0 +1,37 @@
+-- Página de pendentes por keyset só com as colunas da consulta ao tribunal
+-- stream_pesquisas_pendentes usa só cod_pesquisa, nome, cpf e rg; a função
+-- deixa de juntar clientes, estados e pesquisa_spv e de ler anexo e mae.
+-- O tipo de retorno muda, então a função é removida e criada de novo.
+DROP FUNCTION IF EXISTS get_pesquisas_pendentes_apos(INTEGER, INTEGER, VARCHAR, INTEGER);
+
+CREATE FUNCTION get_pesquisas_pendentes_apos(
+    p_filtro INTEGER DEFAULT 0,
+    p_limit INTEGER DEFAULT 100,
+    p_nome VARCHAR DEFAULT NULL,
+    p_cod_pesquisa INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+    cod_pesquisa INTEGER,
+    nome VARCHAR,
+    cpf VARCHAR,
+    rg VARCHAR
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        p.cod_pesquisa,
+        COALESCE(p.nome_corrigido, p.nome) AS nome,
+        p.cpf,
+        COALESCE(p.rg_corrigido, p.rg) AS rg
+    FROM (
+        SELECT q.cod_pesquisa, q.nome
+        FROM spv_fila q
+        WHERE q.filtro = p_filtro
+        AND (p_nome IS NULL OR (q.nome, q.cod_pesquisa) > (p_nome, p_cod_pesquisa))
+        ORDER BY q.nome, q.cod_pesquisa
+        LIMIT p_limit
+    ) fila
+    INNER JOIN pesquisas p ON p.cod_pesquisa = fila.cod_pesquisa
+    ORDER BY fila.nome, fila.cod_pesquisa;
+END;
+$$ LANGUAGE plpgsql;
@@ -4,6 +4,14 @@
 -- Extensões necessárias
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Migrações aplicadas (storage/migrations, aplicadas com `make migrate`)
+-- Este arquivo já contém o resultado das migrações registradas no final.
+CREATE TABLE schema_migrations (
+    versao VARCHAR(4) PRIMARY KEY,
+    nome VARCHAR(200) NOT NULL,
+    aplicada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Tabela de estados brasileiros
 CREATE TABLE estados (
     cod_uf SERIAL PRIMARY KEY,
@@ -107,8 +115,11 @@ CREATE TABLE lote_pesquisas (
 );
 
 -- Tabela de resultados de pesquisa SPV
+-- Particionada por mês de data_execucao (pesquisa_spv_AAAA_MM, criadas por
+-- criar_particoes_pesquisa_spv; pesquisa_spv_padrao recebe o que cair fora delas).
+-- A chave primária inclui data_execucao, exigência das tabelas particionadas.
 CREATE TABLE pesquisa_spv (
-    cod_pesquisa_spv SERIAL PRIMARY KEY,
+    cod_pesquisa_spv SERIAL,
     cod_pesquisa INTEGER REFERENCES pesquisas(cod_pesquisa),
     cod_spv INTEGER DEFAULT 1,
     cod_spv_computador INTEGER,
@@ -117,11 +128,74 @@ CREATE TABLE pesquisa_spv (
     filtro INTEGER NOT NULL, -- 0: CPF, 1: RG, 2: Nome, 3: RG alternativo
     website_id INTEGER DEFAULT 1,
     resultado INTEGER, -- 1: Nada consta, 2: Criminal, 5: Cível, 7: Erro
-    data_execucao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    data_execucao TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     tempo_execucao DECIMAL(10,2),
     erro TEXT,
+    cache_hit BOOLEAN DEFAULT FALSE, -- TRUE quando o resultado veio do cache de resultados
+    pagina_hash VARCHAR(64), -- sha256 da página de resultado no arquivo de páginas
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (cod_pesquisa_spv, data_execucao)
+) PARTITION BY RANGE (data_execucao);
+
+CREATE TABLE pesquisa_spv_padrao PARTITION OF pesquisa_spv DEFAULT;
+
+-- Processos listados na página de resultado de uma pesquisa SPV
+CREATE TABLE pesquisa_spv_processos (
+    cod_pesquisa_spv_processo SERIAL PRIMARY KEY,
+    -- Sem chave estrangeira: a chave de pesquisa_spv inclui data_execucao. Os
+    -- processos são substituídos junto com o resultado e arquivados com a partição.
+    cod_pesquisa_spv INTEGER NOT NULL,
+    numero VARCHAR(30) NOT NULL, -- número CNJ do processo
+    classe VARCHAR(200),
+    assunto VARCHAR(200),
+    foro VARCHAR(200),
+    data_distribuicao DATE,
+    participacao VARCHAR(100), -- ex: Réu, Vítima, Testemunha
+    criminal BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Reservas de pesquisas pendentes por worker (CLAIM_PESQUISAS)
+-- Uma pesquisa reservada não é entregue a outro worker até expira_em
+CREATE TABLE pesquisa_spv_reservas (
+    cod_pesquisa INTEGER NOT NULL REFERENCES pesquisas(cod_pesquisa) ON DELETE CASCADE,
+    filtro INTEGER NOT NULL,
+    worker_id VARCHAR(100) NOT NULL,
+    expira_em TIMESTAMP NOT NULL,
+    PRIMARY KEY (cod_pesquisa, filtro)
+);
+
+-- Fila das pesquisas pendentes de cada filtro, mantida por triggers
+-- Uma linha por pesquisa e filtro pendente (ver spv_fila_calculada), com a
+-- chave da ordem de processamento; os workers leem as páginas só por ela.
+CREATE TABLE spv_fila (
+    cod_pesquisa INTEGER NOT NULL REFERENCES pesquisas(cod_pesquisa) ON DELETE CASCADE,
+    filtro INTEGER NOT NULL,
+    nome VARCHAR(200) NOT NULL, -- COALESCE(nome_corrigido, nome, '')
+    PRIMARY KEY (cod_pesquisa, filtro)
+);
+
+-- Contadores das estatísticas de pesquisas, mantidos por triggers
+-- Cada conexão soma na sua fatia (pg_backend_pid() % 16), então workers
+-- gravando ao mesmo tempo não disputam a mesma linha; o total é a soma das fatias.
+-- Chaves: pendentes, concluidas, nada_consta, criminal, civel
+CREATE TABLE estatisticas_contadores (
+    chave VARCHAR(30) NOT NULL,
+    fatia SMALLINT NOT NULL DEFAULT 0,
+    valor BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (chave, fatia)
+);
+
+-- Cache persistente de resultados por documento (camada opcional do cache em memória)
+CREATE TABLE resultado_cache (
+    website VARCHAR(50) NOT NULL,
+    filtro INTEGER NOT NULL,
+    documento VARCHAR(200) NOT NULL, -- documento normalizado
+    resultado INTEGER NOT NULL,
+    processos JSONB, -- processos da página (lista de objetos); NULL nas entradas anteriores à 0004
+    data_resultado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (website, filtro, documento)
 );
 
 -- Tabela de configurações de websites
@@ -142,9 +216,16 @@ CREATE INDEX idx_pesquisas_data_entrada ON pesquisas(data_entrada);
 CREATE INDEX idx_pesquisas_cpf ON pesquisas(cpf);
 CREATE INDEX idx_pesquisas_rg ON pesquisas(rg);
 CREATE INDEX idx_pesquisas_nome ON pesquisas(nome);
-CREATE INDEX idx_pesquisa_spv_cod_pesquisa ON pesquisa_spv(cod_pesquisa);
+-- Pendentes na ordem do nome e do cursor de get_pesquisas_pendentes_apos: a
+-- página de um filtro é um trecho contínuo do índice
+CREATE INDEX idx_spv_fila_ordem ON spv_fila (filtro, nome, cod_pesquisa);
+-- Um registro por pesquisa, SPV e filtro; a unicidade não pode ser garantida
+-- pelo banco entre partições e fica a cargo de quem grava (ver _gravar_resultados).
+-- INCLUDE (resultado): o teste das pendentes é respondido só pelo índice
+CREATE INDEX idx_pesquisa_spv_pesquisa_filtro ON pesquisa_spv (cod_pesquisa, cod_spv, filtro) INCLUDE (resultado);
 CREATE INDEX idx_pesquisa_spv_resultado ON pesquisa_spv(resultado);
 CREATE INDEX idx_pesquisa_spv_filtro ON pesquisa_spv(filtro);
+CREATE INDEX idx_pesquisa_spv_processos_cod_pesquisa_spv ON pesquisa_spv_processos(cod_pesquisa_spv);
 CREATE INDEX idx_lote_pesquisas_cod_lote ON lote_pesquisas(cod_lote);
 CREATE INDEX idx_lote_pesquisas_cod_pesquisa ON lote_pesquisas(cod_pesquisa);
 
@@ -168,6 +249,282 @@ CREATE TRIGGER update_lote_pesquisas_updated_at BEFORE UPDATE ON lote_pesquisas
 CREATE TRIGGER update_pesquisa_spv_updated_at BEFORE UPDATE ON pesquisa_spv FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_websites_updated_at BEFORE UPDATE ON websites FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Ajusta um contador de estatisticas_contadores na fatia da conexão atual
+CREATE OR REPLACE FUNCTION ajustar_contador(p_chave VARCHAR, p_delta BIGINT)
+RETURNS VOID AS $$
+BEGIN
+    IF p_chave IS NULL OR p_delta = 0 THEN
+        RETURN;
+    END IF;
+    INSERT INTO estatisticas_contadores (chave, fatia, valor)
+    VALUES (p_chave, pg_backend_pid() % 16, p_delta)
+    ON CONFLICT (chave, fatia) DO UPDATE
+    SET valor = estatisticas_contadores.valor + EXCLUDED.valor;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Chave do contador de um resultado SPV (NULL para os que não são contados)
+CREATE OR REPLACE FUNCTION chave_contador_resultado(p_resultado INTEGER)
+RETURNS VARCHAR AS $$
+    SELECT CASE p_resultado
+        WHEN 1 THEN 'nada_consta'
+        WHEN 2 THEN 'criminal'
+        WHEN 5 THEN 'civel'
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION contar_pesquisa_spv()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM ajustar_contador(chave_contador_resultado(OLD.resultado), -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM ajustar_contador(chave_contador_resultado(NEW.resultado), 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION contar_pesquisa()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM ajustar_contador(CASE WHEN OLD.data_conclusao IS NULL THEN 'pendentes' ELSE 'concluidas' END, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM ajustar_contador(CASE WHEN NEW.data_conclusao IS NULL THEN 'pendentes' ELSE 'concluidas' END, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Triggers dos contadores: só disparam quando a coluna contada muda
+CREATE TRIGGER contar_pesquisa_spv_insert_delete AFTER INSERT OR DELETE ON pesquisa_spv
+    FOR EACH ROW EXECUTE FUNCTION contar_pesquisa_spv();
+CREATE TRIGGER contar_pesquisa_spv_update AFTER UPDATE OF resultado ON pesquisa_spv
+    FOR EACH ROW WHEN (OLD.resultado IS DISTINCT FROM NEW.resultado) EXECUTE FUNCTION contar_pesquisa_spv();
+CREATE TRIGGER contar_pesquisas_insert_delete AFTER INSERT OR DELETE ON pesquisas
+    FOR EACH ROW EXECUTE FUNCTION contar_pesquisa();
+CREATE TRIGGER contar_pesquisas_update AFTER UPDATE OF data_conclusao ON pesquisas
+    FOR EACH ROW WHEN ((OLD.data_conclusao IS NULL) IS DISTINCT FROM (NEW.data_conclusao IS NULL))
+    EXECUTE FUNCTION contar_pesquisa();
+
+-- Refaz os contadores a partir das tabelas
+-- O lock SHARE espera as gravações em andamento e segura as novas até o fim
+-- da transação, então a contagem e os triggers não se sobrepõem.
+CREATE OR REPLACE FUNCTION reconciliar_contadores()
+RETURNS TABLE (
+    chave VARCHAR,
+    valor BIGINT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    LOCK TABLE pesquisas, pesquisa_spv IN SHARE MODE;
+    DELETE FROM estatisticas_contadores;
+    INSERT INTO estatisticas_contadores (chave, fatia, valor)
+    SELECT 'pendentes', 0, COUNT(*) FILTER (WHERE data_conclusao IS NULL) FROM pesquisas
+    UNION ALL
+    SELECT 'concluidas', 0, COUNT(*) FILTER (WHERE data_conclusao IS NOT NULL) FROM pesquisas
+    UNION ALL
+    SELECT c.chave, 0, COUNT(ps.resultado)
+    FROM (VALUES ('nada_consta', 1), ('criminal', 2), ('civel', 5)) AS c(chave, resultado)
+    LEFT JOIN pesquisa_spv ps ON ps.resultado = c.resultado
+    GROUP BY c.chave;
+
+    RETURN QUERY
+    SELECT ec.chave, ec.valor FROM estatisticas_contadores ec ORDER BY ec.chave;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Pesquisas pendentes de cada filtro, calculadas a partir das tabelas
+-- É a definição das pendentes: spv_fila é mantida igual a esta view pelos
+-- triggers (atualizar_spv_fila) e refeita por reconstruir_spv_fila. Só os
+-- filtros 0 (CPF), 1 e 3 (RG) têm pendentes, como nas consultas anteriores.
+CREATE OR REPLACE VIEW spv_fila_calculada AS
+SELECT
+    p.cod_pesquisa,
+    f.filtro,
+    COALESCE(p.nome_corrigido, p.nome, '')::VARCHAR(200) AS nome
+FROM pesquisas p
+INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+INNER JOIN servicos s ON p.cod_servico = s.cod_servico
+LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+CROSS JOIN (VALUES (0), (1), (3)) AS f(filtro)
+WHERE p.data_conclusao IS NULL
+AND p.tipo = 0
+AND p.cpf IS NOT NULL
+AND p.cpf != ''
+AND (f.filtro = 0 OR (p.rg IS NOT NULL AND p.rg != ''))
+AND (e.uf = 'SP' OR p.cod_uf_nascimento = 26 OR p.cod_uf_rg = 26)
+AND NOT EXISTS (
+    SELECT 1 FROM pesquisa_spv ps
+    WHERE ps.cod_pesquisa = p.cod_pesquisa
+    AND ps.cod_spv = 1
+    AND ps.filtro = f.filtro
+    -- Resultados são posteriores à entrada da pesquisa: só as partições recentes são lidas.
+    -- As duas datas vêm do relógio do banco (DEFAULT de data_entrada e now() na
+    -- gravação do resultado); uma data_execucao do relógio da aplicação, atrasado
+    -- em relação ao banco, deixaria a pesquisa na fila com o resultado gravado.
+    AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    AND ps.resultado IS NOT NULL
+);
+
+-- Acerta as linhas de spv_fila de uma pesquisa com spv_fila_calculada
+-- Só remove os filtros que deixaram de estar pendentes e só insere os que
+-- faltam, sem mexer nas linhas que continuam na fila (e podem estar
+-- travadas por uma reserva em andamento).
+CREATE OR REPLACE FUNCTION atualizar_spv_fila(p_cod_pesquisa INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM spv_fila q
+    WHERE q.cod_pesquisa = p_cod_pesquisa
+    AND NOT EXISTS (
+        SELECT 1 FROM spv_fila_calculada fc
+        WHERE fc.cod_pesquisa = p_cod_pesquisa
+        AND fc.filtro = q.filtro
+    );
+    INSERT INTO spv_fila (cod_pesquisa, filtro, nome)
+    SELECT fc.cod_pesquisa, fc.filtro, fc.nome
+    FROM spv_fila_calculada fc
+    WHERE fc.cod_pesquisa = p_cod_pesquisa
+    ON CONFLICT (cod_pesquisa, filtro) DO UPDATE
+    SET nome = EXCLUDED.nome
+    WHERE spv_fila.nome IS DISTINCT FROM EXCLUDED.nome;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION atualizar_spv_fila_pesquisa()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM atualizar_spv_fila(NEW.cod_pesquisa);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION atualizar_spv_fila_resultado()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM atualizar_spv_fila(OLD.cod_pesquisa);
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.cod_pesquisa IS DISTINCT FROM OLD.cod_pesquisa) THEN
+        PERFORM atualizar_spv_fila(NEW.cod_pesquisa);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Triggers da fila: só disparam quando muda alguma coluna do critério das pendentes
+-- (pesquisas excluídas saem da fila pela chave estrangeira)
+CREATE TRIGGER fila_pesquisas_insert AFTER INSERT ON pesquisas
+    FOR EACH ROW EXECUTE FUNCTION atualizar_spv_fila_pesquisa();
+CREATE TRIGGER fila_pesquisas_update AFTER UPDATE OF
+    cod_cliente, cod_servico, cod_uf, cod_uf_nascimento, cod_uf_rg, tipo, cpf, rg,
+    nome, nome_corrigido, data_entrada, data_conclusao
+    ON pesquisas
+    FOR EACH ROW EXECUTE FUNCTION atualizar_spv_fila_pesquisa();
+CREATE TRIGGER fila_pesquisa_spv_insert_delete AFTER INSERT OR DELETE ON pesquisa_spv
+    FOR EACH ROW EXECUTE FUNCTION atualizar_spv_fila_resultado();
+CREATE TRIGGER fila_pesquisa_spv_update AFTER UPDATE OF cod_pesquisa, cod_spv, filtro, resultado, data_execucao
+    ON pesquisa_spv
+    FOR EACH ROW EXECUTE FUNCTION atualizar_spv_fila_resultado();
+
+-- Refaz spv_fila a partir de spv_fila_calculada; retorna as pendentes por filtro
+-- Mesmo lock de reconciliar_contadores: as gravações esperam a reconstrução.
+CREATE OR REPLACE FUNCTION reconstruir_spv_fila()
+RETURNS TABLE (
+    filtro INTEGER,
+    pendentes BIGINT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    LOCK TABLE pesquisas, pesquisa_spv IN SHARE MODE;
+    DELETE FROM spv_fila;
+    INSERT INTO spv_fila (cod_pesquisa, filtro, nome)
+    SELECT fc.cod_pesquisa, fc.filtro, fc.nome FROM spv_fila_calculada fc;
+
+    RETURN QUERY
+    SELECT cp.filtro, cp.pendentes FROM contar_pesquisas_pendentes() cp;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Cria as partições mensais de pesquisa_spv que faltam, de p_inicio (padrão:
+-- mês atual) até p_meses_a_frente meses à frente; retorna as criadas
+CREATE OR REPLACE FUNCTION criar_particoes_pesquisa_spv(
+    p_meses_a_frente INTEGER DEFAULT 3,
+    p_inicio DATE DEFAULT NULL
+)
+RETURNS SETOF VARCHAR AS $$
+DECLARE
+    v_mes DATE := date_trunc('month', COALESCE(p_inicio, CURRENT_DATE))::date;
+    v_fim DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_meses_a_frente))::date;
+    v_nome VARCHAR;
+BEGIN
+    -- Workers fazendo a manutenção ao mesmo tempo esperam um pelo outro
+    PERFORM pg_advisory_xact_lock(hashtext('particoes_pesquisa_spv'));
+    WHILE v_mes <= v_fim LOOP
+        v_nome := 'pesquisa_spv_' || to_char(v_mes, 'YYYY_MM');
+        IF to_regclass(v_nome) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF pesquisa_spv FOR VALUES FROM (%L) TO (%L)',
+                v_nome, v_mes, (v_mes + INTERVAL '1 month')::date
+            );
+            RETURN NEXT v_nome;
+        END IF;
+        v_mes := (v_mes + INTERVAL '1 month')::date;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Desanexa as partições mensais anteriores aos últimos p_meses_retencao meses
+-- e as move, com os seus processos, para o schema arquivo; retorna as arquivadas.
+-- Os contadores de estatísticas deixam de contar os resultados arquivados, e
+-- pesquisas ainda abertas com resultado arquivado voltam para spv_fila.
+CREATE OR REPLACE FUNCTION arquivar_particoes_pesquisa_spv(p_meses_retencao INTEGER)
+RETURNS SETOF VARCHAR AS $$
+DECLARE
+    v_limite DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_meses_retencao))::date;
+    v_nome VARCHAR;
+BEGIN
+    IF p_meses_retencao IS NULL OR p_meses_retencao <= 0 THEN
+        RETURN;
+    END IF;
+    PERFORM pg_advisory_xact_lock(hashtext('particoes_pesquisa_spv'));
+    CREATE SCHEMA IF NOT EXISTS arquivo;
+    FOR v_nome IN
+        SELECT c.relname
+        FROM pg_inherits i
+        INNER JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'pesquisa_spv'::regclass
+        AND c.relname ~ '^pesquisa_spv_\d{4}_\d{2}$'
+        AND to_date(substring(c.relname FROM '\d{4}_\d{2}$'), 'YYYY_MM') < v_limite
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE pesquisa_spv DETACH PARTITION %I', v_nome);
+        EXECUTE format(
+            'SELECT ajustar_contador(chave_contador_resultado(resultado), -COUNT(*)) FROM %I GROUP BY resultado',
+            v_nome
+        );
+        EXECUTE format(
+            'SELECT atualizar_spv_fila(a.cod_pesquisa) FROM (SELECT DISTINCT cod_pesquisa FROM %I) a '
+            'INNER JOIN pesquisas p ON p.cod_pesquisa = a.cod_pesquisa WHERE p.data_conclusao IS NULL',
+            v_nome
+        );
+        EXECUTE format(
+            'CREATE TABLE arquivo.%I AS SELECT pp.* FROM pesquisa_spv_processos pp WHERE pp.cod_pesquisa_spv IN (SELECT cod_pesquisa_spv FROM %I)',
+            v_nome || '_processos', v_nome
+        );
+        EXECUTE format(
+            'DELETE FROM pesquisa_spv_processos pp WHERE pp.cod_pesquisa_spv IN (SELECT cod_pesquisa_spv FROM %I)',
+            v_nome
+        );
+        EXECUTE format('ALTER TABLE %I SET SCHEMA arquivo', v_nome);
+        RETURN NEXT v_nome;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Dados iniciais
 INSERT INTO estados (uf, nome) VALUES 
 ('SP', 'São Paulo'),
@@ -187,7 +544,7 @@ INSERT INTO servicos (nome, descricao, civel, criminal) VALUES
 ('Pesquisa Geral', 'Pesquisa geral de processos', TRUE, TRUE);
 
 INSERT INTO websites (nome, url, tipo, configuracao) VALUES 
-('TJSP', 'https://esaj.tjsp.jus.br/cpopg/open.do', 'TJSP', '{"selectors": {"tipo_pesquisa": "//*[@id=\"cbPesquisa\"]", "campo_cpf": "//*[@id=\"campo_DOCPARTE\"]", "campo_nome": "//*[@id=\"campo_NMPARTE\"]", "botao_consultar": "//*[@id=\"botaoConsultarProcessos\"]"}}');
+('TJSP', 'https://esaj.tjsp.jus.br/cpopg/open.do', 'TJSP', '{"selectors": {"tipo_pesquisa": "//*[@id=\"cbPesquisa\"]", "campo_cpf": "//*[@id=\"campo_DOCPARTE\"]", "campo_nome": "//*[@id=\"campo_NMPARTE\"]", "botao_consultar": "//*[@id=\"botaoConsultarProcessos\"]"}, "perfil_navegador": {"bloquear_recursos": true}, "analise_resultado": {"resultado_padrao": 5, "regras": [{"nome": "nada_consta", "padrao": "Não existem informações disponíveis para os parâmetros informados.", "resultado": 1}, {"nome": "processos_encontrados", "padrao": "Processos encontrados", "resultado": 5}, {"nome": "audiencias", "padrao": "Audiências", "resultado": 5}]}}');
 
 -- View para facilitar consultas de pesquisas pendentes
 CREATE VIEW pesquisas_pendentes AS
@@ -224,6 +581,8 @@ AND p.cpf IS NOT NULL
 AND p.cpf != '';
 
 -- Função para obter pesquisas pendentes com paginação
+-- A página sai de spv_fila na ordem de idx_spv_fila_ordem; as demais colunas
+-- vêm das pesquisas da página, pela chave primária.
 CREATE OR REPLACE FUNCTION get_pesquisas_pendentes(
     p_filtro INTEGER DEFAULT 0,
     p_limit INTEGER DEFAULT 100,
@@ -246,7 +605,141 @@ RETURNS TABLE (
 ) AS $$
 BEGIN
     RETURN QUERY
-    SELECT DISTINCT 
+    SELECT
+        p.cod_pesquisa,
+        p.cod_cliente,
+        c.nome as nome_cliente,
+        e.uf,
+        p.data_entrada,
+        COALESCE(p.nome_corrigido, p.nome) AS nome,
+        p.cpf,
+        COALESCE(p.rg_corrigido, p.rg) AS rg,
+        p.nascimento,
+        COALESCE(p.mae_corrigido, p.mae) AS mae,
+        p.anexo,
+        ps.resultado,
+        ps.cod_spv_tipo
+    FROM (
+        SELECT q.cod_pesquisa, q.nome
+        FROM spv_fila q
+        WHERE q.filtro = p_filtro
+        ORDER BY q.nome, q.cod_pesquisa
+        LIMIT p_limit OFFSET p_offset
+    ) fila
+    INNER JOIN pesquisas p ON p.cod_pesquisa = fila.cod_pesquisa
+    INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
+    LEFT JOIN estados e ON e.cod_uf = p.cod_uf
+    LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa
+        AND ps.cod_spv = 1
+        AND ps.filtro = p_filtro
+        AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    ORDER BY fila.nome, fila.cod_pesquisa;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para obter pesquisas pendentes com paginação por keyset
+-- Continua depois do cursor (p_nome, p_cod_pesquisa) da última linha da
+-- página anterior, na ordem de idx_spv_fila_ordem; NULL começa do início.
+-- Só as colunas que stream_pesquisas_pendentes usa na consulta ao tribunal.
+CREATE OR REPLACE FUNCTION get_pesquisas_pendentes_apos(
+    p_filtro INTEGER DEFAULT 0,
+    p_limit INTEGER DEFAULT 100,
+    p_nome VARCHAR DEFAULT NULL,
+    p_cod_pesquisa INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+    cod_pesquisa INTEGER,
+    nome VARCHAR,
+    cpf VARCHAR,
+    rg VARCHAR
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        p.cod_pesquisa,
+        COALESCE(p.nome_corrigido, p.nome) AS nome,
+        p.cpf,
+        COALESCE(p.rg_corrigido, p.rg) AS rg
+    FROM (
+        SELECT q.cod_pesquisa, q.nome
+        FROM spv_fila q
+        WHERE q.filtro = p_filtro
+        AND (p_nome IS NULL OR (q.nome, q.cod_pesquisa) > (p_nome, p_cod_pesquisa))
+        ORDER BY q.nome, q.cod_pesquisa
+        LIMIT p_limit
+    ) fila
+    INNER JOIN pesquisas p ON p.cod_pesquisa = fila.cod_pesquisa
+    ORDER BY fila.nome, fila.cod_pesquisa;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para contar as pesquisas pendentes de todos os filtros
+-- Uma passada pelo índice de spv_fila, agrupada por filtro.
+CREATE OR REPLACE FUNCTION contar_pesquisas_pendentes()
+RETURNS TABLE (
+    filtro INTEGER,
+    pendentes BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT f.filtro, COUNT(q.cod_pesquisa)
+    FROM generate_series(0, 3) AS f(filtro)
+    LEFT JOIN spv_fila q ON q.filtro = f.filtro
+    GROUP BY f.filtro
+    ORDER BY f.filtro;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Função para reservar pesquisas pendentes para um worker
+-- As linhas candidatas de spv_fila são travadas com FOR UPDATE SKIP LOCKED:
+-- workers concorrentes pulam as linhas em disputa em vez de esperar, e cada
+-- pesquisa só é entregue a quem gravou a reserva (nova ou com o prazo vencido).
+CREATE OR REPLACE FUNCTION reservar_pesquisas_pendentes(
+    p_filtro INTEGER,
+    p_limit INTEGER,
+    p_worker_id VARCHAR,
+    p_prazo_segundos INTEGER DEFAULT 600
+)
+RETURNS TABLE (
+    cod_pesquisa INTEGER,
+    cod_cliente INTEGER,
+    nome_cliente VARCHAR,
+    uf VARCHAR,
+    data_entrada TIMESTAMP,
+    nome VARCHAR,
+    cpf VARCHAR,
+    rg VARCHAR,
+    nascimento DATE,
+    mae VARCHAR,
+    anexo TEXT,
+    resultado INTEGER,
+    spv_tipo INTEGER
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH candidatas AS (
+        SELECT q.cod_pesquisa
+        FROM spv_fila q
+        LEFT JOIN pesquisa_spv_reservas r ON r.cod_pesquisa = q.cod_pesquisa
+            AND r.filtro = q.filtro
+        WHERE q.filtro = p_filtro
+        AND (r.cod_pesquisa IS NULL OR r.expira_em < CURRENT_TIMESTAMP)
+        ORDER BY q.nome, q.cod_pesquisa
+        LIMIT p_limit
+        FOR UPDATE OF q SKIP LOCKED
+    ),
+    reservadas AS (
+        INSERT INTO pesquisa_spv_reservas AS r (cod_pesquisa, filtro, worker_id, expira_em)
+        SELECT candidatas.cod_pesquisa, p_filtro, p_worker_id,
+               CURRENT_TIMESTAMP + make_interval(secs => p_prazo_segundos)
+        FROM candidatas
+        ON CONFLICT ON CONSTRAINT pesquisa_spv_reservas_pkey DO UPDATE
+            SET worker_id = EXCLUDED.worker_id, expira_em = EXCLUDED.expira_em
+            WHERE r.expira_em < CURRENT_TIMESTAMP
+        RETURNING r.cod_pesquisa
+    )
+    SELECT
         p.cod_pesquisa,
         p.cod_cliente,
         c.nome as nome_cliente,
@@ -260,23 +753,29 @@ BEGIN
         p.anexo,
         ps.resultado,
         ps.cod_spv_tipo
-    FROM pesquisas p
+    FROM reservadas
+    INNER JOIN pesquisas p ON p.cod_pesquisa = reservadas.cod_pesquisa
     INNER JOIN clientes c ON p.cod_cliente = c.cod_cliente
-    INNER JOIN servicos s ON p.cod_servico = s.cod_servico
-    LEFT JOIN lote_pesquisas lp ON p.cod_pesquisa = lp.cod_pesquisa
-    LEFT JOIN lotes l ON l.cod_lote = lp.cod_lote
     LEFT JOIN estados e ON e.cod_uf = p.cod_uf
-    LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa 
-        AND ps.cod_spv = 1 
+    LEFT JOIN pesquisa_spv ps ON ps.cod_pesquisa = p.cod_pesquisa
+        AND ps.cod_spv = 1
         AND ps.filtro = p_filtro
-    WHERE p.data_conclusao IS NULL
-    AND ps.resultado IS NULL
-    AND p.tipo = 0
-    AND p.cpf IS NOT NULL 
-    AND p.cpf != ''
-    AND (p_filtro = 0 OR (p_filtro IN (1, 3) AND p.rg IS NOT NULL AND p.rg != ''))
-    AND (e.uf = 'SP' OR p.cod_uf_nascimento = 26 OR p.cod_uf_rg = 26)
-    ORDER BY nome ASC, ps.resultado DESC
-    LIMIT p_limit OFFSET p_offset;
+        -- Resultados são posteriores à entrada da pesquisa: só as partições recentes são lidas
+        AND ps.data_execucao >= COALESCE(p.data_entrada, '-infinity')
+    ORDER BY 6 ASC;
 END;
-$$ LANGUAGE plpgsql; 
\ No newline at end of file
+$$ LANGUAGE plpgsql;
+
+-- Partições de pesquisa_spv do mês atual e dos próximos três
+SELECT * FROM criar_particoes_pesquisa_spv(3);
+
+-- Contadores iniciais das estatísticas
+SELECT * FROM reconciliar_contadores();
+
+-- Migrações já incluídas neste esquema
+INSERT INTO schema_migrations (versao, nome) VALUES
+('0001', '0001_indices_fila_pendentes.sql'),
+('0002', '0002_particionar_pesquisa_spv.sql'),
+('0003', '0003_fila_pendentes.sql'),
+('0004', '0004_processos_no_cache.sql'),
+('0005', '0005_pendentes_apos_enxuta.sql');
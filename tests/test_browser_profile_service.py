@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import Mock
+from selenium.webdriver.edge.options import Options
+from services.browser_profile_service import BrowserProfile, PADROES_CSS, PADROES_FONTES
+from services.web_scraper_service import TJSPWebScraper
+
+class TestBrowserProfile:
+    """Testes do perfil leve do navegador"""
+
+    def test_from_website(self):
+        perfil = BrowserProfile.from_website(
+            {"perfil_navegador": {"bloquear_recursos": True, "bloquear_css": False, "urls_bloqueadas": ["*.exemplo.com/*"]}}
+        )
+
+        assert perfil.bloquear_recursos is True
+        assert perfil.bloquear_css is False
+        assert "*.exemplo.com/*" in perfil.padroes_bloqueados()
+        assert not set(PADROES_CSS) & set(perfil.padroes_bloqueados())
+
+    def test_from_website_usa_padrao_do_ambiente(self):
+        assert BrowserProfile.from_website({"selectors": {}}, bloquear_recursos=True).bloquear_recursos is True
+        assert BrowserProfile.from_website(None).bloquear_recursos is False
+
+    def test_desligado_nao_altera_driver(self):
+        perfil = BrowserProfile()
+        options = Options()
+        driver = Mock()
+
+        perfil.aplicar_opcoes(options)
+        perfil.aplicar_bloqueio(driver)
+
+        assert options.page_load_strategy == "normal"
+        assert "prefs" not in options.experimental_options
+        driver.execute_cdp_cmd.assert_not_called()
+
+    def test_opcoes_do_edge(self):
+        options = Options()
+
+        BrowserProfile(bloquear_recursos=True).aplicar_opcoes(options)
+
+        assert options.page_load_strategy == "eager"
+        assert options.experimental_options["prefs"]["profile.managed_default_content_settings.images"] == 2
+
+    def test_bloqueio_pelo_devtools(self):
+        driver = Mock()
+
+        BrowserProfile(bloquear_recursos=True).aplicar_bloqueio(driver)
+
+        driver.execute_cdp_cmd.assert_any_call("Network.enable", {})
+        urls = driver.execute_cdp_cmd.call_args[0][1]["urls"]
+        assert set(PADROES_FONTES) <= set(urls)
+        assert "*google-analytics.com*" in urls
+
+    def test_bloqueio_sem_devtools_nao_falha(self):
+        driver = Mock()
+        driver.execute_cdp_cmd.side_effect = Exception("CDP indisponível")
+
+        BrowserProfile(bloquear_recursos=True).aplicar_bloqueio(driver)
+
+    def test_scraper_usa_perfil(self):
+        scraper = TJSPWebScraper(headless=True, perfil=BrowserProfile(bloquear_recursos=True))
+
+        options = scraper._criar_options()
+
+        assert options.page_load_strategy == "eager"
+        assert "-headless" in options.arguments
@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from services.concurrency_service import HostSemaphores
+
+class TestHostSemaphores:
+    """Testes para os semáforos por host"""
+
+    def test_mesmo_host_mesmo_semaforo(self):
+        """Testa que URLs do mesmo host compartilham o semáforo"""
+        semaforos = HostSemaphores(2)
+
+        a = semaforos.get("https://esaj.tjsp.jus.br/cpopg/open.do")
+        b = semaforos.get("https://esaj.tjsp.jus.br/cpopg/search.do")
+        c = semaforos.get("https://www3.tjrj.jus.br/consultaprocessual/")
+
+        assert a is b
+        assert a is not c
+
+    def test_limite_invalido(self):
+        """Testa rejeição de limite menor que 1"""
+        with pytest.raises(ValueError):
+            HostSemaphores(0)
+
+    def test_limita_tarefas_simultaneas(self):
+        """Testa que no máximo `limite_por_host` tarefas ficam em andamento"""
+        async def executar():
+            semaforos = HostSemaphores(3)
+            em_andamento = 0
+            maximo = 0
+
+            async def pesquisa():
+                nonlocal em_andamento, maximo
+                async with semaforos.get("esaj.tjsp.jus.br"):
+                    em_andamento += 1
+                    maximo = max(maximo, em_andamento)
+                    await asyncio.sleep(0.01)
+                    em_andamento -= 1
+
+            await asyncio.gather(*[pesquisa() for _ in range(10)])
+            return maximo
+
+        assert asyncio.run(executar()) == 3
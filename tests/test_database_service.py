@@ -1,14 +1,29 @@
 import pytest
-from unittest.mock import Mock, patch
-from datetime import datetime
+from unittest.mock import MagicMock, Mock, patch
+from datetime import date, datetime, timedelta
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.expression import Values
+from interfaces.pesquisa_pendente import PesquisaPendente
+from interfaces.processo_encontrado import ProcessoEncontrado
+from interfaces.resultado_spv import ResultadoSPV
 from services.database_service import DatabaseService
 
+def linhas_gravadas(stmt) -> list:
+    """Linhas do VALUES do comando de gravação de resultados, como dicionários"""
+    dados = next(elemento for elemento in visitors.iterate(stmt) if isinstance(elemento, Values))
+    colunas = [coluna.name for coluna in dados.columns]
+    return [dict(zip(colunas, linha)) for lote in dados._data for linha in lote]
+
 class TestDatabaseService:
     
     @pytest.fixture
     def mock_db(self):
         """Mock da sessão do banco de dados"""
-        return Mock()
+        mock_db = Mock()
+        # Registros devolvidos pela gravação de resultados (RETURNING)
+        mock_db.execute.return_value.all.return_value = []
+        return mock_db
     
     @pytest.fixture
     def db_service(self, mock_db):
@@ -32,31 +47,8 @@ class TestDatabaseService:
         assert len(result) == 1
         assert result[0][1] == 100  # cod_pesquisa
     
-    def test_salvar_resultado_spv_novo(self, db_service, mock_db):
-        """Testa salvamento de novo resultado SPV"""
-        # Mock para pesquisa não existente
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        # Executa o teste
-        result = db_service.salvar_resultado_spv(
-            cod_pesquisa=100,
-            filtro=0,
-            resultado=1,
-            tempo_execucao=2.5
-        )
-        
-        # Verifica se foi bem-sucedido
-        assert result is True
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called_once()
-    
-    def test_salvar_resultado_spv_existente(self, db_service, mock_db):
-        """Testa atualização de resultado SPV existente"""
-        # Mock para pesquisa existente
-        mock_pesquisa_spv = Mock()
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_pesquisa_spv
-        
-        # Executa o teste
+    def test_salvar_resultado_spv_upsert(self, db_service, mock_db):
+        """Testa que o resultado é gravado com um único UPDATE + INSERT, sem consultar antes"""
         result = db_service.salvar_resultado_spv(
             cod_pesquisa=100,
             filtro=0,
@@ -64,12 +56,31 @@ class TestDatabaseService:
             tempo_execucao=3.0
         )
         
-        # Verifica se foi bem-sucedido
         assert result is True
-        assert mock_pesquisa_spv.resultado == 2
-        assert mock_pesquisa_spv.tempo_execucao == 3.0
+        mock_db.query.assert_not_called()
+        sql = str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "atualizados AS \n(UPDATE pesquisa_spv" in sql
+        assert "inseridos AS \n(INSERT INTO pesquisa_spv" in sql
+        assert "NOT (EXISTS (SELECT * \nFROM atualizados" in sql
+        assert "ON CONFLICT" not in sql
+        linha, = linhas_gravadas(mock_db.execute.call_args[0][0])
+        assert (linha["cod_pesquisa"], linha["filtro"], linha["resultado"], linha["tempo_execucao"]) == (100, 0, 2, 3.0)
+        assert mock_db.execute.call_count == 2
         mock_db.commit.assert_called_once()
     
+    def test_gravacao_trava_as_pesquisas_antes_do_comando(self, db_service, mock_db):
+        """Testa que (cod_pesquisa, filtro) são travados em ordem, antes do UPDATE + INSERT"""
+        db_service.gravar_resultados_spv([
+            ResultadoSPV(101, 0, 1),
+            ResultadoSPV(100, 3, 2),
+            ResultadoSPV(100, 0, 5)
+        ])
+        
+        (trava, parametros), (comando,) = [c[0] for c in mock_db.execute.call_args_list]
+        assert "pg_advisory_xact_lock(chave.cod_pesquisa, chave.filtro)" in str(trava)
+        assert parametros == {"cod_pesquisas": [100, 100, 101], "filtros": [0, 3, 0]}
+        assert "RETURNING" in str(comando.compile(dialect=postgresql.dialect()))
+    
     def test_marcar_pesquisa_concluida(self, db_service, mock_db):
         """Testa marcação de pesquisa como concluída"""
         # Mock para pesquisa existente
@@ -98,7 +109,56 @@ class TestDatabaseService:
         mock_db.commit.assert_not_called()
     
     def test_get_estatisticas_pesquisas(self, db_service, mock_db):
-        """Testa obtenção de estatísticas"""
+        """Testa que as estatísticas somam as fatias dos contadores, sem contar nas tabelas"""
+        mock_db.execute.return_value.fetchall.return_value = [
+            ("pendentes", 10), ("concluidas", 20), ("nada_consta", 5), ("criminal", 3), ("civel", 2)
+        ]
+        
+        result = db_service.get_estatisticas_pesquisas()
+        
+        assert result == {"pendentes": 10, "concluidas": 20, "nada_consta": 5, "criminal": 3, "civel": 2, "total": 30}
+        assert "SUM(valor)" in str(mock_db.execute.call_args[0][0])
+        mock_db.query.assert_not_called()
+    
+    def test_reconciliar_estatisticas(self, db_service, mock_db):
+        """Testa que a reconciliação refaz os contadores e faz commit"""
+        mock_db.execute.return_value.fetchall.return_value = [
+            ("civel", 2), ("concluidas", 20), ("criminal", 3), ("nada_consta", 5), ("pendentes", 10)
+        ]
+        
+        result = db_service.reconciliar_estatisticas()
+        
+        assert result["total"] == 30
+        assert "reconciliar_contadores()" in str(mock_db.execute.call_args[0][0])
+        mock_db.commit.assert_called_once()
+        
+        mock_db.execute.side_effect = Exception("lock timeout")
+        assert db_service.reconciliar_estatisticas() == {}
+        mock_db.rollback.assert_called_once()
+    
+    def test_manter_particoes_pesquisa_spv(self, db_service, mock_db):
+        """Testa que a manutenção cria as partições futuras, arquiva as antigas e faz commit"""
+        mock_db.execute.return_value.scalars.return_value.all.side_effect = [
+            ["pesquisa_spv_2026_12"], ["pesquisa_spv_2024_09"]
+        ]
+        
+        result = db_service.manter_particoes_pesquisa_spv(3, 24)
+        
+        assert result == {"criadas": ["pesquisa_spv_2026_12"], "arquivadas": ["pesquisa_spv_2024_09"]}
+        chamadas = mock_db.execute.call_args_list
+        assert "criar_particoes_pesquisa_spv" in str(chamadas[0][0][0])
+        assert chamadas[0][0][1] == {"meses_a_frente": 3}
+        assert "arquivar_particoes_pesquisa_spv" in str(chamadas[1][0][0])
+        assert chamadas[1][0][1] == {"meses_retencao": 24}
+        mock_db.commit.assert_called_once()
+        
+        mock_db.execute.side_effect = Exception("lock timeout")
+        assert db_service.manter_particoes_pesquisa_spv() == {}
+        mock_db.rollback.assert_called_once()
+    
+    def test_get_estatisticas_pesquisas_sem_contadores(self, db_service, mock_db):
+        """Testa obtenção de estatísticas contando nas tabelas quando os contadores estão vazios"""
+        mock_db.execute.return_value.fetchall.return_value = []
         # Mock das contagens
         mock_db.query.return_value.filter.return_value.count.side_effect = [10, 20, 5, 3, 2]
         
@@ -118,8 +178,8 @@ class TestDatabaseService:
     
     def test_get_pesquisas_por_filtro(self, db_service, mock_db):
         """Testa contagem de pesquisas por filtro"""
-        # Mock do execute().scalar() para retornar 15
-        mock_db.execute.return_value.scalar.return_value = 15
+        # Contagem agrupada: uma linha (filtro, pendentes) por filtro
+        mock_db.execute.return_value.fetchall.return_value = [(0, 15), (1, 3), (2, 0), (3, 3)]
         
         # Executa o teste
         result = db_service.get_pesquisas_por_filtro(filtro=0)
@@ -127,6 +187,52 @@ class TestDatabaseService:
         # Verifica o resultado
         assert result == 15
     
+    def test_contar_pesquisas_pendentes_em_uma_consulta(self, db_service, mock_db):
+        """Testa que os quatro filtros são contados em uma única consulta agrupada"""
+        mock_db.execute.return_value.fetchall.return_value = [(0, 15), (1, 3), (2, 0), (3, 3)]
+        
+        result = db_service.contar_pesquisas_pendentes()
+        
+        assert result == {0: 15, 1: 3, 2: 0, 3: 3}
+        mock_db.execute.assert_called_once()
+        assert "contar_pesquisas_pendentes()" in str(mock_db.execute.call_args[0][0])
+    
+    def test_contar_pesquisas_pendentes_aproximado(self, db_service, mock_db):
+        """Testa a estimativa pelo plano do EXPLAIN (FORMAT JSON)"""
+        mock_db.execute.return_value.scalar.side_effect = [
+            [{"Plan": {"Plan Rows": 1200}}], '[{"Plan": {"Plan Rows": 40}}]',
+            [{"Plan": {"Plan Rows": 1}}], [{"Plan": {"Plan Rows": 40}}]
+        ]
+        
+        result = db_service.contar_pesquisas_pendentes(aproximado=True)
+        
+        assert result == {0: 1200, 1: 40, 2: 1, 3: 40}
+        assert "EXPLAIN (FORMAT JSON)" in str(mock_db.execute.call_args_list[0][0][0])
+        assert [c[0][1] for c in mock_db.execute.call_args_list] == [{"filtro": f} for f in range(4)]
+    
+    def test_existem_pesquisas_pendentes(self, db_service, mock_db):
+        """Testa a verificação por EXISTS e o retorno em caso de erro"""
+        mock_db.execute.return_value.scalar.return_value = False
+        assert db_service.existem_pesquisas_pendentes(2) is False
+        assert "EXISTS (SELECT 1 FROM spv_fila" in str(mock_db.execute.call_args[0][0])
+        
+        mock_db.execute.side_effect = Exception("Erro de conexão")
+        assert db_service.existem_pesquisas_pendentes(2) is True
+    
+    def test_reconstruir_fila_pendentes(self, db_service, mock_db):
+        """Testa que a fila é refeita com commit e retorna as pendentes por filtro"""
+        mock_db.execute.return_value.fetchall.return_value = [(0, 15), (1, 3), (2, 0), (3, 3)]
+        
+        result = db_service.reconstruir_fila_pendentes()
+        
+        assert result == {0: 15, 1: 3, 2: 0, 3: 3}
+        assert "reconstruir_spv_fila()" in str(mock_db.execute.call_args[0][0])
+        mock_db.commit.assert_called_once()
+        
+        mock_db.execute.side_effect = Exception("lock timeout")
+        assert db_service.reconstruir_fila_pendentes() == {}
+        mock_db.rollback.assert_called_once()
+    
     def test_erro_na_consulta(self, db_service, mock_db):
         """Testa tratamento de erro na consulta"""
         # Mock de erro
@@ -152,4 +258,206 @@ class TestDatabaseService:
         
         # Verifica se retorna False em caso de erro
         assert result is False
-        mock_db.rollback.assert_called_once() 
\ No newline at end of file
+        mock_db.rollback.assert_called_once()
+    
+    def test_get_resultado_cache(self, db_service, mock_db):
+        """Testa consulta ao cache persistente"""
+        data_resultado = datetime(2024, 1, 1, 12, 0)
+        mock_db.query.return_value.filter.return_value.first.return_value = Mock(
+            resultado=2, data_resultado=data_resultado,
+            processos=[{"numero": "1500123-45.2023.8.26.0050", "data_distribuicao": "2023-03-01", "criminal": True}]
+        )
+        
+        result = db_service.get_resultado_cache("TJSP", 0, "12345678909", datetime(2024, 1, 1))
+        
+        assert result == (2, data_resultado, [
+            ProcessoEncontrado("1500123-45.2023.8.26.0050", data_distribuicao=date(2023, 3, 1), criminal=True)
+        ])
+    
+    def test_get_resultado_cache_sem_processos(self, db_service, mock_db):
+        """Testa entrada gravada antes da coluna processos"""
+        data_resultado = datetime(2024, 1, 1, 12, 0)
+        mock_db.query.return_value.filter.return_value.first.return_value = Mock(
+            resultado=1, data_resultado=data_resultado, processos=None
+        )
+        
+        assert db_service.get_resultado_cache("TJSP", 0, "12345678909", datetime(2024, 1, 1)) == (
+            1, data_resultado, None
+        )
+    
+    def test_salvar_resultado_cache_upsert(self, db_service, mock_db):
+        """Testa gravação no cache persistente com ON CONFLICT, com os processos em JSON"""
+        processo = ProcessoEncontrado("1500123-45.2023.8.26.0050", data_distribuicao=date(2023, 3, 1))
+        result = db_service.salvar_resultado_cache("TJSP", 0, "12345678909", 2, [processo])
+        
+        assert result is True
+        stmt = mock_db.execute.call_args[0][0]
+        sql = stmt.compile(dialect=postgresql.dialect())
+        assert "ON CONFLICT" in str(sql)
+        assert sql.params["processos"][0]["data_distribuicao"] == "2023-03-01"
+        assert ProcessoEncontrado.de_json(sql.params["processos"][0]) == processo
+        mock_db.commit.assert_called_once()
+    
+    def test_get_versao_website(self, db_service, mock_db):
+        """Testa leitura da versão da configuração do website"""
+        updated_at = datetime(2024, 1, 1, 12, 0)
+        mock_db.query.return_value.filter.return_value.first.return_value = (1, updated_at)
+        
+        assert db_service.get_versao_website("TJSP") == (1, updated_at)
+        
+        mock_db.query.return_value.filter.return_value.first.return_value = None
+        assert db_service.get_versao_website("TJXX") is None
+    
+    def test_atualizar_resultados_spv_em_lote(self, db_service, mock_db):
+        """Testa atualização em lote dos resultados reanalisados"""
+        assert db_service.atualizar_resultados_spv({10: 1, 11: 2}) == 2
+        
+        parametros = mock_db.execute.call_args[0][1]
+        assert parametros == [{"cod_pesquisa_spv": 10, "resultado": 1}, {"cod_pesquisa_spv": 11, "resultado": 2}]
+        mock_db.execute.assert_called_once()
+        mock_db.commit.assert_called_once()
+        
+        assert db_service.atualizar_resultados_spv({}) == 0
+    
+    def test_data_execucao_vem_do_relogio_do_banco(self, db_service, mock_db):
+        """Testa que um relógio da aplicação atrasado não chega a data_execucao"""
+        atrasado = datetime.now() - timedelta(hours=1)
+        with patch("services.database_service.datetime") as relogio:
+            relogio.now.return_value = atrasado
+            db_service.salvar_resultado_spv(cod_pesquisa=100, filtro=0, resultado=2)
+        
+        comando = mock_db.execute.call_args[0][0]
+        linha, = linhas_gravadas(comando)
+        assert "data_execucao" not in linha
+        sql = comando.compile(dialect=postgresql.dialect())
+        assert "data_execucao=now()" in str(sql)
+        assert "data_execucao) SELECT" in str(sql) and "now() AS now_1" in str(sql)
+        assert atrasado not in sql.params.values()
+    
+    def test_salvar_resultado_spv_cache_hit_e_pagina_arquivada(self, db_service, mock_db):
+        """Testa gravação da origem do resultado e do hash da página arquivada"""
+        db_service.salvar_resultado_spv(cod_pesquisa=100, filtro=0, resultado=1, cache_hit=True, pagina_hash="ab" * 32)
+        
+        linha, = linhas_gravadas(mock_db.execute.call_args[0][0])
+        assert linha["cache_hit"] is True
+        assert linha["pagina_hash"] == "ab" * 32
+    
+    def test_salvar_resultados_spv_em_lote(self, db_service, mock_db):
+        """Testa gravação do mesmo resultado para um grupo de pesquisas em um único comando"""
+        result = db_service.salvar_resultados_spv(cod_pesquisas=[100, 101, 102], filtro=0, resultado=2, tempo_execucao=1.5)
+        
+        assert result is True
+        linhas = linhas_gravadas(mock_db.execute.call_args[0][0])
+        assert [linha["cod_pesquisa"] for linha in linhas] == [100, 101, 102]
+        assert all(linha["resultado"] == 2 for linha in linhas)
+        assert mock_db.execute.call_count == 2
+        mock_db.commit.assert_called_once()
+    
+    def test_gravar_resultados_spv_de_pesquisas_diferentes(self, db_service, mock_db):
+        """Testa o lote do writer: resultados diferentes, e a mesma pesquisa repetida vale o último"""
+        result = db_service.gravar_resultados_spv([
+            ResultadoSPV(100, 0, 1),
+            ResultadoSPV(101, 0, 5, tempo_execucao=2.0),
+            ResultadoSPV(100, 0, 2)
+        ])
+        
+        assert result is True
+        linhas = linhas_gravadas(mock_db.execute.call_args[0][0])
+        assert [(linha["cod_pesquisa"], linha["resultado"]) for linha in linhas] == [(100, 2), (101, 5)]
+        mock_db.commit.assert_called_once()
+    
+    def test_salvar_resultados_spv_com_processos(self, db_service, mock_db):
+        """Testa que os processos do grupo vão em um único INSERT de várias linhas"""
+        upsert = Mock()
+        upsert.all.return_value = [(10, 100, 0), (11, 101, 0)]
+        mock_db.execute.side_effect = [Mock(), upsert, Mock(), Mock()]
+        processos = [
+            ProcessoEncontrado("1500456-78.2021.8.26.0050", classe="Ação Penal", data_distribuicao=date(2021, 8, 2), criminal=True),
+            ProcessoEncontrado("1000123-45.2020.8.26.0100", classe="Procedimento Comum Cível")
+        ]
+        
+        result = db_service.salvar_resultados_spv(cod_pesquisas=[100, 101], filtro=0, resultado=2, processos=processos)
+        
+        assert result is True
+        _, resultados, remocao, insercao = [c[0][0] for c in mock_db.execute.call_args_list]
+        assert "RETURNING" in str(resultados.compile(dialect=postgresql.dialect()))
+        assert str(remocao).startswith("DELETE FROM pesquisa_spv_processos")
+        sql = insercao.compile(dialect=postgresql.dialect())
+        assert str(sql).count("VALUES") == 1
+        assert sql.params["cod_pesquisa_spv_m0"] == 10
+        assert sql.params["cod_pesquisa_spv_m3"] == 11
+        assert sql.params["data_distribuicao_m2"] == date(2021, 8, 2)
+        mock_db.commit.assert_called_once()
+    
+    def test_salvar_resultado_spv_sem_processos_informados(self, db_service, mock_db):
+        """Testa que resultados do cache não apagam os processos já gravados"""
+        db_service.salvar_resultado_spv(cod_pesquisa=100, filtro=0, resultado=2, cache_hit=True)
+        
+        assert mock_db.execute.call_count == 2
+        assert "pesquisa_spv_processos" not in str(mock_db.execute.call_args[0][0])
+    
+    def test_claim_pesquisas(self, db_service, mock_db):
+        """Testa reserva de pesquisas pendentes gravada antes de retornar"""
+        linha = (1, 100, 'Cliente Teste', 'SP', datetime.now(), 'João Silva', '123.456.789-00', '', None, None, None, None, None)
+        mock_db.execute.return_value.fetchall.return_value = [linha]
+        
+        result = db_service.claim_pesquisas(filtro=0, n=50, worker_id="host-1", prazo_segundos=300)
+        
+        assert result == [linha]
+        query, params = mock_db.execute.call_args[0]
+        assert "reservar_pesquisas_pendentes" in str(query)
+        assert params == {"filtro": 0, "limit": 50, "worker_id": "host-1", "prazo_segundos": 300}
+        mock_db.commit.assert_called_once()
+    
+    def test_claim_pesquisas_erro(self, db_service, mock_db):
+        """Testa que uma falha na reserva não entrega pesquisas"""
+        mock_db.execute.side_effect = Exception("could not serialize access")
+        
+        assert db_service.claim_pesquisas(filtro=0, n=50, worker_id="host-1") == []
+        mock_db.rollback.assert_called_once()
+    
+    def test_release_pesquisas(self, db_service, mock_db):
+        """Testa que só as reservas do próprio worker são removidas"""
+        mock_db.execute.return_value.rowcount = 2
+        
+        assert db_service.release_pesquisas([1, 2], filtro=0, worker_id="host-1") == 2
+        
+        sql = mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+        assert str(sql).startswith("DELETE FROM pesquisa_spv_reservas")
+        assert sql.params["worker_id_1"] == "host-1"
+        mock_db.commit.assert_called_once()
+        assert db_service.release_pesquisas([], filtro=0, worker_id="host-1") == 0
+    
+    def test_stream_pesquisas_pendentes_percorre_as_paginas(self, db_service, mock_db):
+        """Testa que cada página continua do último registro da anterior, em conexão própria"""
+        conexao = Mock()
+        mock_db.get_bind.return_value.connect.return_value = MagicMock()
+        mock_db.get_bind.return_value.connect.return_value.__enter__.return_value = conexao
+        conexao.execute.return_value.fetchall.side_effect = [
+            [(1, 'ANA', '123.456.789-09', ''), (7, 'BRUNO', None, '98.765.432-1')],
+            [(3, 'CARLA', None, None), (2, None, None, None)],
+            [(9, 'DANIEL', None, None)]
+        ]
+        
+        pesquisas = list(db_service.stream_pesquisas_pendentes(filtro=3, tamanho_pagina=2))
+        
+        assert [p.cod_pesquisa for p in pesquisas] == [1, 7, 3, 2, 9]
+        assert pesquisas[1] == PesquisaPendente(7, 'BRUNO', None, '98.765.432-1')
+        assert not hasattr(pesquisas[0], "__dict__")
+        query = str(conexao.execute.call_args[0][0])
+        assert "get_pesquisas_pendentes_apos" in query
+        assert "anexo" not in query and "*" not in query
+        parametros = [c[0][1] for c in conexao.execute.call_args_list]
+        assert [(p["nome"], p["cod_pesquisa"]) for p in parametros] == [(None, None), ('BRUNO', 7), ('', 2)]
+        assert all(p["filtro"] == 3 and p["limit"] == 2 for p in parametros)
+        # Uma conexão (e uma transação curta) por página; a sessão das gravações não é usada
+        assert mock_db.get_bind.return_value.connect.call_count == 3
+        mock_db.execute.assert_not_called()
+    
+    def test_stream_pesquisas_pendentes_erro(self, db_service, mock_db):
+        """Testa que um erro do banco chega a quem consome o stream"""
+        mock_db.get_bind.return_value.connect.side_effect = Exception("Database error")
+        
+        with pytest.raises(Exception, match="Database error"):
+            list(db_service.stream_pesquisas_pendentes())
+        db_service.logging_service.log_database_error.assert_called_once()
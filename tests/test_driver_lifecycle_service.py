@@ -0,0 +1,131 @@
+import os
+import pytest
+from unittest.mock import Mock, PropertyMock, patch
+from services.driver_lifecycle_service import DriverLifecycleManager
+from services.retry_service import TransientScrapingError
+from services.web_scraper_service import WebScraperService
+
+class TestDriverLifecycleManager:
+    """Testes para o gerenciador de ciclo de vida do driver"""
+
+    @pytest.fixture
+    def scrapers(self):
+        """Scrapers criados pelo gerenciador"""
+        return []
+
+    @pytest.fixture
+    def manager(self, scrapers):
+        def criar_scraper():
+            scraper = Mock()
+            scrapers.append(scraper)
+            return scraper
+
+        return DriverLifecycleManager(criar_scraper, driver_path="/d", max_paginas=3, max_rss_mb=500)
+
+    def test_inicia_no_primeiro_uso_e_reaproveita(self, manager, scrapers):
+        """Testa que o driver é aberto uma vez e mantido entre pesquisas"""
+        primeiro = manager.obter_scraper()
+        manager.registrar_pagina()
+        segundo = manager.obter_scraper()
+
+        assert primeiro is segundo
+        primeiro.setup_driver.assert_called_once_with("/d")
+        assert manager.get_counters()["inicios"] == 1
+
+    def test_recicla_apos_max_paginas(self, manager, scrapers):
+        """Testa reciclagem após o limite de páginas"""
+        manager.obter_scraper()
+        for _ in range(3):
+            manager.registrar_pagina()
+
+        novo = manager.obter_scraper()
+
+        assert novo is scrapers[1]
+        scrapers[0].close_driver.assert_called_once()
+        assert manager.get_counters() == {"inicios": 2, "reciclagens": 1, "reinicios": 0, "paginas": 3}
+
+    def test_recicla_por_memoria(self, scrapers):
+        """Testa reciclagem quando a memória passa do limite"""
+        manager = DriverLifecycleManager(Mock, max_paginas=0, max_rss_mb=500)
+        manager.obter_scraper()
+        for _ in range(DriverLifecycleManager.INTERVALO_VERIFICACAO_RSS):
+            manager.registrar_pagina()
+
+        with patch.object(manager, "rss_mb", return_value=800):
+            manager.obter_scraper()
+
+        assert manager.get_counters()["reciclagens"] == 1
+
+    def test_sessao_morta(self, manager):
+        """Testa detecção de sessão encerrada"""
+        scraper = manager.obter_scraper()
+        assert manager.sessao_ativa() is True
+
+        type(scraper.driver).current_window_handle = PropertyMock(side_effect=Exception("invalid session id"))
+
+        assert manager.sessao_ativa() is False
+
+    def test_rss_do_processo(self, manager):
+        """Testa leitura da memória da árvore de processos pelo /proc"""
+        if not os.path.exists(f"/proc/{os.getpid()}/statm"):
+            pytest.skip("Requer /proc (Linux)")
+
+        scraper = manager.obter_scraper()
+        scraper.driver.service.process.pid = os.getpid()
+
+        assert manager.rss_mb() > 0
+
+class TestWebScraperServiceLifecycle:
+    """Testes do WebScraperService com o gerenciador de ciclo de vida"""
+
+    @pytest.fixture
+    def scrapers(self):
+        return []
+
+    @pytest.fixture
+    def service(self, scrapers):
+        def create_scraper(website_type, headless, logging_service, perfil=None):
+            scraper = Mock()
+            scrapers.append(scraper)
+            return scraper
+
+        with patch("services.web_scraper_service.WebScraperFactory.create_scraper", side_effect=create_scraper):
+            yield WebScraperService(max_paginas=100)
+
+    def test_reinicia_sessao_morta_e_repete_pesquisa(self, service, scrapers):
+        """Testa que um navegador que morreu é reiniciado sem perder a pesquisa"""
+        service.setup_driver()
+        morto = scrapers[0]
+        morto.pesquisar_por_cpf.side_effect = TransientScrapingError("invalid session id")
+        type(morto.driver).current_window_handle = PropertyMock(side_effect=Exception("invalid session id"))
+
+        page_source = service.pesquisar(0, "123.456.789-09")
+
+        assert page_source is scrapers[1].pesquisar_por_cpf.return_value
+        morto.close_driver.assert_called_once()
+        assert service.get_estatisticas()["reinicios"] == 1
+        assert service.get_estatisticas()["inicios"] == 2
+
+    def test_pesquisa_vazia_com_sessao_ativa_nao_reinicia(self, service, scrapers):
+        """Testa que uma falha comum não reinicia o driver"""
+        service.setup_driver()
+        scrapers[0].pesquisar_por_cpf.return_value = ""
+
+        assert service.pesquisar(0, "123.456.789-09") == ""
+        assert service.get_estatisticas()["reinicios"] == 0
+
+    def test_erro_com_sessao_ativa_e_repassado(self, service, scrapers):
+        """Testa que a falha da pesquisa chega ao chamador em vez de virar página vazia"""
+        service.setup_driver()
+        scrapers[0].pesquisar_por_cpf.side_effect = TransientScrapingError("Página de resultado não carregou")
+
+        with pytest.raises(TransientScrapingError):
+            service.pesquisar(0, "123.456.789-09")
+        assert service.get_estatisticas()["reinicios"] == 0
+
+    def test_setup_driver_reaproveita_driver(self, service, scrapers):
+        """Testa que setup_driver não abre um segundo navegador"""
+        service.setup_driver()
+        service.setup_driver()
+
+        assert len(scrapers) == 1
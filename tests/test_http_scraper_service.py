@@ -0,0 +1,124 @@
+import pytest
+from unittest.mock import Mock
+from services.http_scraper_service import HttpWebScraperService
+from services.result_analyzer_service import StructuredResultAnalyzer
+from services.retry_service import TransientScrapingError
+from services.web_scraper_service import ResultAnalyzer, WebScraperFactory, WebScraperService
+from tjsp_stub_server import TJSPStubServer, SESSION_ID
+
+class TestHttpWebScraperService:
+    """Testes da engine HTTP contra o servidor local com páginas gravadas do TJSP"""
+
+    @pytest.fixture
+    def servidor(self):
+        """Servidor local que substitui o e-SAJ"""
+        respostas = {
+            "123.456.789-09": "processos.html",
+            "Joao Da Silva": "processo_unico.html",
+            "987.654.321-00": 503
+        }
+        with TJSPStubServer(respostas) as servidor:
+            yield servidor
+
+    @pytest.fixture
+    def fallback(self):
+        """Serviço Selenium simulado"""
+        fallback = Mock()
+        fallback.pesquisar.return_value = "pagina do fallback"
+        return fallback
+
+    @pytest.fixture
+    def service(self, servidor, fallback):
+        service = HttpWebScraperService(base_url=servidor.base_url, timeout=5, fallback=fallback)
+        yield service
+        service.close_driver()
+
+    def test_pesquisa_cpf_nada_consta(self, service, fallback):
+        """Testa pesquisa por CPF sem processos"""
+        page_source = service.pesquisar(0, "529.982.247-25")
+
+        assert ResultAnalyzer().analisar_resultado(page_source) == 1
+        fallback.pesquisar.assert_not_called()
+
+    def test_pesquisa_cpf_com_processos(self, service, servidor):
+        """Testa pesquisa por CPF com lista de processos"""
+        page_source = service.pesquisar(0, "123.456.789-09")
+
+        assert "listagemDeProcessos" in page_source
+        assert StructuredResultAnalyzer().analisar_resultado(page_source) == 2  # Ação Penal como réu
+        busca = servidor.requisicoes[-1]
+        assert busca["params"]["cbPesquisa"] == "DOCPARTE"
+        assert busca["params"]["dadosConsulta.valorConsulta"] == "123.456.789-09"
+
+    def test_pesquisa_por_nome(self, service, servidor):
+        """Testa pesquisa por nome completo"""
+        page_source = service.pesquisar(2, "Joao Da Silva")
+
+        assert 'id="numeroProcesso"' in page_source
+        busca = servidor.requisicoes[-1]
+        assert busca["params"]["cbPesquisa"] == "NMPARTE"
+        assert busca["params"]["chNmCompleto"] == "true"
+
+    def test_reaproveita_sessao_e_conexao(self, service, servidor):
+        """Testa que o formulário é aberto uma vez e a conexão é mantida"""
+        for _ in range(3):
+            service.pesquisar(0, "529.982.247-25")
+
+        aberturas = [r for r in servidor.requisicoes if r["path"].endswith("/open.do")]
+        buscas = [r for r in servidor.requisicoes if r["path"].endswith("/search.do")]
+        assert len(aberturas) == 1
+        assert all(r["sessao"] == SESSION_ID for r in buscas)
+        assert len({r["conexao"] for r in servidor.requisicoes}) == 1
+
+    def test_renova_sessao_expirada(self, service, servidor, fallback):
+        """Testa que uma sessão expirada é renovada sem usar o fallback"""
+        service.pesquisar(0, "529.982.247-25")
+        servidor.expirar_sessoes()
+
+        page_source = service.pesquisar(0, "123.456.789-09")
+
+        assert "listagemDeProcessos" in page_source
+        assert len([r for r in servidor.requisicoes if r["path"].endswith("/open.do")]) == 2
+        fallback.pesquisar.assert_not_called()
+
+    def test_fallback_em_erro_http(self, service, fallback):
+        """Testa uso do Selenium quando o e-SAJ responde com erro"""
+        page_source = service.pesquisar(0, "987.654.321-00")
+
+        assert page_source == "pagina do fallback"
+        fallback.pesquisar.assert_called_once_with(0, "987.654.321-00")
+
+    def test_fallback_sem_conexao(self, fallback):
+        """Testa uso do Selenium quando o tribunal está inacessível"""
+        service = HttpWebScraperService(base_url="http://127.0.0.1:9/cpopg", timeout=1, fallback=fallback)
+
+        assert service.pesquisar(0, "529.982.247-25") == "pagina do fallback"
+
+    def test_sem_fallback_repassa_falha_transitoria(self):
+        """Testa que a falha sem fallback não vira página vazia"""
+        service = HttpWebScraperService(base_url="http://127.0.0.1:9/cpopg", timeout=1)
+
+        with pytest.raises(TransientScrapingError):
+            service.pesquisar(0, "529.982.247-25")
+
+    def test_filtro_invalido(self, service, fallback):
+        """Testa filtro não suportado"""
+        with pytest.raises(ValueError):
+            service.pesquisar(9, "x")
+        fallback.pesquisar.assert_not_called()
+
+class TestWebScraperFactoryEngine:
+    """Testes da seleção de engine pela factory"""
+
+    def test_engine_selenium(self):
+        assert isinstance(WebScraperFactory.create_service("selenium"), WebScraperService)
+
+    def test_engine_http_com_fallback_selenium(self):
+        service = WebScraperFactory.create_service("http")
+
+        assert isinstance(service, HttpWebScraperService)
+        assert isinstance(service.fallback, WebScraperService)
+
+    def test_engine_invalida(self):
+        with pytest.raises(ValueError):
+            WebScraperFactory.create_service("playwright")
@@ -1,11 +1,22 @@
+import asyncio
+import threading
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+from interfaces.pesquisa_pendente import PesquisaPendente
 from services.config_service import ConfigService
 from services.logging_service import LoggingService
 from services.validation_service import ValidationService
 from services.database_service import DatabaseService
 from services.web_scraper_service import WebScraperService, ResultAnalyzer
-from spv_automatico import SPVAutomatico, create_spv_automatico
+from services.page_archive_service import PageArchive
+from services.pipeline_service import AnalysisPipeline
+from services.rate_limiter_service import SemLimite
+from services.result_writer_service import ResultWriter
+from services.retry_service import CircuitOpenError, TransientScrapingError
+from spv_automatico import SPVAutomatico, create_spv_automatico, main
+
+CPFS_DISTINTOS = ['111.444.777-35', '222.555.888-46', '333.666.999-57', '444.777.000-83', '555.888.111-94']
 
 class TestIntegration:
     """Testes de integração para demonstrar o funcionamento do sistema"""
@@ -57,6 +68,19 @@ class TestIntegration:
             assert spv.logging_service is not None
             assert spv.validation_service is not None
     
+    def test_pool_do_modo_async_acompanha_o_limite_por_host(self, mock_db_session, mock_config_service):
+        """Testa que o modo asyncio tem um driver para cada pesquisa simultânea no tribunal"""
+        mock_config_service.scraping.async_mode = True
+        mock_config_service.scraping.pool_size = 1
+        mock_config_service.scraping.max_concurrent_per_host = 3
+        with patch('src.spv_automatico.get_db') as mock_get_db, \
+                patch('spv_automatico.WebScraperPool') as mock_pool:
+            mock_get_db.return_value = iter([mock_db_session])
+            
+            create_spv_automatico(mock_config_service)
+            
+        assert mock_pool.call_args.kwargs["pool_size"] == 3
+    
     def test_validation_service_integration(self, spv_instance):
         """Testa integração do serviço de validação"""
         # Testa validação de CPF válido
@@ -152,8 +176,8 @@ class TestIntegration:
         
         # Mock do setup_driver para configurar o scraper
         with patch.object(spv_instance.web_scraper_service, 'setup_driver') as mock_setup:
-            # Configura o scraper no serviço
-            spv_instance.web_scraper_service.scraper = mock_scraper
+            # Configura o scraper no serviço envolvido pela política de repetição
+            spv_instance.web_scraper_service.service.scraper = mock_scraper
             
             # Testa pesquisa
             page_source = spv_instance.web_scraper_service.pesquisar(0, "123.456.789-09")
@@ -182,10 +206,21 @@ class TestIntegration:
         spv_instance.web_scraper_service.pesquisar.assert_called_once()
         spv_instance.database_service.salvar_resultado_spv.assert_called_once()
     
+    def test_spv_falha_de_pesquisa_continua_pendente(self, spv_instance):
+        """Testa que falhas esgotadas e circuito aberto não gravam resultado de erro"""
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+        
+        for erro in (TransientScrapingError("Página de resultado não carregou"), CircuitOpenError("aberto")):
+            spv_instance.web_scraper_service.pesquisar = Mock(side_effect=erro)
+            
+            assert spv_instance.executar_pesquisa("João Silva", "123.456.789-09", "12.345.678-9", 100) is False
+        
+        spv_instance.database_service.salvar_resultado_spv.assert_not_called()
+    
     def test_spv_processar_pesquisas_pendentes_integration(self, spv_instance):
         """Testa integração do processamento de pesquisas pendentes"""
         # Mock da execução de pesquisa
-        spv_instance.executar_pesquisa = Mock(return_value=True)
+        spv_instance.executar_pesquisa_grupo = Mock(return_value=1)
         # Mock para pesquisas pendentes
         spv_instance.database_service.get_pesquisas_pendentes = Mock(return_value=[(1, 100, 'Cliente Teste', 'SP', None, 'João Silva', '123.456.789-00', '12.345.678-9', None, 'Maria Silva', None, None, None)])
         
@@ -194,7 +229,339 @@ class TestIntegration:
         
         # Verifica se processou uma pesquisa
         assert result == 1
-        spv_instance.executar_pesquisa.assert_called_once()
+        spv_instance.executar_pesquisa_grupo.assert_called_once()
+    
+    def test_spv_agrupa_documentos_repetidos(self, spv_instance):
+        """Testa que o mesmo CPF na página é pesquisado uma vez e gravado em lote"""
+        spv_instance.rate_limiter = SemLimite()
+        spv_instance.result_cache = None
+        spv_instance.database_service.get_pesquisas_pendentes = Mock(return_value=[
+            (1, 100, 'Cliente A', 'SP', None, 'João Silva', '123.456.789-09', '', None, None, None, None, None),
+            (2, 101, 'Cliente B', 'SP', None, 'João Silva', '12345678909', '', None, None, None, None, None),
+            (3, 102, 'Cliente C', 'SP', None, 'Ana Souza', '111.444.777-35', '', None, None, None, None, None)
+        ])
+        spv_instance.web_scraper_service.pesquisar = Mock(return_value="Processos encontrados")
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+        spv_instance.database_service.salvar_resultados_spv = Mock(return_value=True)
+        
+        result = spv_instance.processar_pesquisas_pendentes(limit=10)
+        
+        assert result == 3
+        assert spv_instance.web_scraper_service.pesquisar.call_count == 2
+        lote = spv_instance.database_service.salvar_resultados_spv.call_args[1]
+        assert lote["cod_pesquisas"] == [1, 2]
+        assert lote["resultado"] == 5
+        spv_instance.database_service.salvar_resultado_spv.assert_called_once()
+    
+    def test_novas_tentativas_usam_o_rate_limiter(self, spv_instance):
+        """Testa que as repetições de falhas transitórias retiram fichas do mesmo limite"""
+        assert spv_instance.rate_limiter is not None
+        assert spv_instance.web_scraper_service.aguardar_vez == spv_instance.rate_limiter.acquire
+    
+    @pytest.mark.parametrize("async_mode", [False, True])
+    def test_main_encerra_o_ciclo_unico(self, async_mode):
+        """Testa que o ciclo único fecha os drivers, o pipeline e o writer, mesmo com erro"""
+        spv = Mock()
+        spv.executar_ciclo_completo.side_effect = RuntimeError("falha no ciclo")
+        spv.executar_ciclo_completo_async = Mock(side_effect=RuntimeError("falha no ciclo"))
+        with patch('spv_automatico.ConfigService') as config, \
+                patch('spv_automatico.LoggingService'), \
+                patch('spv_automatico.create_spv_automatico', return_value=spv):
+            config.return_value.is_development_mode.return_value = False
+            config.return_value.scraping.async_mode = async_mode
+            
+            with pytest.raises(SystemExit):
+                main()
+        
+        spv.encerrar.assert_called_once()
+    
+    def test_spv_rate_limiter_do_website(self, mock_db_session, mock_config_service):
+        """Testa que o limite de requisições vem da configuração do website"""
+        configuracao = {"rate_limit": {"requests_per_second": 2, "burst": 3}}
+        with patch('src.spv_automatico.get_db') as mock_get_db, \
+                patch.object(DatabaseService, "get_configuracao_website", return_value=configuracao) as lida:
+            mock_get_db.return_value = iter([mock_db_session])
+            
+            spv = create_spv_automatico(mock_config_service)
+        
+        assert spv.rate_limiter.config.requests_per_second == 2
+        assert spv.rate_limiter.config.burst == 3
+        assert spv._obter_rate_limiter() is spv.rate_limiter
+        lida.assert_called_with("TJSP")
+
+    def test_spv_cache_de_resultados(self, spv_instance):
+        """Testa que o mesmo CPF em outra pesquisa usa o resultado em cache"""
+        spv_instance.web_scraper_service.pesquisar = Mock(return_value="Processos encontrados")
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+
+        assert spv_instance.executar_pesquisa("João Silva", "123.456.789-09", "12.345.678-9", 100) is True
+        assert spv_instance.executar_pesquisa("Joao Silva", "12345678909", "", 200) is True
+
+        spv_instance.web_scraper_service.pesquisar.assert_called_once()
+        segunda = spv_instance.database_service.salvar_resultado_spv.call_args_list[1][1]
+        assert segunda["cod_pesquisa"] == 200
+        assert segunda["resultado"] == 5
+        assert segunda["cache_hit"] is True
+        # Os processos da pesquisa no tribunal também vão para a pesquisa respondida pelo cache
+        primeira = spv_instance.database_service.salvar_resultado_spv.call_args_list[0][1]
+        assert segunda["processos"] == primeira["processos"]
+
+    def test_spv_arquiva_pagina_de_resultado(self, spv_instance, tmp_path):
+        """Testa que a página pesquisada é arquivada e o hash vai para pesquisa_spv"""
+        spv_instance.page_archive = PageArchive(str(tmp_path))
+        spv_instance.web_scraper_service.pesquisar = Mock(return_value="Processos encontrados")
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+
+        assert spv_instance.executar_pesquisa("João Silva", "123.456.789-09", "12.345.678-9", 100) is True
+
+        pagina_hash = spv_instance.database_service.salvar_resultado_spv.call_args[1]["pagina_hash"]
+        assert spv_instance.page_archive.ler(pagina_hash) == "Processos encontrados"
+
+    def test_spv_processar_pesquisas_em_paralelo(self, spv_instance):
+        """Testa distribuição das pesquisas pendentes entre os drivers do pool"""
+        spv_instance.config_service.scraping.pool_size = 3
+        spv_instance.rate_limiter = SemLimite()
+        spv_instance.executar_pesquisa_grupo = Mock(return_value=1)
+        spv_instance.database_service.get_pesquisas_pendentes = Mock(return_value=[
+            (cod, 100, 'Cliente Teste', 'SP', None, 'João Silva', cpf, '12.345.678-9', None, 'Maria Silva', None, None, None)
+            for cod, cpf in enumerate(CPFS_DISTINTOS, start=1)
+        ])
+        
+        result = spv_instance.processar_pesquisas_pendentes(limit=10)
+        
+        assert result == 5
+        assert spv_instance.executar_pesquisa_grupo.call_count == 5
+    
+    def test_spv_processar_pesquisas_em_pipeline(self, spv_instance):
+        """Testa a análise das páginas em processo separado dos drivers"""
+        spv_instance.config_service.scraping.pool_size = 2
+        spv_instance.result_cache = None
+        spv_instance.pipeline = AnalysisPipeline(processos=1)
+        spv_instance.database_service.get_pesquisas_pendentes = Mock(return_value=[
+            (cod, 100, 'Cliente Teste', 'SP', None, 'João Silva', cpf, '12.345.678-9', None, 'Maria Silva', None, None, None)
+            for cod, cpf in enumerate(CPFS_DISTINTOS[:3], start=1)
+        ])
+        spv_instance.web_scraper_service.pesquisar = Mock(side_effect=[
+            "Não existem informações disponíveis para os parâmetros informados.",
+            "Processos encontrados",
+            TransientScrapingError("tribunal fora do ar")
+        ])
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+
+        try:
+            result = spv_instance.processar_pesquisas_pendentes(limit=10)
+        finally:
+            spv_instance.pipeline.encerrar()
+
+        assert result == 2
+        resultados = sorted(c[1]["resultado"] for c in spv_instance.database_service.salvar_resultado_spv.call_args_list)
+        assert resultados == [1, 5]
+        assert all(c[1]["processos"] == [] for c in spv_instance.database_service.salvar_resultado_spv.call_args_list)
+    
+    def test_spv_grava_resultados_em_lote(self, spv_instance):
+        """Testa que os resultados da página vão para o banco em um lote, antes da próxima página"""
+        spv_instance.result_cache = None
+        spv_instance.result_writer = ResultWriter(spv_instance.database_service, tamanho_lote=100, intervalo=60)
+        spv_instance.database_service.get_pesquisas_pendentes = Mock(return_value=[
+            (cod, 100, 'Cliente Teste', 'SP', None, 'João Silva', cpf, '12.345.678-9', None, 'Maria Silva', None, None, None)
+            for cod, cpf in enumerate(CPFS_DISTINTOS[:3], start=1)
+        ])
+        spv_instance.web_scraper_service.pesquisar = Mock(return_value="Processos encontrados")
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+        spv_instance.database_service.gravar_resultados_spv = Mock(return_value=True)
+
+        result = spv_instance.processar_pesquisas_pendentes(limit=10)
+        spv_instance.result_writer.encerrar()
+
+        assert result == 3
+        spv_instance.database_service.salvar_resultado_spv.assert_not_called()
+        lote = spv_instance.database_service.gravar_resultados_spv.call_args[0][0]
+        assert [(r.cod_pesquisa, r.resultado) for r in lote] == [(1, 5), (2, 5), (3, 5)]
+    
+    def test_spv_reserva_pesquisas_do_worker(self, spv_instance):
+        """Testa que com CLAIM_PESQUISAS a página é reservada e as reservas desfeitas no final"""
+        spv_instance.config_service.scraping.claim_pesquisas = True
+        spv_instance.worker_id = "host-1"
+        spv_instance.result_cache = None
+        spv_instance.database_service.get_pesquisas_pendentes = Mock()
+        spv_instance.database_service.claim_pesquisas = Mock(return_value=[
+            (cod, 100, 'Cliente Teste', 'SP', None, 'João Silva', cpf, '12.345.678-9', None, 'Maria Silva', None, None, None)
+            for cod, cpf in enumerate(CPFS_DISTINTOS[:2], start=1)
+        ])
+        spv_instance.database_service.release_pesquisas = Mock(return_value=2)
+        spv_instance.web_scraper_service.pesquisar = Mock(side_effect=[
+            "Processos encontrados", TransientScrapingError("tribunal fora do ar")
+        ])
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+
+        result = spv_instance.processar_pesquisas_pendentes(limit=10)
+
+        assert result == 1
+        spv_instance.database_service.get_pesquisas_pendentes.assert_not_called()
+        spv_instance.database_service.claim_pesquisas.assert_called_once_with(
+            0, 10, "host-1", spv_instance.config_service.scraping.claim_lease_seconds
+        )
+        spv_instance.database_service.release_pesquisas.assert_called_once_with([1, 2], 0, "host-1")
+    
+    def test_ciclo_conta_uma_vez_e_pula_filtros_sem_pendentes(self, spv_instance):
+        """Testa que o ciclo conta os filtros uma vez e só drena os que têm pendentes"""
+        spv_instance.database_service.contar_pesquisas_pendentes = Mock(return_value={0: 2, 1: 0, 2: 0, 3: 1})
+        spv_instance.database_service.existem_pesquisas_pendentes = Mock(side_effect=[True, False, False, True])
+        spv_instance.drenar_pesquisas_pendentes = Mock(return_value=1)
+
+        assert spv_instance.executar_ciclo_completo() is True
+
+        spv_instance.database_service.contar_pesquisas_pendentes.assert_called_once_with(aproximado=False)
+        assert spv_instance.drenar_pesquisas_pendentes.call_count == 2
+
+    def test_ciclo_mantem_as_particoes_antes_de_contar(self, spv_instance):
+        """Testa que o ciclo cria as partições futuras com os meses configurados"""
+        spv_instance.config_service.database.partition_months_ahead = 2
+        spv_instance.config_service.database.partition_retention_months = 24
+        spv_instance.database_service.manter_particoes_pesquisa_spv = Mock(
+            return_value={"criadas": ["pesquisa_spv_2026_12"], "arquivadas": []}
+        )
+        spv_instance.database_service.existem_pesquisas_pendentes = Mock(return_value=False)
+
+        assert spv_instance.executar_ciclo_completo() is True
+
+        spv_instance.database_service.manter_particoes_pesquisa_spv.assert_called_once_with(2, 24)
+
+    def test_ciclo_sem_manutencao_de_particoes(self, spv_instance):
+        """Testa que DB_PARTITION_MONTHS_AHEAD=0 desativa a manutenção no ciclo"""
+        spv_instance.config_service.database.partition_months_ahead = 0
+        spv_instance.database_service.manter_particoes_pesquisa_spv = Mock()
+        spv_instance.database_service.existem_pesquisas_pendentes = Mock(return_value=False)
+
+        assert spv_instance.executar_ciclo_completo() is True
+
+        spv_instance.database_service.manter_particoes_pesquisa_spv.assert_not_called()
+
+    def test_spv_drena_todas_as_paginas(self, spv_instance):
+        """Testa que o ciclo continua nas páginas seguintes até acabarem as pendentes"""
+        spv_instance.result_cache = None
+        pesquisas = (
+            PesquisaPendente(cod, 'João Silva', cpf, '')
+            for cod, cpf in enumerate(CPFS_DISTINTOS[:3], start=1)
+        )
+        spv_instance.database_service.stream_pesquisas_pendentes = Mock(return_value=pesquisas)
+        spv_instance.web_scraper_service.pesquisar = Mock(return_value="Processos encontrados")
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+
+        result = spv_instance.drenar_pesquisas_pendentes(tamanho_pagina=1)
+
+        assert result == 3
+        spv_instance.database_service.stream_pesquisas_pendentes.assert_called_once_with(0, 1)
+
+    def test_spv_drenagem_para_quando_o_tempo_acaba(self, spv_instance):
+        """Testa que nenhuma página nova é buscada depois do tempo máximo"""
+        spv_instance.result_cache = None
+        spv_instance.tempo_inicio = time.time()
+        pesquisas = (
+            PesquisaPendente(cod, 'João Silva', cpf, '')
+            for cod, cpf in enumerate(CPFS_DISTINTOS[:3], start=1)
+        )
+        spv_instance.database_service.stream_pesquisas_pendentes = Mock(return_value=pesquisas)
+
+        def pesquisar(filtro, documento):
+            spv_instance.tempo_inicio -= spv_instance.config_service.scraping.max_execution_time
+            return "Processos encontrados"
+        spv_instance.web_scraper_service.pesquisar = Mock(side_effect=pesquisar)
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+
+        assert spv_instance.drenar_pesquisas_pendentes(tamanho_pagina=1) == 1
+
+    def test_spv_ciclo_falha_se_as_pendentes_nao_puderem_ser_lidas(self, spv_instance):
+        """Testa que uma falha do banco no meio da drenagem não parece o fim da fila"""
+        spv_instance.result_cache = None
+
+        def pesquisas():
+            yield PesquisaPendente(1, 'João Silva', CPFS_DISTINTOS[0], '')
+            raise Exception("conexão perdida")
+        spv_instance.database_service.existem_pesquisas_pendentes = Mock(return_value=True)
+        spv_instance.database_service.stream_pesquisas_pendentes = Mock(side_effect=lambda *_: pesquisas())
+        spv_instance.web_scraper_service.pesquisar = Mock(return_value="Processos encontrados")
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+
+        with pytest.raises(Exception, match="conexão perdida"):
+            spv_instance.drenar_pesquisas_pendentes(tamanho_pagina=1)
+        assert spv_instance.executar_ciclo_completo() is False
+
+    def test_spv_drena_reservando_pagina_por_pagina(self, spv_instance):
+        """Testa a drenagem com CLAIM_PESQUISAS: as reservas só são desfeitas no final"""
+        spv_instance.config_service.scraping.claim_pesquisas = True
+        spv_instance.worker_id = "host-1"
+        spv_instance.result_cache = None
+        spv_instance.database_service.claim_pesquisas = Mock(side_effect=[
+            [(1, 100, 'Cliente Teste', 'SP', None, 'João Silva', CPFS_DISTINTOS[0], '', None, None, None, None, None)],
+            [(2, 100, 'Cliente Teste', 'SP', None, 'Ana Souza', CPFS_DISTINTOS[1], '', None, None, None, None, None)],
+            []
+        ])
+        spv_instance.database_service.release_pesquisas = Mock(return_value=2)
+        spv_instance.web_scraper_service.pesquisar = Mock(side_effect=[
+            TransientScrapingError("tribunal fora do ar"), "Processos encontrados"
+        ])
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+
+        assert spv_instance.drenar_pesquisas_pendentes(tamanho_pagina=1) == 1
+
+        assert spv_instance.database_service.claim_pesquisas.call_count == 3
+        spv_instance.database_service.release_pesquisas.assert_called_once_with([1, 2], 0, "host-1")
+    
+    def test_spv_processar_pesquisas_async(self, spv_instance):
+        """Testa o modo asyncio com várias pesquisas em andamento no mesmo host"""
+        spv_instance.config_service.scraping.max_concurrent_per_host = 2
+        spv_instance.rate_limiter = SemLimite()
+        spv_instance.database_service.get_pesquisas_pendentes = Mock(return_value=[
+            (cod, 100, 'Cliente Teste', 'SP', None, 'João Silva', cpf, '12.345.678-9', None, 'Maria Silva', None, None, None)
+            for cod, cpf in enumerate(CPFS_DISTINTOS, start=1)
+        ])
+        spv_instance.database_service.salvar_resultado_spv = Mock(return_value=True)
+        
+        em_andamento = []
+        maximo = []
+        lock = threading.Lock()
+        
+        def pesquisar(filtro, documento):
+            with lock:
+                em_andamento.append(documento)
+                maximo.append(len(em_andamento))
+            time.sleep(0.05)
+            with lock:
+                em_andamento.pop()
+            return "Processos encontrados"
+        
+        spv_instance.web_scraper_service.pesquisar = Mock(side_effect=pesquisar)
+        
+        result = asyncio.run(spv_instance.processar_pesquisas_pendentes_async(limit=10))
+        
+        assert result == 5
+        assert max(maximo) == 2
+        assert spv_instance.database_service.salvar_resultado_spv.call_count == 5
+    
+    def test_spv_async_analisa_fora_do_event_loop(self, spv_instance):
+        """Testa que a análise da página não roda na thread do event loop"""
+        spv_instance.result_cache = None
+        spv_instance.rate_limiter = SemLimite()
+        spv_instance.web_scraper_service.pesquisar = Mock(return_value="Processos encontrados")
+        spv_instance.database_service.salvar_resultados_spv = Mock(return_value=2)
+        threads = []
+        analisar = spv_instance.result_analyzer.analisar_processos
+        
+        def analisar_processos(page_source):
+            threads.append(threading.current_thread())
+            return analisar(page_source)
+        spv_instance.result_analyzer.analisar_processos = Mock(side_effect=analisar_processos)
+        
+        async def executar():
+            return await spv_instance.executar_pesquisa_grupo_async(
+                "João Silva", CPFS_DISTINTOS[0], "", [1, 2], asyncio.Semaphore(1)
+            ), threading.current_thread()
+        
+        processadas, thread_do_loop = asyncio.run(executar())
+        
+        assert processadas == 2
+        assert threads and thread_do_loop not in threads
     
     def test_error_handling_integration(self, spv_instance):
         """Testa tratamento de erros integrado"""
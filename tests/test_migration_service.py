@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import Mock
+from services.migration_service import MigrationError, MigrationRunner
+
+class TestMigrationRunner:
+    """Testes do runner de migrações versionadas"""
+
+    @pytest.fixture
+    def diretorio(self, tmp_path):
+        (tmp_path / "0002_segunda.sql").write_text("CREATE INDEX b ON t (b);", encoding="utf-8")
+        (tmp_path / "0001_primeira.sql").write_text("CREATE INDEX a ON t ((x::text));", encoding="utf-8")
+        (tmp_path / "leia-me.txt").write_text("não é migração", encoding="utf-8")
+        return tmp_path
+
+    @pytest.fixture
+    def db(self):
+        db = Mock()
+        db.execute.return_value.fetchall.return_value = []
+        db.execute.return_value.first.return_value = None
+        return db
+
+    def test_migracoes_em_ordem_de_versao(self, db, diretorio):
+        runner = MigrationRunner(db, str(diretorio))
+
+        assert runner.migracoes() == [("0001", "0001_primeira.sql"), ("0002", "0002_segunda.sql")]
+
+    def test_versao_repetida(self, db, diretorio):
+        (diretorio / "0002_outra.sql").write_text("SELECT 1;", encoding="utf-8")
+
+        with pytest.raises(MigrationError, match="0002"):
+            MigrationRunner(db, str(diretorio)).migracoes()
+
+    def test_aplica_so_as_pendentes(self, db, diretorio):
+        db.execute.return_value.fetchall.return_value = [("0001",)]
+
+        aplicados = MigrationRunner(db, str(diretorio)).aplicar()
+
+        assert aplicados == ["0002_segunda.sql"]
+        db.connection.return_value.exec_driver_sql.assert_called_once_with(
+            "CREATE INDEX b ON t (b);", execution_options={"no_parameters": True}
+        )
+        registro = [c for c in db.execute.call_args_list if "INSERT INTO schema_migrations" in str(c[0][0])]
+        assert registro[0][0][1] == {"versao": "0002", "nome": "0002_segunda.sql"}
+
+    def test_pula_migracao_aplicada_por_outro_runner(self, db, diretorio):
+        db.execute.return_value.first.side_effect = [(1,), None]
+
+        aplicados = MigrationRunner(db, str(diretorio)).aplicar()
+
+        assert aplicados == ["0002_segunda.sql"]
+        db.connection.return_value.exec_driver_sql.assert_called_once_with(
+            "CREATE INDEX b ON t (b);", execution_options={"no_parameters": True}
+        )
+
+    def test_para_na_primeira_falha(self, db, diretorio):
+        db.connection.return_value.exec_driver_sql.side_effect = Exception("syntax error")
+
+        with pytest.raises(MigrationError, match="0001_primeira.sql"):
+            MigrationRunner(db, str(diretorio)).aplicar()
+
+        db.rollback.assert_called_once()
+        assert db.connection.return_value.exec_driver_sql.call_count == 1
@@ -0,0 +1,84 @@
+import os
+import threading
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import Mock
+from services.page_archive_service import PageArchive
+from reanalisar import _iniciar_processo, reanalisar
+
+NADA_CONSTA = "<td id=\"mensagemRetorno\">Não existem informações disponíveis para os parâmetros informados.</td>"
+PROCESSOS = "<div id=\"listagemDeProcessos\">Processos encontrados</div>" + " " * 5000
+
+class TestPageArchive:
+    """Testes do arquivo de páginas endereçado pelo conteúdo"""
+
+    @pytest.fixture
+    def archive(self, tmp_path):
+        return PageArchive(str(tmp_path / "paginas"))
+
+    def test_guardar_e_ler(self, archive):
+        pagina_hash = archive.guardar(PROCESSOS)
+
+        assert pagina_hash == PageArchive.calcular_hash(PROCESSOS)
+        assert archive.ler(pagina_hash) == PROCESSOS
+        assert os.path.getsize(archive.caminho(pagina_hash)) < len(PROCESSOS) / 10
+
+    def test_paginas_iguais_ocupam_um_arquivo(self, archive):
+        hashes = {archive.guardar(NADA_CONSTA) for _ in range(5)}
+
+        assert len(hashes) == 1
+        assert list(archive.hashes()) == list(hashes)
+        assert archive.get_estatisticas() == {"paginas_arquivadas": 1, "paginas_deduplicadas": 4}
+
+    def test_pagina_vazia_ou_ausente(self, archive):
+        assert archive.guardar("") is None
+        assert archive.ler("0" * 64) is None
+
+    def test_threads_gravando_a_mesma_pagina(self, archive):
+        hashes = []
+        threads = [threading.Thread(target=lambda: hashes.append(archive.guardar(PROCESSOS))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert set(hashes) == {PageArchive.calcular_hash(PROCESSOS)}
+        assert archive.ler(hashes[0]) == PROCESSOS
+        assert not [nome for nome in os.listdir(os.path.dirname(archive.caminho(hashes[0]))) if nome.endswith(".tmp")]
+
+class TestReanalisar:
+    """Testes da reanálise em lote a partir do arquivo"""
+
+    def test_reanalisa_paginas_distintas_e_grava_mudancas(self, tmp_path):
+        archive = PageArchive(str(tmp_path))
+        nada_consta = archive.guardar(NADA_CONSTA)
+        processos = archive.guardar(PROCESSOS)
+        database_service = Mock()
+        database_service.get_paginas_arquivadas.side_effect = [
+            [(1, 0, 1, nada_consta), (2, 0, 7, nada_consta), (3, 0, 1, processos)],
+            [(4, 0, 5, processos), (5, 0, 1, "f" * 64)],
+            []
+        ]
+
+        with ProcessPoolExecutor(max_workers=1, initializer=_iniciar_processo,
+                                 initargs=(str(tmp_path), {})) as executor:
+            contadores = reanalisar(database_service, executor, lote=3, simular=False)
+
+        assert contadores["registros"] == 5
+        assert contadores["paginas"] == 3
+        assert contadores["ausentes"] == 1
+        assert contadores["alterados"] == 2
+        assert database_service.atualizar_resultados_spv.call_args_list[0][0][0] == {2: 1, 3: 5}
+        assert database_service.get_paginas_arquivadas.call_args_list[1][1] == {"limit": 3, "apos": 3}
+
+    def test_simular_nao_grava(self, tmp_path):
+        archive = PageArchive(str(tmp_path))
+        database_service = Mock()
+        database_service.get_paginas_arquivadas.side_effect = [[(1, 0, 7, archive.guardar(NADA_CONSTA))], []]
+
+        with ProcessPoolExecutor(max_workers=1, initializer=_iniciar_processo,
+                                 initargs=(str(tmp_path), {})) as executor:
+            contadores = reanalisar(database_service, executor, lote=10, simular=True)
+
+        assert contadores["7->1"] == 1
+        database_service.atualizar_resultados_spv.assert_not_called()
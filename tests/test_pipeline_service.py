@@ -0,0 +1,91 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from services.page_archive_service import PageArchive
+from services.pipeline_service import AnalysisPipeline, PaginaColetada
+from services.result_analyzer_service import StructuredResultAnalyzer
+
+NADA_CONSTA = "<td id=\"mensagemRetorno\">Não existem informações disponíveis para os parâmetros informados.</td>"
+PROCESSOS = "<div id=\"listagemDeProcessos\">Processos encontrados</div>"
+
+class TestAnalysisPipeline:
+    """Testes do pipeline coleta -> análise em processos -> gravação"""
+
+    @pytest.fixture
+    def pipeline(self):
+        pipeline = AnalysisPipeline(processos=1, tamanho_fila=2)
+        yield pipeline
+        pipeline.encerrar()
+
+    @staticmethod
+    def coletar(paginas):
+        def coletar(cod):
+            return PaginaColetada([cod], str(cod), time.time(), page_source=paginas[cod])
+        return coletar
+
+    def test_analisa_em_outro_processo_e_grava_em_uma_thread(self, pipeline):
+        paginas = {1: NADA_CONSTA, 2: PROCESSOS, 3: ""}
+        gravados = {}
+        threads = set()
+
+        def gravar(pagina):
+            threads.add(threading.get_ident())
+            gravados[pagina.cod_pesquisas[0]] = pagina.resultado
+            return len(pagina.cod_pesquisas)
+
+        salvos = pipeline.processar([1, 2, 3], self.coletar(paginas), gravar,
+                                    StructuredResultAnalyzer().copia_para_processo(), workers=2)
+
+        assert salvos == 3
+        assert gravados == {1: 1, 2: 5, 3: 7}
+        assert len(threads) == 1 and threading.get_ident() not in threads
+
+    def test_resultado_do_cache_nao_passa_pela_analise(self, pipeline):
+        # Um Mock não pode ser enviado a outro processo: só grava se não passar pela análise
+        analisador = Mock()
+        gravar = Mock(return_value=2)
+
+        salvos = pipeline.processar(
+            [1], lambda cod: PaginaColetada([1, 2], "x", time.time(), resultado=1, cache_hit=True),
+            gravar, analisador
+        )
+
+        assert salvos == 2
+        assert gravar.call_args[0][0].resultado == 1
+
+    def test_falhas_de_coleta_e_gravacao_nao_param_o_pipeline(self, pipeline):
+        def coletar(cod):
+            if cod == 1:
+                raise RuntimeError("driver caiu")
+            return None if cod == 2 else PaginaColetada([cod], str(cod), time.time(), page_source=PROCESSOS)
+
+        def gravar(pagina):
+            if pagina.cod_pesquisas == [3]:
+                raise RuntimeError("banco indisponível")
+            return 1
+
+        salvos = pipeline.processar([1, 2, 3, 4], coletar, gravar, StructuredResultAnalyzer())
+
+        assert salvos == 1
+
+    def test_para_de_coletar_quando_o_tempo_acaba(self, pipeline):
+        coletar = Mock(return_value=None)
+
+        salvos = pipeline.processar([1, 2, 3], coletar, Mock(), StructuredResultAnalyzer(), deve_parar=lambda: True)
+
+        assert salvos == 0
+        coletar.assert_not_called()
+
+    def test_arquiva_no_processo_de_analise(self, tmp_path):
+        arquivo = PageArchive(str(tmp_path))
+        pipeline = AnalysisPipeline(processos=1, arquivo=arquivo)
+        gravar = Mock(return_value=1)
+        try:
+            pipeline.processar([1], self.coletar({1: PROCESSOS}), gravar, StructuredResultAnalyzer())
+        finally:
+            pipeline.encerrar()
+
+        pagina = gravar.call_args[0][0]
+        assert pagina.page_source is None
+        assert arquivo.ler(pagina.pagina_hash) == PROCESSOS
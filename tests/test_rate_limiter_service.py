@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from services.rate_limiter_service import (
+    RateLimitConfig, TokenBucket, FileTokenBucket, SemLimite, criar_rate_limiter
+)
+
+class TestRateLimitConfig:
+    """Testes da leitura do limite a partir de websites.configuracao"""
+
+    def test_config_do_website(self):
+        config = RateLimitConfig.from_website(
+            {"selectors": {}, "rate_limit": {"requests_per_second": 0.5, "burst": 3}}, 1.0
+        )
+
+        assert config == RateLimitConfig(requests_per_second=0.5, burst=3)
+
+    def test_fallback_para_delay(self):
+        config = RateLimitConfig.from_website({"selectors": {}}, 2.0)
+
+        assert config == RateLimitConfig(requests_per_second=0.5, burst=1)
+
+    def test_delay_zero_sem_limite(self):
+        assert RateLimitConfig.from_website(None, 0).ilimitado is True
+
+class TestTokenBucket:
+    """Testes do token bucket em processo"""
+
+    def test_rajada_e_espera(self):
+        """Testa que a rajada é liberada e as próximas fichas esperam em fila"""
+        with patch("services.rate_limiter_service.time.monotonic", return_value=100.0):
+            bucket = TokenBucket(RateLimitConfig(requests_per_second=2, burst=2))
+            esperas = [bucket._reservar() for _ in range(4)]
+
+        assert esperas == [0.0, 0.0, 0.5, 1.0]
+
+    def test_repoe_fichas_com_o_tempo(self):
+        """Testa que as fichas voltam na taxa configurada até o limite da rajada"""
+        with patch("services.rate_limiter_service.time.monotonic") as relogio:
+            relogio.return_value = 100.0
+            bucket = TokenBucket(RateLimitConfig(requests_per_second=2, burst=2))
+            bucket._reservar()
+            bucket._reservar()
+
+            relogio.return_value = 160.0
+
+            assert bucket._reservar() == 0.0
+            assert bucket._reservar() == 0.0
+            assert bucket._reservar() == 0.5
+
+    def test_taxa_entre_threads(self):
+        """Testa que várias threads juntas não passam da taxa"""
+        bucket = TokenBucket(RateLimitConfig(requests_per_second=50, burst=1))
+        inicio = time.monotonic()
+
+        threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(3)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 12 fichas com rajada de 1: 11 intervalos de 20ms
+        assert time.monotonic() - inicio >= 0.2
+
+    def test_acquire_async(self):
+        bucket = TokenBucket(RateLimitConfig(requests_per_second=50, burst=1))
+
+        async def executar():
+            return await asyncio.gather(*(bucket.acquire_async() for _ in range(3)))
+
+        esperas = asyncio.run(executar())
+
+        assert esperas[0] == 0.0
+        assert max(esperas) > 0
+
+class TestFileTokenBucket:
+    """Testes do token bucket compartilhado entre processos"""
+
+    def test_estado_compartilhado_pelo_arquivo(self, tmp_path):
+        """Testa que instâncias diferentes (como processos diferentes) dividem o balde"""
+        caminho = str(tmp_path / "tjsp.bucket")
+        config = RateLimitConfig(requests_per_second=1, burst=1)
+        primeiro = FileTokenBucket(config, caminho)
+        segundo = FileTokenBucket(config, caminho)
+
+        assert primeiro._reservar() == 0.0
+        assert segundo._reservar() == pytest.approx(1.0, abs=0.05)
+        assert primeiro._reservar() == pytest.approx(2.0, abs=0.05)
+
+    def test_arquivo_corrompido_recomeca_cheio(self, tmp_path):
+        caminho = tmp_path / "tjsp.bucket"
+        caminho.write_text("lixo")
+
+        bucket = FileTokenBucket(RateLimitConfig(requests_per_second=1, burst=1), str(caminho))
+
+        assert bucket._reservar() == 0.0
+
+    def test_acquire_async_reserva_fora_do_event_loop(self, tmp_path):
+        """Testa que o lock e o I/O do arquivo não rodam na thread do event loop"""
+        bucket = FileTokenBucket(RateLimitConfig(requests_per_second=50, burst=1), str(tmp_path / "tjsp.bucket"))
+        reservar = bucket._reservar
+        threads = []
+
+        def reservar_registrando():
+            threads.append(threading.get_ident())
+            return reservar()
+
+        async def executar():
+            with patch.object(bucket, "_reservar", side_effect=reservar_registrando):
+                esperas = await asyncio.gather(*(bucket.acquire_async() for _ in range(2)))
+            return threading.get_ident(), esperas
+
+        loop, esperas = asyncio.run(executar())
+
+        assert len(threads) == 2 and loop not in threads
+        assert esperas[0] == 0.0 or esperas[1] == 0.0
+        assert max(esperas) > 0
+
+class TestCriarRateLimiter:
+    """Testes da criação do rate limiter"""
+
+    def test_sem_limite(self):
+        assert isinstance(criar_rate_limiter("TJSP", RateLimitConfig(0)), SemLimite)
+
+    def test_em_processo(self):
+        assert isinstance(criar_rate_limiter("TJSP", RateLimitConfig(1)), TokenBucket)
+
+    def test_entre_processos(self, tmp_path):
+        limiter = criar_rate_limiter("TJSP", RateLimitConfig(1), str(tmp_path / "limites"))
+
+        assert isinstance(limiter, FileTokenBucket)
+        assert limiter.caminho.endswith("tjsp.bucket")
@@ -0,0 +1,114 @@
+"""
+Benchmark do analisador de resultados
+
+Desativado por padrão; para rodar (na raiz do projeto):
+
+    RUN_BENCHMARKS=1 PYTHONPATH=src python -m pytest tests/test_result_analyzer_benchmark.py -v -s
+
+Cada caso do corpus (tests/tjsp_corpus.py) mede páginas por segundo e o pico
+de memória de uma análise, e falha se algum dos dois piorar mais que a
+tolerância em relação a tests/fixtures/benchmarks/result_analyzer.json.
+Com BENCHMARK_SALVAR_BASELINE=1 os valores medidos substituem o baseline
+(faça isso na máquina onde os benchmarks costumam rodar).
+"""
+import json
+import os
+import time
+import tracemalloc
+import pytest
+from services.result_analyzer_service import StructuredResultAnalyzer
+from tjsp_corpus import gerar_corpus
+
+BASELINE = os.path.join(os.path.dirname(__file__), "fixtures", "benchmarks", "result_analyzer.json")
+TEMPO_MINIMO = 0.5  # segundos medidos por caso
+TOLERANCIA_PADRAO = 0.3
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("RUN_BENCHMARKS") != "1",
+    reason="Benchmarks desativados (RUN_BENCHMARKS=1 para rodar)"
+)
+
+CORPUS = gerar_corpus()
+
+def medir_paginas_por_segundo(analyzer: StructuredResultAnalyzer, page_source: str) -> float:
+    """Repete a análise por pelo menos TEMPO_MINIMO segundos"""
+    analyzer.analisar_processos(page_source)  # aquecimento
+    paginas = 0
+    inicio = time.perf_counter()
+    decorrido = 0.0
+    while decorrido < TEMPO_MINIMO:
+        analyzer.analisar_processos(page_source)
+        paginas += 1
+        decorrido = time.perf_counter() - inicio
+    return paginas / decorrido
+
+def medir_pico_memoria_kb(analyzer: StructuredResultAnalyzer, page_source: str) -> float:
+    """Pico de memória alocada durante uma análise (sem contar a própria página)"""
+    tracemalloc.start()
+    try:
+        analyzer.analisar_processos(page_source)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico / 1024
+
+def carregar_baseline() -> dict:
+    if not os.path.exists(BASELINE):
+        return {"tolerancia": TOLERANCIA_PADRAO, "casos": {}}
+    with open(BASELINE, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+MEDICOES = {}
+
+@pytest.fixture(scope="module", autouse=True)
+def relatorio():
+    """Mostra as medições no final e, se pedido, grava o novo baseline"""
+    yield
+    if not MEDICOES:
+        return
+    print(f"\n{'caso':<22}{'tamanho (KB)':>14}{'páginas/s':>12}{'pico (KB)':>12}")
+    for caso, medicao in MEDICOES.items():
+        print(f"{caso:<22}{medicao['tamanho_kb']:>14.0f}{medicao['paginas_por_segundo']:>12.1f}"
+              f"{medicao['pico_memoria_kb']:>12.0f}")
+    if os.getenv("BENCHMARK_SALVAR_BASELINE") == "1":
+        baseline = carregar_baseline()
+        baseline["casos"] = {
+            caso: {chave: round(valor, 1) for chave, valor in medicao.items() if chave != "tamanho_kb"}
+            for caso, medicao in MEDICOES.items()
+        }
+        os.makedirs(os.path.dirname(BASELINE), exist_ok=True)
+        with open(BASELINE, "w", encoding="utf-8") as arquivo:
+            json.dump(baseline, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write("\n")
+
+class TestResultAnalyzerBenchmark:
+    """Vazão e memória do StructuredResultAnalyzer sobre o corpus sintético"""
+
+    @pytest.fixture
+    def analyzer(self):
+        return StructuredResultAnalyzer()
+
+    @pytest.mark.parametrize("caso", list(CORPUS))
+    def test_benchmark(self, analyzer, caso):
+        page_source, resultado_esperado = CORPUS[caso]
+        assert analyzer.analisar_resultado(page_source) == resultado_esperado
+
+        paginas_por_segundo = medir_paginas_por_segundo(analyzer, page_source)
+        pico_memoria_kb = medir_pico_memoria_kb(analyzer, page_source)
+        MEDICOES[caso] = {
+            "tamanho_kb": len(page_source.encode("utf-8")) / 1024,
+            "paginas_por_segundo": paginas_por_segundo,
+            "pico_memoria_kb": pico_memoria_kb
+        }
+
+        baseline = carregar_baseline()
+        referencia = baseline["casos"].get(caso)
+        if referencia is None or os.getenv("BENCHMARK_SALVAR_BASELINE") == "1":
+            return
+        tolerancia = baseline.get("tolerancia", TOLERANCIA_PADRAO)
+        assert paginas_por_segundo >= referencia["paginas_por_segundo"] * (1 - tolerancia), (
+            f"{caso}: {paginas_por_segundo:.1f} páginas/s, baseline {referencia['paginas_por_segundo']}"
+        )
+        assert pico_memoria_kb <= referencia["pico_memoria_kb"] * (1 + tolerancia), (
+            f"{caso}: pico de {pico_memoria_kb:.0f} KB, baseline {referencia['pico_memoria_kb']} KB"
+        )
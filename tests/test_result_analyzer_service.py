@@ -0,0 +1,102 @@
+import os
+import pytest
+from datetime import date
+from services.result_analyzer_service import StructuredResultAnalyzer, extrair_processos
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "tjsp")
+
+def ler_fixture(nome: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, nome), encoding="utf-8") as arquivo:
+        return arquivo.read()
+
+def pagina_com_processo(classe: str, participacao: str) -> str:
+    """Lista de resultados com um único processo"""
+    return f"""
+    <div id="listagemDeProcessos"><ul class="unj-list-row"><li>
+      <a class="linkProcesso">0000001-00.2023.8.26.0001</a>
+      <span class="tipoDeParticipacao">{participacao}</span>
+      <div class="classeProcesso">{classe}</div>
+    </li></ul></div>
+    """
+
+class TestExtrairProcessos:
+    """Testes da extração dos processos da página de resultado"""
+
+    def test_lista_de_processos(self):
+        processos = extrair_processos(ler_fixture("processos.html"))
+
+        assert [p.numero for p in processos] == [
+            "1000123-45.2020.8.26.0100", "1500456-78.2021.8.26.0050", "1012345-67.2019.8.26.0224"
+        ]
+        penal = processos[1]
+        assert penal.classe == "Ação Penal - Procedimento Ordinário"
+        assert penal.assunto == "Furto"
+        assert penal.foro == "Foro Central Criminal Barra Funda"
+        assert penal.participacao == "Réu"
+        assert penal.data_distribuicao == date(2021, 8, 2)
+        assert [p.criminal for p in processos] == [False, True, False]
+
+    def test_processo_unico(self):
+        processos = extrair_processos(ler_fixture("processo_unico.html"))
+
+        assert len(processos) == 1
+        assert processos[0].numero == "1500789-12.2022.8.26.0050"
+        assert processos[0].classe == "Inquérito Policial"
+        assert processos[0].participacao == "Indiciado"
+        assert processos[0].data_distribuicao == date(2022, 2, 10)
+        assert processos[0].criminal is True
+
+    def test_lista_aninhada_nao_encerra_a_lista(self):
+        pagina = """
+        <div id="listagemDeProcessos"><ul class="unj-list-row">
+          <li><a class="linkProcesso">0000001-00.2023.8.26.0001</a>
+            <ul class="unj-tags"><li>Segredo de justiça</li></ul>
+            <div class="classeProcesso">Procedimento Comum Cível</div></li>
+          <li><a class="linkProcesso">0000002-00.2023.8.26.0050</a>
+            <span class="tipoDeParticipacao">Réu</span>
+            <div class="classeProcesso">Ação Penal - Procedimento Ordinário</div></li>
+        </ul></div>
+        <ul class="rodape"><li><a class="linkProcesso">fora da lista</a></li></ul>
+        """
+
+        processos = extrair_processos(pagina)
+
+        assert [p.numero for p in processos] == ["0000001-00.2023.8.26.0001", "0000002-00.2023.8.26.0050"]
+        assert processos[0].classe == "Procedimento Comum Cível"
+        assert [p.criminal for p in processos] == [False, True]
+
+    def test_nada_consta_sem_processos(self):
+        assert extrair_processos(ler_fixture("nada_consta.html")) == []
+
+class TestStructuredResultAnalyzer:
+    """Testes da classificação criminal/cível"""
+
+    @pytest.fixture
+    def analyzer(self):
+        return StructuredResultAnalyzer()
+
+    def test_fixtures(self, analyzer):
+        assert analyzer.analisar_resultado(ler_fixture("nada_consta.html")) == 1
+        assert analyzer.analisar_resultado(ler_fixture("processos.html")) == 2
+        assert analyzer.analisar_resultado(ler_fixture("processo_unico.html")) == 2
+
+    def test_somente_civeis(self, analyzer):
+        assert analyzer.analisar_resultado(pagina_com_processo("Procedimento Comum Cível", "Reqdo")) == 5
+
+    def test_vitima_em_processo_criminal_nao_e_criminal(self, analyzer):
+        assert analyzer.analisar_resultado(pagina_com_processo("Ação Penal - Procedimento Sumário", "Vítima")) == 5
+
+    def test_prisao_civil_nao_e_criminal(self, analyzer):
+        assert analyzer.analisar_resultado(pagina_com_processo("Prisão Civil", "Executado")) == 5
+        assert analyzer.analisar_resultado(pagina_com_processo("Auto de Prisão em Flagrante", "Autuado")) == 2
+
+    def test_pagina_nao_reconhecida_usa_verificacao_de_texto(self, analyzer):
+        assert analyzer.analisar_resultado("Processos encontrados") == 5
+        assert analyzer.analisar_resultado("") == 7
+
+    def test_processos_acompanham_o_resultado(self, analyzer):
+        resultado, processos = analyzer.analisar_processos(ler_fixture("processos.html"))
+
+        assert resultado == 2
+        assert len(processos) == 3
+        assert analyzer.analisar_processos(ler_fixture("nada_consta.html")) == (1, [])
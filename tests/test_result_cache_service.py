@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from interfaces.processo_encontrado import ProcessoEncontrado
+from services.result_cache_service import ResultCache
+
+PROCESSOS = [ProcessoEncontrado("1500123-45.2023.8.26.0050", classe="Ação Penal", criminal=True)]
+
+class TestResultCache:
+    """Testes do cache de resultados por documento"""
+
+    @pytest.fixture
+    def cache(self):
+        return ResultCache(ttl=60, max_entradas=2)
+
+    def test_hit_e_miss(self, cache):
+        assert cache.get("TJSP", 0, "12345678909") is None
+
+        cache.set("TJSP", 0, "12345678909", 2, PROCESSOS)
+
+        assert cache.get("TJSP", 0, "12345678909") == (2, PROCESSOS)
+        assert cache.get("TJSP", 1, "12345678909") is None
+        assert cache.get_estatisticas() == {"cache_hits": 1, "cache_misses": 2, "cache_entradas": 1}
+
+    def test_expira_apos_ttl(self, cache):
+        with patch("services.result_cache_service.time.time") as relogio:
+            relogio.return_value = 1000.0
+            cache.set("TJSP", 0, "12345678909", 1, [])
+
+            relogio.return_value = 1059.0
+            assert cache.get("TJSP", 0, "12345678909") == (1, [])
+
+            relogio.return_value = 1061.0
+            assert cache.get("TJSP", 0, "12345678909") is None
+
+    def test_remove_menos_usado(self, cache):
+        cache.set("TJSP", 0, "11111111111", 1, [])
+        cache.set("TJSP", 0, "22222222222", 1, [])
+        cache.get("TJSP", 0, "11111111111")
+
+        cache.set("TJSP", 0, "33333333333", 1, [])
+
+        assert cache.get("TJSP", 0, "22222222222") is None
+        assert cache.get("TJSP", 0, "11111111111") == (1, [])
+
+    def test_nao_guarda_erro(self, cache):
+        cache.set("TJSP", 0, "12345678909", 7, [])
+
+        assert cache.get("TJSP", 0, "12345678909") is None
+
+    def test_camada_persistente(self):
+        """Testa consulta ao banco no miss da memória e gravação nas duas camadas"""
+        persistencia = Mock()
+        persistencia.get_resultado_cache.return_value = (5, datetime.now(), PROCESSOS)
+        cache = ResultCache(ttl=60, persistencia=persistencia)
+
+        assert cache.get("TJSP", 0, "12345678909") == (5, PROCESSOS)
+        assert cache.get("TJSP", 0, "12345678909") == (5, PROCESSOS)
+        persistencia.get_resultado_cache.assert_called_once()
+
+        cache.set("TJSP", 0, "98765432100", 2, PROCESSOS)
+        persistencia.salvar_resultado_cache.assert_called_once_with("TJSP", 0, "98765432100", 2, PROCESSOS)
+
+    def test_entrada_persistente_sem_processos_e_miss(self):
+        """Entradas gravadas antes de resultado_cache.processos voltam ao tribunal"""
+        persistencia = Mock()
+        persistencia.get_resultado_cache.return_value = (2, datetime.now(), None)
+        cache = ResultCache(ttl=60, persistencia=persistencia)
+
+        assert cache.get("TJSP", 0, "12345678909") is None
+        assert cache.get_estatisticas()["cache_misses"] == 1
@@ -0,0 +1,103 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from services.result_analyzer_service import StructuredResultAnalyzer
+from services.result_rules_service import MATCHER_PADRAO, RegraResultado, RuleMatcher, RuleRegistry
+
+CONFIGURACAO = {
+    "analise_resultado": {
+        "resultado_padrao": 7,
+        "regras": [
+            {"nome": "nada_consta", "padrao": "Nenhum processo encontrado", "resultado": 1},
+            {"nome": "criminal", "padrao": r"Vara (Criminal|do Júri)", "resultado": 2, "regex": True},
+            {"nome": "processos", "padrao": "Processos:", "resultado": 5}
+        ]
+    }
+}
+
+class TestRuleMatcher:
+    """Testes do matcher de marcadores compilado"""
+
+    def test_encontra_todos_os_marcadores(self):
+        matcher = RuleMatcher.from_configuracao(CONFIGURACAO)
+
+        encontrados = matcher.encontrar("<p>Processos: 2</p><p>1ª Vara do Júri</p>")
+
+        assert encontrados == {"criminal", "processos"}
+
+    def test_prioridade_pela_ordem_das_regras(self):
+        matcher = RuleMatcher.from_configuracao(CONFIGURACAO)
+
+        assert matcher.classificar("Processos: 1 - 2ª Vara Criminal") == 2
+        assert matcher.classificar("Processos: 1 - 2ª Vara Cível") == 5
+        assert matcher.classificar("página desconhecida") == 7
+
+    def test_marcador_literal_nao_e_regex(self):
+        matcher = RuleMatcher([RegraResultado("ponto", "a.b", 1)])
+
+        assert matcher.classificar("a.b") == 1
+        assert matcher.classificar("axb") == 5
+
+    def test_sem_regras_no_website_usa_padrao(self):
+        assert RuleMatcher.from_configuracao({"selectors": {}}) is MATCHER_PADRAO
+        assert MATCHER_PADRAO.classificar(
+            "Não existem informações disponíveis para os parâmetros informados."
+        ) == 1
+
+    def test_regra_invalida(self):
+        with pytest.raises(ValueError):
+            RuleMatcher.from_configuracao({"analise_resultado": {"regras": [{"padrao": "x", "resultado": 9}]}})
+        with pytest.raises(ValueError):
+            RuleMatcher.from_configuracao(
+                {"analise_resultado": {"regras": [{"padrao": "(", "resultado": 1, "regex": True}]}}
+            )
+
+class TestRuleRegistry:
+    """Testes do cache de regras por website"""
+
+    @pytest.fixture
+    def database_service(self):
+        database_service = Mock()
+        database_service.get_versao_website.return_value = (1, datetime(2024, 1, 1))
+        database_service.get_configuracao_website.return_value = CONFIGURACAO
+        return database_service
+
+    def test_cache_pela_versao_do_website(self, database_service):
+        registry = RuleRegistry(database_service)
+
+        primeiro = registry.atualizar("TJXX")
+        segundo = registry.atualizar("TJXX")
+
+        assert primeiro is segundo
+        assert registry.obter("TJXX") is primeiro
+        database_service.get_configuracao_website.assert_called_once_with("TJXX")
+
+    def test_recarrega_quando_a_linha_muda(self, database_service):
+        registry = RuleRegistry(database_service)
+        registry.atualizar("TJXX")
+
+        database_service.get_versao_website.return_value = (1, datetime(2024, 2, 1))
+        database_service.get_configuracao_website.return_value = {}
+
+        assert registry.atualizar("TJXX") is MATCHER_PADRAO
+        assert database_service.get_configuracao_website.call_count == 2
+
+    def test_configuracao_invalida_mantem_regras_anteriores(self, database_service):
+        registry = RuleRegistry(database_service)
+        anterior = registry.atualizar("TJXX")
+
+        database_service.get_versao_website.return_value = (1, datetime(2024, 2, 1))
+        database_service.get_configuracao_website.return_value = {"analise_resultado": {"regras": [{}]}}
+
+        assert registry.atualizar("TJXX") is anterior
+
+    def test_obter_sem_carregar_nao_consulta_o_banco(self, database_service):
+        assert RuleRegistry(database_service).obter("TJXX") is MATCHER_PADRAO
+        database_service.get_versao_website.assert_not_called()
+
+    def test_analisador_usa_regras_do_website(self, database_service):
+        analyzer = StructuredResultAnalyzer(regras=RuleRegistry(database_service), website_type="TJXX")
+        analyzer.atualizar()
+
+        assert analyzer.analisar_resultado("Nenhum processo encontrado") == 1
+        assert analyzer.analisar_resultado("Processos: 1 - Vara Criminal") == 2
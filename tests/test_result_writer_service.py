@@ -0,0 +1,76 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from interfaces.resultado_spv import ResultadoSPV
+from services.result_writer_service import ResultWriter
+
+def aguardar(condicao, timeout: float = 2.0) -> bool:
+    limite = time.time() + timeout
+    while time.time() < limite:
+        if condicao():
+            return True
+        time.sleep(0.01)
+    return False
+
+class TestResultWriter:
+    """Testes da gravação de resultados em lotes"""
+
+    @pytest.fixture
+    def database_service(self):
+        database_service = Mock()
+        database_service.gravar_resultados_spv.return_value = True
+        return database_service
+
+    def test_grava_quando_o_lote_enche(self, database_service):
+        writer = ResultWriter(database_service, tamanho_lote=3, intervalo=60)
+
+        writer.adicionar([ResultadoSPV(1, 0, 1), ResultadoSPV(2, 0, 5)])
+        time.sleep(0.05)
+        database_service.gravar_resultados_spv.assert_not_called()
+
+        writer.adicionar([ResultadoSPV(3, 0, 2)])
+        assert aguardar(lambda: database_service.gravar_resultados_spv.called)
+        writer.encerrar()
+
+        lote = database_service.gravar_resultados_spv.call_args_list[0][0][0]
+        assert [resultado.cod_pesquisa for resultado in lote] == [1, 2, 3]
+        assert writer.get_estatisticas()["lotes_gravados"] == 1
+
+    def test_grava_pelo_intervalo(self, database_service):
+        writer = ResultWriter(database_service, tamanho_lote=100, intervalo=0.05)
+
+        writer.adicionar([ResultadoSPV(1, 0, 1)])
+
+        assert aguardar(lambda: database_service.gravar_resultados_spv.called)
+        writer.encerrar()
+
+    def test_encerrar_grava_o_que_sobrou(self, database_service):
+        writer = ResultWriter(database_service, tamanho_lote=100, intervalo=60)
+        writer.adicionar([ResultadoSPV(1, 0, 1)])
+
+        writer.encerrar()
+
+        database_service.gravar_resultados_spv.assert_called_once()
+        assert writer.get_estatisticas()["resultados_gravados"] == 1
+        assert not writer._thread.is_alive()
+
+    def test_falha_na_gravacao_e_contada(self, database_service):
+        database_service.gravar_resultados_spv.return_value = False
+        writer = ResultWriter(database_service, tamanho_lote=100, intervalo=60)
+        writer.adicionar([ResultadoSPV(1, 0, 1), ResultadoSPV(2, 0, 1)])
+
+        assert writer.descarregar() is False
+        writer.encerrar()
+
+        assert writer.get_estatisticas()["resultados_nao_gravados"] == 2
+        database_service.gravar_resultados_spv.assert_called_once()
+
+    def test_grava_com_o_lock_da_sessao(self, database_service):
+        lock = threading.Lock()
+        database_service.gravar_resultados_spv.side_effect = lambda lote: lock.locked()
+        writer = ResultWriter(database_service, tamanho_lote=100, intervalo=60, lock=lock)
+        writer.adicionar([ResultadoSPV(1, 0, 1)])
+
+        assert writer.descarregar() is True
+        writer.encerrar()
@@ -0,0 +1,171 @@
+import threading
+import time
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from selenium.common.exceptions import TimeoutException
+from services.retry_service import (
+    CircuitBreaker, CircuitOpenError, PermanentScrapingError, ResilientWebScraperService,
+    RetryPolicy, TransientScrapingError, erro_transitorio, obter_circuit_breaker
+)
+
+class TestClassificacaoDeErros:
+    """Testes da classificação de erros transitórios e permanentes"""
+
+    def test_erros_transitorios(self):
+        assert erro_transitorio(TransientScrapingError("página incompleta"))
+        assert erro_transitorio(TimeoutException())
+        assert erro_transitorio(requests.ConnectionError())
+
+    def test_erros_permanentes(self):
+        assert not erro_transitorio(ValueError("Filtro 9 não suportado"))
+        assert not erro_transitorio(PermanentScrapingError("website não suportado"))
+        assert not erro_transitorio(CircuitOpenError("aberto"))
+
+    def test_status_http(self):
+        def erro_http(status):
+            return requests.HTTPError(response=Mock(status_code=status))
+
+        assert erro_transitorio(erro_http(503))
+        assert erro_transitorio(erro_http(429))
+        assert not erro_transitorio(erro_http(404))
+
+class TestRetryPolicy:
+    """Testes do backoff exponencial com jitter"""
+
+    def test_espera_exponencial_com_teto(self):
+        politica = RetryPolicy(max_tentativas=5, base=1.0, maximo=4.0)
+
+        for _ in range(20):
+            assert 0.5 <= politica.espera(1) <= 1.0
+            assert 1.0 <= politica.espera(2) <= 2.0
+            assert 2.0 <= politica.espera(5) <= 4.0
+
+class TestCircuitBreaker:
+    """Testes do circuit breaker por website"""
+
+    def test_abre_apos_limite_de_falhas(self):
+        breaker = CircuitBreaker("TJSP", limite_falhas=2, tempo_aberto=60)
+
+        breaker.registrar_falha()
+        assert breaker.estado == CircuitBreaker.FECHADO
+        breaker.registrar_falha()
+
+        assert breaker.estado == CircuitBreaker.ABERTO
+        with pytest.raises(CircuitOpenError):
+            breaker.liberar(timeout=0.05)
+
+    def test_sucesso_zera_falhas(self):
+        breaker = CircuitBreaker("TJSP", limite_falhas=2)
+
+        breaker.registrar_falha()
+        breaker.registrar_sucesso()
+        breaker.registrar_falha()
+
+        assert breaker.estado == CircuitBreaker.FECHADO
+
+    def test_meio_aberto_libera_uma_pesquisa_de_teste(self):
+        breaker = CircuitBreaker("TJSP", limite_falhas=1, tempo_aberto=0.05)
+        breaker.registrar_falha()
+        time.sleep(0.06)
+
+        breaker.liberar(timeout=0.1)  # pesquisa de teste
+
+        assert breaker.estado == CircuitBreaker.MEIO_ABERTO
+        with pytest.raises(CircuitOpenError):
+            breaker.liberar(timeout=0.05)
+
+    def test_teste_bem_sucedido_libera_os_workers(self):
+        breaker = CircuitBreaker("TJSP", limite_falhas=1, tempo_aberto=0.05)
+        breaker.registrar_falha()
+        time.sleep(0.06)
+        breaker.liberar(timeout=0.1)
+        liberados = []
+
+        worker = threading.Thread(target=lambda: liberados.append(breaker.liberar(timeout=2) is None))
+        worker.start()
+        breaker.registrar_sucesso()
+        worker.join(timeout=2)
+
+        assert liberados == [True]
+        assert breaker.estado == CircuitBreaker.FECHADO
+
+    def test_teste_com_falha_reabre(self):
+        breaker = CircuitBreaker("TJSP", limite_falhas=3, tempo_aberto=0.05)
+        for _ in range(3):
+            breaker.registrar_falha()
+        time.sleep(0.06)
+        breaker.liberar(timeout=0.1)
+
+        breaker.registrar_falha()
+
+        assert breaker.estado == CircuitBreaker.ABERTO
+        assert breaker.get_estatisticas()["circuit_breaker_aberturas"] == 2
+
+    def test_um_circuit_breaker_por_website(self):
+        assert obter_circuit_breaker("TESTE_A") is obter_circuit_breaker("TESTE_A")
+        assert obter_circuit_breaker("TESTE_A") is not obter_circuit_breaker("TESTE_B")
+
+class TestResilientWebScraperService:
+    """Testes do serviço de scraping com repetição"""
+
+    @pytest.fixture
+    def scraper(self):
+        scraper = Mock()
+        scraper.get_estatisticas.return_value = {"inicios": 1}
+        return scraper
+
+    @pytest.fixture
+    def service(self, scraper):
+        with patch("services.retry_service.time.sleep"):
+            yield ResilientWebScraperService(
+                scraper,
+                CircuitBreaker("TJSP", limite_falhas=10),
+                RetryPolicy(max_tentativas=3)
+            )
+
+    def test_repete_falha_transitoria(self, service, scraper):
+        scraper.pesquisar.side_effect = [TransientScrapingError("timeout"), "", "<html>ok</html>"]
+
+        assert service.pesquisar(0, "123.456.789-09") == "<html>ok</html>"
+        assert scraper.pesquisar.call_count == 3
+        assert service.get_estatisticas()["retentativas"] == 2
+        assert service.circuit_breaker.estado == CircuitBreaker.FECHADO
+
+    def test_cada_nova_tentativa_aguarda_a_vez(self, service, scraper):
+        """Repetições também passam pelo limite de requisições do tribunal"""
+        service.aguardar_vez = Mock()
+        scraper.pesquisar.side_effect = [TransientScrapingError("timeout"), "", "<html>ok</html>"]
+
+        assert service.pesquisar(0, "123.456.789-09") == "<html>ok</html>"
+
+        # A primeira tentativa é aguardada por quem chama pesquisar
+        assert service.aguardar_vez.call_count == 2
+
+    def test_esgota_tentativas_e_repassa_o_erro(self, service, scraper):
+        scraper.pesquisar.side_effect = TransientScrapingError("timeout")
+
+        with pytest.raises(TransientScrapingError):
+            service.pesquisar(0, "123.456.789-09")
+
+        assert scraper.pesquisar.call_count == 3
+        assert service.get_estatisticas()["falhas_definitivas"] == 1
+
+    def test_erro_permanente_nao_repete(self, service, scraper):
+        scraper.pesquisar.side_effect = ValueError("Filtro 9 não suportado")
+
+        with pytest.raises(ValueError):
+            service.pesquisar(9, "x")
+
+        scraper.pesquisar.assert_called_once()
+
+    def test_circuito_aberto_nao_chega_ao_website(self, scraper):
+        breaker = CircuitBreaker("TJSP", limite_falhas=1, tempo_aberto=60)
+        breaker.registrar_falha()
+        service = ResilientWebScraperService(scraper, breaker, espera_maxima=0.05)
+
+        with pytest.raises(CircuitOpenError):
+            service.pesquisar(0, "123.456.789-09")
+
+        scraper.pesquisar.assert_not_called()
+        assert service.get_estatisticas()["circuit_breaker"] == CircuitBreaker.ABERTO
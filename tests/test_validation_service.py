@@ -104,4 +104,17 @@ class TestValidationService:
         """Testa sanitização de documento vazio"""
         sanitized = validation_service.sanitize_document("")
         
-        assert sanitized == "" 
\ No newline at end of file
+        assert sanitized == "" 
+    
+    def test_normalize_document_cpf(self, validation_service):
+        """Testa que CPFs com e sem máscara têm a mesma forma normalizada"""
+        assert validation_service.normalize_document(0, "123.456.789-09") == "12345678909"
+        assert validation_service.normalize_document(0, " 12345678909") == "12345678909"
+    
+    def test_normalize_document_rg_com_x(self, validation_service):
+        """Testa que o dígito X do RG é mantido"""
+        assert validation_service.normalize_document(1, "12.345.678-x") == "12345678X"
+    
+    def test_normalize_document_nome(self, validation_service):
+        """Testa normalização de nome sem acentos, caixa ou espaços extras"""
+        assert validation_service.normalize_document(2, "  João  da SILVA ") == "joao da silva"
@@ -0,0 +1,103 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from services.web_scraper_pool_service import WebScraperPool
+
+class TestWebScraperPool:
+    """Testes para o pool de drivers de web scraping"""
+
+    @pytest.fixture
+    def scrapers(self):
+        """Serviços de scraping criados pela factory do pool"""
+        return []
+
+    @pytest.fixture
+    def pool(self, scrapers):
+        """Pool com dois drivers simulados"""
+        def factory():
+            scraper = Mock()
+            scraper.pesquisar.return_value = "Processos encontrados"
+            scrapers.append(scraper)
+            return scraper
+
+        return WebScraperPool(scraper_factory=factory, pool_size=2, max_falhas_consecutivas=2)
+
+    def test_cria_um_scraper_por_driver(self, pool, scrapers):
+        """Testa que a factory é chamada uma vez por driver"""
+        assert len(scrapers) == 2
+        assert [h["driver_id"] for h in pool.get_health()] == [0, 1]
+
+    def test_tamanho_invalido(self):
+        """Testa rejeição de pool vazio"""
+        with pytest.raises(ValueError):
+            WebScraperPool(scraper_factory=Mock, pool_size=0)
+
+    def test_pesquisar_devolve_driver(self, pool):
+        """Testa que o driver volta ao pool após a pesquisa"""
+        assert pool.pesquisar(0, "123.456.789-09") == "Processos encontrados"
+        assert pool.pesquisar(0, "123.456.789-09") == "Processos encontrados"
+        assert pool.pesquisar(0, "123.456.789-09") == "Processos encontrados"
+
+        assert sum(h["pesquisas"] for h in pool.get_health()) == 3
+
+    def test_pesquisas_simultaneas(self, pool, scrapers):
+        """Testa que dois drivers atendem pesquisas ao mesmo tempo"""
+        em_andamento = []
+        maximo = []
+        lock = threading.Lock()
+
+        def pesquisar_lento(filtro, documento):
+            with lock:
+                em_andamento.append(documento)
+                maximo.append(len(em_andamento))
+            time.sleep(0.05)
+            with lock:
+                em_andamento.remove(documento)
+            return "ok"
+
+        for scraper in scrapers:
+            scraper.pesquisar.side_effect = pesquisar_lento
+
+        threads = [threading.Thread(target=pool.pesquisar, args=(0, str(i))) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(maximo) == 2
+
+    def test_reinicia_driver_apos_falhas_consecutivas(self, pool, scrapers):
+        """Testa que o driver é fechado após atingir o limite de falhas"""
+        driver_id = pool.acquire()
+        pool.release(driver_id, sucesso=False)
+        assert pool.get_health()[driver_id]["falhas_consecutivas"] == 1
+        scrapers[driver_id].close_driver.assert_not_called()
+
+        pool.acquire()  # o driver 1 fica ocupado
+        driver_id = pool.acquire()
+        pool.release(driver_id, sucesso=False)
+
+        health = pool.get_health()[driver_id]
+        assert health["falhas"] == 2
+        assert health["falhas_consecutivas"] == 0
+        assert health["reinicios"] == 1
+        scrapers[driver_id].close_driver.assert_called_once()
+
+    def test_sucesso_zera_falhas_consecutivas(self, pool):
+        """Testa que uma pesquisa bem-sucedida zera a contagem de falhas"""
+        driver_id = pool.acquire()
+        pool.release(driver_id, sucesso=False)
+        pool.acquire()
+        driver_id = pool.acquire()
+        pool.release(driver_id, sucesso=True)
+
+        assert pool.get_health()[driver_id]["falhas_consecutivas"] == 0
+        assert pool.get_health()[driver_id]["falhas"] == 1
+
+    def test_close_driver_fecha_todos(self, pool, scrapers):
+        """Testa fechamento de todos os drivers do pool"""
+        pool.close_driver()
+
+        for scraper in scrapers:
+            scraper.close_driver.assert_called_once()
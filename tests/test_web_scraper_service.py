@@ -0,0 +1,86 @@
+import pytest
+from unittest.mock import Mock, patch
+from selenium.common.exceptions import StaleElementReferenceException
+from services.retry_service import TransientScrapingError
+from services.web_scraper_service import TJSPWebScraper
+
+class TestTJSPWebScraper:
+    """Testes para o web scraper do TJSP"""
+
+    @pytest.fixture
+    def scraper(self):
+        """Scraper com driver simulado"""
+        scraper = TJSPWebScraper(headless=True)
+        scraper.driver = Mock()
+        scraper.timeout = 1
+        return scraper
+
+    @staticmethod
+    def pagina_com(*seletores_presentes, ocultos=()):
+        """Simula find_elements retornando elementos só para os seletores informados"""
+        def find_elements(by, seletor):
+            if seletor in ocultos:
+                return [Mock(**{"is_displayed.return_value": False})]
+            return [Mock()] if seletor in seletores_presentes else []
+        return find_elements
+
+    def test_wait_for_result_nada_consta(self, scraper):
+        """Testa detecção imediata da mensagem de retorno"""
+        scraper.driver.find_elements.side_effect = self.pagina_com("#mensagemRetorno")
+
+        assert scraper.wait_for_result() == "mensagem"
+
+    def test_wait_for_result_lista_de_processos(self, scraper):
+        """Testa detecção da lista de processos"""
+        scraper.driver.find_elements.side_effect = self.pagina_com("#listagemDeProcessos")
+
+        assert scraper.wait_for_result() == "processos"
+
+    def test_wait_for_result_aguarda_navegacao(self, scraper):
+        """Testa que os marcadores só são lidos depois que a página anterior sai"""
+        botao = Mock()
+        botao.is_enabled.side_effect = [True, True, StaleElementReferenceException()]
+        scraper.driver.find_elements.side_effect = self.pagina_com("#numeroProcesso")
+
+        assert scraper.wait_for_result(botao) == "processo"
+        assert botao.is_enabled.call_count == 3
+
+    def test_wait_for_result_ignora_marcador_oculto(self, scraper):
+        """Testa que a tabela de erros oculta da página não conta como resultado"""
+        scraper.driver.find_elements.side_effect = self.pagina_com(ocultos=("#spwTabelaMensagem, .mensagemErro",))
+
+        assert scraper.wait_for_result(timeout=0.3) is None
+
+        scraper.driver.find_elements.side_effect = self.pagina_com(
+            "#listagemDeProcessos", ocultos=("#spwTabelaMensagem, .mensagemErro", "#mensagemRetorno")
+        )
+
+        assert scraper.wait_for_result() == "processos"
+
+    def test_wait_for_result_timeout(self, scraper):
+        """Testa retorno None quando nenhum marcador aparece"""
+        scraper.driver.find_elements.return_value = []
+
+        assert scraper.wait_for_result(timeout=0.3) is None
+
+    def test_pesquisar_por_cpf_sem_espera_fixa(self, scraper):
+        """Testa que a pesquisa retorna assim que o resultado está pronto"""
+        scraper.wait_for_element = Mock(return_value=Mock(tag_name="select"))
+        scraper.wait_for_result = Mock(return_value="mensagem")
+        scraper.driver.page_source = "<html>resultado</html>"
+
+        with patch("services.web_scraper_service.Select") as mock_select:
+            page_source = scraper.pesquisar_por_cpf("123.456.789-09")
+
+        assert page_source == "<html>resultado</html>"
+        mock_select.return_value.select_by_value.assert_called_once_with("DOCPARTE")
+        scraper.wait_for_result.assert_called_once()
+
+    def test_pesquisar_por_cpf_sem_resultado_e_falha_transitoria(self, scraper):
+        """Testa que a página que não carregou não é devolvida como resultado"""
+        scraper.wait_for_element = Mock(return_value=Mock(tag_name="select"))
+        scraper.wait_for_result = Mock(return_value=None)
+
+        with patch("services.web_scraper_service.Select"):
+            with pytest.raises(TransientScrapingError):
+                scraper.pesquisar_por_cpf("123.456.789-09")
@@ -0,0 +1,131 @@
+"""
+Corpus sintético de páginas de resultado do e-SAJ (TJSP) para benchmarks
+
+As páginas seguem a estrutura das fixtures em tests/fixtures/tjsp e são
+geradas de forma determinística, então o mesmo caso tem sempre o mesmo
+conteúdo e tamanho.
+"""
+from typing import Dict, NamedTuple
+
+CABECALHO = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+  <meta charset="UTF-8">
+  <title>Portal de Serviços e-SAJ - Consulta de Processos de 1º Grau</title>
+  <link rel="stylesheet" href="/cpopg/css/unj.css">
+  <script src="/cpopg/js/jquery.js"></script>
+</head>
+<body>
+  <form id="formConsulta" action="/cpopg/search.do" method="get">
+    <select id="cbPesquisa" name="cbPesquisa"><option value="DOCPARTE" selected>Documento da Parte</option></select>
+    <input type="text" id="campo_DOCPARTE" name="dadosConsulta.valorConsulta">
+    <input type="submit" id="botaoConsultarProcessos" value="Consultar">
+  </form>
+"""
+
+RODAPE = """  <footer class="unj-footer">Tribunal de Justiça do Estado de São Paulo</footer>
+</body>
+</html>
+"""
+
+# Conteúdo sem marcadores usado para levar a página ao tamanho desejado
+# (scripts e menus que o portal carrega antes do resultado)
+ENCHIMENTO = "  <script>window.unj = window.unj || {}; unj.menu.push({id: %d, titulo: 'Consulta de Processos'});</script>\n"
+
+CLASSES = [
+    ("Procedimento Comum Cível", "Indenização por Dano Moral", "Reqdo", "Foro Central Cível"),
+    ("Ação Penal - Procedimento Ordinário", "Furto", "Réu", "Foro Central Criminal Barra Funda"),
+    ("Execução de Título Extrajudicial", "Cheque", "Exeqte", "Foro de Guarulhos"),
+    ("Inquérito Policial", "Estelionato", "Vítima", "Foro Central Criminal Barra Funda"),
+]
+
+class CasoCorpus(NamedTuple):
+    page_source: str
+    resultado: int  # resultado esperado da análise
+
+def _preencher(conteudo: str, tamanho: int) -> str:
+    """Insere enchimento antes do resultado até a página ter `tamanho` bytes"""
+    partes = []
+    total = len((CABECALHO + conteudo + RODAPE).encode("utf-8"))
+    indice = 0
+    while total < tamanho:
+        linha = ENCHIMENTO % indice
+        partes.append(linha)
+        total += len(linha)
+        indice += 1
+    return CABECALHO + "".join(partes) + conteudo + RODAPE
+
+def pagina_nada_consta(tamanho: int = 10 * 1024) -> str:
+    return _preencher(
+        """  <table id="spwTabelaMensagem">
+    <tr><td id="mensagemRetorno">Não existem informações disponíveis para os parâmetros informados.</td></tr>
+  </table>
+""", tamanho)
+
+def pagina_processos(quantidade: int, tamanho: int = 0, criminal: bool = True) -> str:
+    """Lista de resultados com `quantidade` processos (o segundo é criminal, se `criminal`)"""
+    itens = []
+    for indice in range(quantidade):
+        classe, assunto, participacao, foro = CLASSES[indice % len(CLASSES)]
+        if not criminal and indice % 2 == 1:
+            classe, assunto, participacao, foro = CLASSES[0]
+        itens.append(f"""      <li>
+        <div class="row unj-ai-c home__lista-de-processos">
+          <div class="col-md-3">
+            <div class="nuProcesso">
+              <a href="/cpopg/show.do?processo.codigo=1A{indice:04d}BCD0000&amp;processo.foro=100" class="linkProcesso">
+                {1000000 + indice:07d}-45.2020.8.26.0100
+              </a>
+            </div>
+          </div>
+          <div class="col-md-3">
+            <span class="tipoDeParticipacao">{participacao}</span>
+            <div class="nomeParte">JOÃO DA SILVA</div>
+          </div>
+          <div class="col-md-3">
+            <div class="classeProcesso">{classe}</div>
+            <div class="assuntoPrincipalProcesso">{assunto}</div>
+          </div>
+          <div class="col-md-3">
+            <div class="dataLocalDistribuicaoProcesso">{indice % 28 + 1:02d}/03/2020 - {foro}</div>
+          </div>
+        </div>
+      </li>
+""")
+    return _preencher(f"""  <div id="listagemDeProcessos">
+    <h2 class="subtitle">
+      <span id="contadorDeProcessos">{quantidade} Processos encontrados</span>
+    </h2>
+    <ul class="unj-list-row">
+{"".join(itens)}    </ul>
+  </div>
+""", tamanho)
+
+def pagina_erro() -> str:
+    return _preencher("""  <div class="unj-alert unj-alert--danger">
+    <p>Ocorreu um erro inesperado ao processar a sua solicitação. Tente novamente mais tarde.</p>
+  </div>
+""", 10 * 1024)
+
+def pagina_manutencao() -> str:
+    return """<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="UTF-8"><title>e-SAJ - Sistema em manutenção</title></head>
+<body><h1>Sistema temporariamente indisponível para manutenção programada.</h1></body>
+</html>
+"""
+
+def gerar_corpus() -> Dict[str, CasoCorpus]:
+    """Casos do benchmark, de páginas de poucos KB até 5 MB"""
+    return {
+        "nada_consta_10kb": CasoCorpus(pagina_nada_consta(), 1),
+        "nada_consta_1mb": CasoCorpus(pagina_nada_consta(1024 * 1024), 1),
+        "processos_1": CasoCorpus(pagina_processos(1), 5),
+        "processos_50": CasoCorpus(pagina_processos(50), 2),
+        "processos_50_civeis": CasoCorpus(pagina_processos(50, criminal=False), 5),
+        "processos_500": CasoCorpus(pagina_processos(500), 2),
+        "processos_500_5mb": CasoCorpus(pagina_processos(500, tamanho=5 * 1024 * 1024), 2),
+        # Sem marcador conhecido: vale o resultado padrão das regras
+        "erro": CasoCorpus(pagina_erro(), 5),
+        "manutencao": CasoCorpus(pagina_manutencao(), 5),
+    }
@@ -0,0 +1,111 @@
+"""
+Servidor HTTP local que reproduz páginas gravadas do e-SAJ (TJSP)
+
+Usado nos testes do HttpWebScraperService no lugar do site real:
+
+    with TJSPStubServer({"123.456.789-09": "processos.html"}) as servidor:
+        service = HttpWebScraperService(base_url=servidor.base_url)
+"""
+import os
+import threading
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "tjsp")
+SESSION_ID = "STUB0123456789"
+
+def carregar_pagina(nome_arquivo: str) -> str:
+    """Lê uma página gravada do diretório de fixtures"""
+    with open(os.path.join(FIXTURES_DIR, nome_arquivo), encoding="utf-8") as arquivo:
+        return arquivo.read()
+
+class TJSPStubServer:
+    """
+    Servidor que responde /cpopg/open.do e /cpopg/search.do
+
+    Args:
+        respostas: Mapa de valor consultado para o arquivo da página gravada
+            ou para um código de status HTTP (ex: 503). Valores não mapeados
+            recebem a página de "nada consta".
+    """
+
+    def __init__(self, respostas: Optional[Dict[str, Union[str, int]]] = None):
+        self.respostas = respostas or {}
+        self.requisicoes: List[Dict] = []
+        self.sessoes_validas = {SESSION_ID}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._criar_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/cpopg"
+
+    def expirar_sessoes(self) -> None:
+        """Invalida as sessões emitidas, como o e-SAJ faz após inatividade"""
+        self.sessoes_validas = set()
+
+    def start(self) -> "TJSPStubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "TJSPStubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _criar_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                cookies = SimpleCookie(self.headers.get("Cookie", ""))
+                sessao = cookies["JSESSIONID"].value if "JSESSIONID" in cookies else None
+                stub.requisicoes.append({
+                    "path": url.path,
+                    "params": params,
+                    "sessao": sessao,
+                    "conexao": self.client_address
+                })
+
+                if url.path.endswith("/open.do"):
+                    stub.sessoes_validas.add(SESSION_ID)
+                    self._responder(200, carregar_pagina("open.html"), nova_sessao=True)
+                elif url.path.endswith("/search.do"):
+                    if sessao not in stub.sessoes_validas:
+                        # Sessão expirada: o e-SAJ devolve o formulário de consulta
+                        self._responder(200, carregar_pagina("open.html"))
+                        return
+                    resposta = stub.respostas.get(params.get("dadosConsulta.valorConsulta"), "nada_consta.html")
+                    if isinstance(resposta, int):
+                        self._responder(resposta, "Serviço indisponível")
+                    else:
+                        self._responder(200, carregar_pagina(resposta))
+                else:
+                    self._responder(404, "Não encontrado")
+
+            def _responder(self, status: int, corpo: str, nova_sessao: bool = False):
+                dados = corpo.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(dados)))
+                if nova_sessao:
+                    self.send_header("Set-Cookie", f"JSESSIONID={SESSION_ID}; Path=/cpopg; HttpOnly")
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler